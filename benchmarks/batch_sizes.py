@@ -0,0 +1,134 @@
+import argparse
+import functools
+import multiprocessing
+import time
+
+from src.article_scraper import ArticleScraper
+from src.map_reduce import MapReduce
+from src.page import ErrorCodes, Page, PageTransport
+
+
+def download_from_memory(url, content, page_transport):
+    return Page(url=url, error_code=ErrorCodes.OK, content=content, encoding="utf-8").pack(page_transport)
+
+
+def read_page(page):
+    return page.url, len(page.read_text())
+
+
+def items_per_second(num_pages, content, batch_size, args):
+    keep_going = multiprocessing.Value("i", 1)
+    num_active_searchers = multiprocessing.Value("i", 1)
+    num_active_downloaders = multiprocessing.Value("i", args.download_threads)
+    num_active_parsers = multiprocessing.Value("i", args.parse_processes)
+
+    urls: multiprocessing.Queue = multiprocessing.Queue(maxsize=args.queues_max_size)
+    pages: multiprocessing.Queue = multiprocessing.Queue(maxsize=args.queues_max_size)
+    articles: multiprocessing.Queue = multiprocessing.Queue(maxsize=args.queues_max_size)
+
+    if args.parser_backend:
+        parse = functools.partial(
+            ArticleScraper._page_to_article, parser=ArticleScraper.PARSER_BACKENDS[args.parser_backend]()
+        )
+    else:
+        parse = read_page
+
+    saved = []
+    url_batches = iter(range(0, num_pages, 100))
+
+    def search():
+        start = next(url_batches, num_pages)
+        return [f"https://medium.com/article-{i}" for i in range(start, min(start + 100, num_pages))], start >= num_pages
+
+    # The parse processes come first, so that they are forked before any other stage starts its threads
+    jobs = [
+        MapReduce(
+            function=parse,
+            num_workers=args.parse_processes,
+            input_queue=pages,
+            output_queue=articles,
+            external_workers_to_wait_for=num_active_downloaders,
+            num_active_workers=num_active_parsers,
+            name="Parse",
+            concurrent=True,
+            signal_downstream=True,
+            batch_size=batch_size,
+        ),
+        MapReduce(
+            function=search,
+            num_workers=1,
+            output_queue=urls,
+            external_workers_to_wait_for=keep_going,
+            num_active_workers=num_active_searchers,
+            name="Search",
+            signal_downstream=True,
+            batch_size=batch_size,
+        ),
+        MapReduce(
+            function=functools.partial(
+                download_from_memory, content=content, page_transport=PageTransport(args.page_transport)
+            ),
+            num_workers=args.download_threads,
+            input_queue=urls,
+            output_queue=pages,
+            external_workers_to_wait_for=num_active_searchers,
+            num_active_workers=num_active_downloaders,
+            name="Download",
+            signal_downstream=True,
+            batch_size=batch_size,
+        ),
+        MapReduce(
+            function=saved.append,
+            num_workers=1,
+            input_queue=articles,
+            external_workers_to_wait_for=num_active_parsers,
+            num_active_workers=multiprocessing.Value("i", 1),
+            name="Save",
+        ),
+    ]
+
+    start = time.perf_counter()
+    for job in jobs:
+        job.start()
+    for job in jobs:
+        job.join()
+
+    elapsed = time.perf_counter() - start
+
+    if len(saved) != num_pages:
+        raise RuntimeError(f"Only {len(saved)} of {num_pages} pages went through the pipeline")
+
+    return num_pages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the pipeline throughput at several batch sizes with downloads served from memory"
+    )
+    parser.add_argument("--page", default="tests/helpers/example_article_1.html")
+    parser.add_argument("--num-pages", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=None, help="Truncate the page to this many bytes")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--download-threads", type=int, default=20)
+    parser.add_argument("--parse-processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--queues-max-size", type=int, default=100)
+    parser.add_argument("--page-transport", default="bytes", choices=[transport.value for transport in PageTransport])
+    parser.add_argument(
+        "--parser-backend",
+        default=None,
+        choices=list(ArticleScraper.PARSER_BACKENDS),
+        help="Parse the pages for real instead of only decoding them",
+    )
+    args = parser.parse_args()
+
+    with open(args.page, "rb") as file:
+        content = file.read()[:args.page_size]
+
+    print(f"{args.num_pages} pages of {len(content)} bytes")
+    for batch_size in args.batch_sizes:
+        rate = items_per_second(args.num_pages, content, batch_size, args)
+        print(f"batch size {batch_size:<5} {rate:10.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks.fake_medium import fake_medium_handler, fake_medium_server
+from src.article_scraper import ArticleScraper
+from src.article_searcher.archive_searcher import ArchiveSearcher
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_megabytes():
+    # Linux reports kilobytes. The children figure is the largest single parse process, not their sum
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+def compile_articles(url, args):
+    with tempfile.TemporaryDirectory() as directory, mock.patch.object(ArchiveSearcher, "base_url", url):
+        start = time.perf_counter()
+        start_cpu_seconds = cpu_seconds()
+        ArticleScraper.compile_articles(
+            "cooking",
+            args.num_articles,
+            directory=directory,
+            minimum_duration_minutes=None,
+            num_download_threads=args.download_threads,
+            num_parse_processes=args.parse_processes,
+            download_engine=args.download_engine,
+            batch_size=args.batch_size,
+            requests_per_second_per_host=args.requests_per_second,
+            retry_base_delay_seconds=0.1,
+            storage_format=args.storage_format,
+        )
+        elapsed = time.perf_counter() - start
+
+    return elapsed, cpu_seconds() - start_cpu_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure ArticleScraper.compile_articles end to end against a local fake Medium"
+    )
+    parser.add_argument("--num-articles", type=int, default=1000)
+    parser.add_argument("--articles-per-day", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean response time of the server in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of article pages answered with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of article pages answered with a 429")
+    parser.add_argument("--page-size", type=int, default=None, help="Pad the article page to this many bytes")
+    parser.add_argument("--download-threads", type=int, default=20)
+    parser.add_argument("--parse-processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--download-engine", default="threads", choices=["threads", "async"])
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--storage-format", default="text", choices=["text", "jsonl"])
+    parser.add_argument("--requests-per-second", type=float, default=1000.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    handler = fake_medium_handler(
+        articles_per_day=args.articles_per_day,
+        latency_seconds=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        page_size=args.page_size,
+    )
+    print(f"{args.num_articles} articles of {len(handler.article_page)} bytes, {args.latency * 1000:.0f} ms latency")
+
+    with fake_medium_server(handler) as url:
+        for i in range(args.repeat):
+            elapsed, cpu = compile_articles(url, args)
+            print(
+                f"run {i + 1:<3} {args.num_articles / elapsed:10.1f} articles/s"
+                f" {elapsed:8.1f} s {cpu:8.1f} CPU s ({cpu / elapsed:.1f} cores)"
+            )
+
+    own_rss, child_rss = peak_rss_megabytes()
+    print(f"peak RSS {own_rss:.0f} MiB in the main process, {child_rss:.0f} MiB in the largest child")
+
+
+if __name__ == "__main__":
+    main()
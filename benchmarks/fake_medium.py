@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+import multiprocessing
+import random
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.local_server import StaticPageHandler
+from src.article_scraper import ArticleScraper
+from src.article_searcher.archive_searcher import ArchiveSearcher
+
+ARCHIVE_DAY_PATH = re.compile(r"^/tag/(?P<tag>[^/]+)/archive/(?P<year>\d{4})/(?P<month>\d{2})/(?P<day>\d{2})/?$")
+
+
+def load_archive_template(path):
+    with open(path, encoding="utf-8") as file:
+        soup = BeautifulSoup(file.read(), "html.parser")
+
+    stream = soup.find("div", attrs={"class": "js-postStream"})
+    items = stream.find_all("div", attrs={"class": "streamItem"})
+    item = str(items[0])
+    url = ArchiveSearcher.remove_query_parameters(items[0].find("div", attrs={"class": ""}).find("a")["href"])
+
+    for element in items:
+        element.decompose()
+    page = str(soup).replace(str(stream), str(stream).replace("</div>", "{items}</div>", 1), 1)
+
+    return page, item, url
+
+
+class FakeMediumHandler(StaticPageHandler):
+    archive_page = ""
+    archive_item = ""
+    archive_item_url = ""
+    search_page = b""
+    article_page = b""
+    article_id = b""
+    articles_per_day = 20
+    latency_seconds = 0.0
+    error_rate = 0.0
+    throttle_rate = 0.0
+    random = random.Random(0)  # noqa: S311
+
+    def do_GET(self):
+        if self.latency_seconds:
+            # Exponential delays, so that a few pages are much slower than the rest as on the real site
+            time.sleep(self.random.expovariate(1 / self.latency_seconds))
+
+        path = self.path.split("?")[0]
+        archive_day = ARCHIVE_DAY_PATH.match(path)
+        if archive_day:
+            self._send(200, self._archive_day_page(archive_day).encode("utf-8"))
+        elif path.startswith("/search"):
+            self._send(200, self.search_page)
+        elif self.random.random() < self.throttle_rate:
+            self._send(429, b"", {"Retry-After": "1"})
+        elif self.random.random() < self.error_rate:
+            self._send(500, b"")
+        else:
+            # Every URL gets its own article, since the scraper stores each article id only once
+            self._send(200, self.article_page.replace(self.article_id, path.rsplit("-", 1)[-1].encode("utf-8")))
+
+    def _archive_day_page(self, archive_day):
+        day = f"{archive_day['year']}{archive_day['month']}{archive_day['day']}"
+        base_url = f"http://{self.headers['Host']}"
+        # The scraper tells articles apart by the id at the end of their URL, so each one gets its own
+        items = "".join(
+            self.archive_item.replace(self.archive_item_url, f"{base_url}/@fake/{archive_day['tag']}-{day}{i:04d}")
+            for i in range(self.articles_per_day)
+        )
+        return self.archive_page.replace("{items}", items)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def fake_medium_handler(
+        articles_per_day=20,
+        latency_seconds=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        page_size=None,
+        archive_path="tests/helpers/archive_results_for_day.html",
+        search_path="tests/helpers/example_search_result_1.html",
+        article_path="tests/helpers/example_article_1.html",
+):
+    archive_page, archive_item, archive_item_url = load_archive_template(archive_path)
+    with open(search_path, "rb") as file:
+        search_page = file.read()
+    with open(article_path, "rb") as file:
+        article_page = file.read()
+
+    article_id = ArticleScraper._parse_article_page(article_page.decode("utf-8"))[0]
+
+    if page_size is not None and page_size > len(article_page):
+        # Pad with a comment, so that bigger pages still parse to the same article
+        article_page += b"<!--" + b"x" * (page_size - len(article_page) - 7) + b"-->"
+
+    return type(
+        "ConfiguredFakeMediumHandler",
+        (FakeMediumHandler,),
+        {
+            "archive_page": archive_page,
+            "archive_item": archive_item,
+            "archive_item_url": archive_item_url,
+            "search_page": search_page,
+            "article_page": article_page,
+            "article_id": article_id.encode("utf-8"),
+            "articles_per_day": articles_per_day,
+            "latency_seconds": latency_seconds,
+            "error_rate": error_rate,
+            "throttle_rate": throttle_rate,
+        },
+    )
+
+
+@contextmanager
+def fake_medium_server(handler):
+    # The server runs in its own process, so that it does not compete with the scraper for the interpreter lock.
+    # Its socket is already listening, so the connections made before it serves wait in the backlog.
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    process = multiprocessing.Process(target=server.serve_forever, daemon=True)
+    process.start()
+    server.socket.close()
+
+    try:
+        yield f"http://localhost:{server.server_address[1]}"
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,43 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from benchmarks.local_server import local_server
+from src.article_scraper import ArticleScraper, ErrorCodes
+from src.http_session import SessionPool
+
+
+def requests_per_second(url, session_pool, num_requests, num_threads):
+    def download(i):
+        return ArticleScraper._download_article_page(f"{url}/article-{i}", session_pool=session_pool)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        pages = list(executor.map(download, range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    failed = sum(page.error_code != ErrorCodes.OK for page in pages)
+    if failed:
+        raise RuntimeError(f"{failed} requests failed")
+
+    return num_requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare article downloads with and without connection pooling")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=20)
+    args = parser.parse_args()
+
+    with local_server(https=True) as (url, certificate_file):
+        pools = {
+            "new connection per request": SessionPool(keep_alive=False, verify=certificate_file),
+            "pooled keep-alive sessions": SessionPool(verify=certificate_file),
+        }
+        for name, session_pool in pools.items():
+            rate = requests_per_second(url, session_pool, args.requests, args.threads)
+            print(f"{name:<30} {rate:10.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
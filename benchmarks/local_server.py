@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+
+
+class StaticPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b"<html><body><article><p>Hello</p></article></body></html>"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_self_signed_certificate(directory):
+    certificate_file = os.path.join(directory, "localhost.pem")
+    key_file = os.path.join(directory, "localhost.key")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key_file, "-out", certificate_file,
+            "-days", "1", "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return certificate_file, key_file
+
+
+@contextmanager
+def local_server(handler=StaticPageHandler, https=False):
+    with tempfile.TemporaryDirectory() as directory:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.daemon_threads = True
+        certificate_file = None
+
+        if https:
+            certificate_file, key_file = create_self_signed_certificate(directory)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certificate_file, key_file)
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        scheme = "https" if https else "http"
+        try:
+            yield f"{scheme}://localhost:{server.server_address[1]}", certificate_file
+        finally:
+            server.shutdown()
+            server.server_close()
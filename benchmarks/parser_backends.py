@@ -0,0 +1,36 @@
+import argparse
+from pathlib import Path
+import time
+
+from src.article_scraper import ArticleScraper
+
+
+def pages_per_second(parser, pages, repetitions):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for page_html in pages:
+            parser.parse(page_html)
+    elapsed = time.perf_counter() - start
+
+    return repetitions * len(pages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the article parser backends on saved Medium pages")
+    parser.add_argument("--corpus", default="tests/helpers", help="Directory with saved article pages")
+    parser.add_argument("--pattern", default="example_article_*.html")
+    parser.add_argument("--repetitions", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [path.read_text(encoding="utf-8") for path in sorted(Path(args.corpus).glob(args.pattern))]
+    if not pages:
+        raise ValueError(f"No pages matching {args.pattern} in {args.corpus}")
+
+    print(f"{len(pages)} pages x {args.repetitions} repetitions")
+    for name, backend in ArticleScraper.PARSER_BACKENDS.items():
+        rate = pages_per_second(backend(), pages, args.repetitions)
+        print(f"{name:<15} {rate:10.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,62 @@
+import atexit
 import logging.config
+import logging.handlers
+import multiprocessing
+import os
 from pathlib import Path
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+import weakref
+
 import yaml
 
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RepeatedMessageFilter(logging.Filter):
+    max_messages = 10_000
+    _filters: "weakref.WeakSet[RepeatedMessageFilter]" = weakref.WeakSet()
+
+    def __init__(self, interval_seconds: float = 10.0):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self._last_emitted: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        self._filters.add(self)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Messages are told apart by their template and their first argument, which names the stage or the host,
+        # so the same message about the same subject with other details counts as a repeat
+        subject = str(record.args[0]) if isinstance(record.args, tuple) and record.args else None
+        key = (record.name, record.levelno, record.msg, subject)
+        now = time.monotonic()
+
+        with self._lock:
+            emitted_at, num_suppressed = self._last_emitted.get(key, (float("-inf"), 0))
+            if now - emitted_at < self.interval_seconds:
+                self._last_emitted[key] = (emitted_at, num_suppressed + 1)
+                return False
+
+            if len(self._last_emitted) >= self.max_messages:
+                self._last_emitted.clear()
+            self._last_emitted[key] = (now, 0)
+
+        if num_suppressed:
+            record.msg = f"{record.msg} ({num_suppressed} similar messages suppressed)"
+        return True
+
+    @classmethod
+    def reset_after_fork(cls):
+        for repeated_message_filter in list(cls._filters):
+            repeated_message_filter._lock = threading.Lock()
+            repeated_message_filter._last_emitted = {}
+
+
+os.register_at_fork(after_in_child=RepeatedMessageFilter.reset_after_fork)
+
 
-def configure_logging():
+def configure_logging(queued=True, repeat_interval_seconds=10.0):
     root_path = Path(__file__).resolve().parent
 
     with open(root_path.joinpath("setup_logger.yaml"), 'r') as f:
@@ -13,4 +66,39 @@ def configure_logging():
             if handler_name.startswith("file_"):
                 handler["filename"] = root_path.joinpath(handler["filename"])
 
+        stop_queue_listener()
         logging.config.dictConfig(config)
+
+    if queued:
+        start_queue_listener(logging.getLogger("general_logger"), repeat_interval_seconds)
+
+
+def start_queue_listener(logger: logging.Logger, repeat_interval_seconds=10.0) -> logging.handlers.QueueListener:
+    global _listener
+
+    # Threads and forked processes only put their records in the queue, and a single thread writes them out
+    log_queue: multiprocessing.Queue = multiprocessing.Queue()
+    handlers = logger.handlers[:]
+    for handler in handlers:
+        logger.removeHandler(handler)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RepeatedMessageFilter(repeat_interval_seconds))
+    logger.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    # Registered after the queue exists, so the listener stops before multiprocessing closes the queue at exit
+    atexit.unregister(stop_queue_listener)
+    atexit.register(stop_queue_listener)
+
+    return _listener
+
+
+def stop_queue_listener():
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -5,7 +5,7 @@ from typing import List, Optional
 @dataclass
 class Article:
     id: str
-    url: str
+    url: Optional[str]
     title: Optional[str] = None
     author: Optional[str] = None
     paragraphs: Optional[List[str]] = None
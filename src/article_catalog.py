@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .article import Article
+
+
+class ArticleCatalog(object):
+    FILE_NAME = "catalog.sqlite"
+    COLUMNS = [
+        "id", "url", "title", "author", "duration_minutes", "num_words", "search_term", "file", "offset", "length"
+    ]
+
+    def __init__(self, path, flush_rows: int = 1000):
+        self.path = path
+        self.flush_rows = flush_rows
+
+        self._lock = threading.Lock()
+        self._num_pending_rows = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id TEXT PRIMARY KEY,
+                url TEXT,
+                title TEXT,
+                author TEXT,
+                duration_minutes INTEGER,
+                num_words INTEGER,
+                search_term TEXT,
+                file TEXT,
+                offset INTEGER,
+                length INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS articles_by_author ON articles (author, duration_minutes);
+            CREATE INDEX IF NOT EXISTS articles_by_duration ON articles (duration_minutes);
+            CREATE INDEX IF NOT EXISTS articles_by_search_term ON articles (search_term, duration_minutes);
+            """
+        )
+
+    def __contains__(self, article_id: str) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM articles WHERE id = ?", (article_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def add(
+            self,
+            article: Article,
+            search_term: Optional[str] = None,
+            location: Tuple[Optional[str], Optional[int], Optional[int]] = (None, None, None),
+            replace: bool = True,
+    ):
+        row = (
+            article.id,
+            article.url,
+            article.title,
+            article.author,
+            article.duration_minutes,
+            article.num_words if article.paragraphs else None,
+            search_term,
+            *location,
+        )
+
+        query = f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO articles VALUES ({', '.join('?' * len(row))})"
+
+        with self._lock:
+            self._connection.execute(query, row)
+            self._num_pending_rows += 1
+
+            # Rows are committed in batches, and they are visible to the lookups of this catalog before that
+            if self._num_pending_rows >= self.flush_rows:
+                self._commit()
+
+    def get(self, article_id: str) -> Optional[dict]:
+        rows = self._select("WHERE id = ?", (article_id,))
+        return rows[0] if rows else None
+
+    def find(
+            self,
+            author: Optional[str] = None,
+            search_term: Optional[str] = None,
+            min_duration_minutes: Optional[int] = None,
+            max_duration_minutes: Optional[int] = None,
+            min_num_words: Optional[int] = None,
+            limit: Optional[int] = None,
+    ) -> List[dict]:
+        conditions = [
+            ("author = ?", author),
+            ("search_term = ?", search_term),
+            ("duration_minutes >= ?", min_duration_minutes),
+            ("duration_minutes <= ?", max_duration_minutes),
+            ("num_words >= ?", min_num_words),
+        ]
+        conditions = [(condition, value) for condition, value in conditions if value is not None]
+
+        where = f"WHERE {' AND '.join(condition for condition, _ in conditions)}" if conditions else ""
+        values = tuple(value for _, value in conditions)
+        if limit is not None:
+            where, values = f"{where} LIMIT ?", values + (limit,)
+
+        return self._select(where, values)
+
+    def count_by_search_term(self) -> Dict[Optional[str], int]:
+        with self._lock:
+            rows = self._connection.execute("SELECT search_term, COUNT(*) FROM articles GROUP BY search_term").fetchall()
+
+        return dict(rows)
+
+    def iter_rows(self) -> Iterator[dict]:
+        with self._lock:
+            cursor = self._connection.execute(f"SELECT {', '.join(self.COLUMNS)} FROM articles ORDER BY rowid")
+            rows = cursor.fetchmany(1000)
+        while rows:
+            yield from (self._to_dict(row) for row in rows)
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+    def _select(self, where: str, values: tuple) -> List[dict]:
+        with self._lock:
+            # Only the placeholders of the conditions are formatted into the query, never their values
+            query = f"SELECT {', '.join(self.COLUMNS)} FROM articles {where}"
+            rows = self._connection.execute(query, values).fetchall()
+
+        return [self._to_dict(row) for row in rows]
+
+    def _to_dict(self, row: tuple) -> dict:
+        return {column: row[i] for i, column in enumerate(self.COLUMNS)}
+
+    def _commit(self):
+        self._connection.commit()
+        self._num_pending_rows = 0
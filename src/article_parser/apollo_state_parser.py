@@ -0,0 +1,84 @@
+import json
+import math
+from typing import Optional
+
+from .article_parser import ArticleParser, ParsedArticle
+from .beautiful_soup_parser import BeautifulSoupArticleParser
+
+
+class ApolloStateArticleParser(ArticleParser):
+    APOLLO_STATE_PREFIX = "window.__APOLLO_STATE__ = "
+    TEXT_PARAGRAPH_TYPES = {"P", "H1", "H2", "H3", "H4", "ULI", "OLI", "BQ", "PQ"}
+    EMBED_PARAGRAPH_TYPES = {"MIXTAPE_EMBED"}
+
+    def __init__(self, fallback: Optional[ArticleParser] = None):
+        self.fallback = fallback or BeautifulSoupArticleParser()
+        self._decoder = json.JSONDecoder()
+
+    def parse(self, page_html: str) -> ParsedArticle:
+        parsed = self._parse_apollo_state(page_html)
+        if parsed is None:
+            return self.fallback.parse(page_html)
+
+        return parsed
+
+    def _parse_apollo_state(self, page_html: str) -> Optional[ParsedArticle]:
+        start = page_html.find(self.APOLLO_STATE_PREFIX)
+        if start == -1:
+            return None
+
+        try:
+            state, _ = self._decoder.raw_decode(page_html, start + len(self.APOLLO_STATE_PREFIX))
+            post = self._get_post(state)
+            author = state[post["creator"]["__ref"]]["name"]
+            paragraphs = self._get_paragraphs(state, post)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        if any(post.get(field) is None for field in ("id", "title", "readingTime")) or paragraphs is None:
+            return None
+
+        return post["id"], post["title"], author, paragraphs, math.ceil(post["readingTime"])
+
+    @staticmethod
+    def _get_post(state):
+        for key, value in state["ROOT_QUERY"].items():
+            if key.startswith("postResult("):
+                return state[value["__ref"]]
+
+        raise KeyError("postResult")
+
+    def _get_paragraphs(self, state, post):
+        for key, value in post.items():
+            if key.startswith("content(") and value and value.get("bodyModel"):
+                body = value["bodyModel"]["paragraphs"]
+                break
+        else:
+            return None
+
+        paragraphs = []
+        for reference in body:
+            paragraph = state[reference["__ref"]]
+            if paragraph["type"] in self.TEXT_PARAGRAPH_TYPES:
+                # Line breaks are <br> tags in the DOM, which contribute no text
+                paragraphs.append(paragraph["text"].replace("\n", ""))
+            elif paragraph["type"] in self.EMBED_PARAGRAPH_TYPES:
+                paragraphs.extend(self._split_embed(paragraph))
+
+        return paragraphs
+
+    @staticmethod
+    def _split_embed(paragraph):
+        # Link previews render their title, description and domain as separate elements
+        text = paragraph["text"]
+        cuts = sorted({markup["end"] for markup in paragraph["markups"] if markup["type"] in ("STRONG", "EM")})
+
+        pieces = []
+        start = 0
+        for end in cuts + [len(text)]:
+            piece = text[start:end].strip("\n")
+            if piece:
+                pieces.append(piece)
+            start = end
+
+        return pieces
@@ -0,0 +1,30 @@
+from abc import abstractmethod
+import re
+from typing import List, Optional, Tuple, TypeVar
+
+ParsedArticle = Tuple[str, str, str, List[str], int]
+T = TypeVar("T")
+
+
+class ArticleParser(object):
+    PARAGRAPH_TAGS = ["p", "li", "h1", "h2", "h3", "h4"]
+    DURATION_PATTERN = re.compile(r"(\d+) min read")
+
+    @abstractmethod
+    def parse(self, page_html: str) -> ParsedArticle:
+        raise NotImplementedError
+
+    @classmethod
+    def _duration_in_minutes(cls, min_read_text: str) -> int:
+        return int(cls.DURATION_PATTERN.findall(min_read_text)[0])
+
+    @staticmethod
+    def _id_from_url(url: str) -> str:
+        return url.split("-")[-1]
+
+    @staticmethod
+    def _required(value: Optional[T], description: str) -> T:
+        if value is None:
+            raise TypeError(f"Missing {description}")
+
+        return value
@@ -0,0 +1,35 @@
+import re
+
+from bs4 import BeautifulSoup
+
+from .article_parser import ArticleParser, ParsedArticle
+
+
+class BeautifulSoupArticleParser(ArticleParser):
+    def __init__(self, features="html.parser"):
+        self.features = features
+
+    def parse(self, page_html: str) -> ParsedArticle:
+        def get_id():
+            parsely_post_id = soup.find("meta", attrs={"name": "parsely-post-id"})
+            if parsely_post_id:
+                return parsely_post_id["content"]
+
+            return self._id_from_url(soup.find("meta", attrs={"property": "og:url"})["content"])
+
+        def get_duration_in_minutes():
+            min_read = soup.find(text=re.compile("min read"))
+            return self._duration_in_minutes(min_read.parent.text)
+
+        soup = BeautifulSoup(page_html, self.features)
+
+        duration_minutes = get_duration_in_minutes()
+        article_id = get_id()
+        title = soup.find("meta", attrs={"name": "title"})["content"]
+        author = soup.find("meta", attrs={"name": "author"})["content"]
+        paragraphs = [
+            "".join(element.find_all(text=True))
+            for element in soup.find("article").find_all(self.PARAGRAPH_TAGS)
+        ]
+
+        return article_id, title, author, paragraphs, duration_minutes
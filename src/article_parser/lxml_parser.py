@@ -0,0 +1,38 @@
+import lxml.html
+
+from .article_parser import ArticleParser, ParsedArticle
+
+
+class LxmlArticleParser(ArticleParser):
+    def parse(self, page_html: str) -> ParsedArticle:
+        def get_meta_content(attribute, value):
+            elements = root.xpath(f'//meta[@{attribute}="{value}"]/@content')
+            return str(elements[0]) if elements else None
+
+        def get_id():
+            parsely_post_id = get_meta_content("name", "parsely-post-id")
+            if parsely_post_id:
+                return parsely_post_id
+
+            og_url = self._required(get_meta_content("property", "og:url"), "og:url meta tag")
+            return self._id_from_url(og_url)
+
+        def get_duration_in_minutes():
+            min_read = root.xpath('(//text()[contains(., "min read")])[1]')[0]
+            parent = min_read.getparent()
+            if min_read.is_tail:
+                parent = parent.getparent()
+            return self._duration_in_minutes(parent.text_content())
+
+        root = lxml.html.document_fromstring(page_html)
+
+        duration_minutes = get_duration_in_minutes()
+        article_id = get_id()
+        title = self._required(get_meta_content("name", "title"), "title meta tag")
+        author = self._required(get_meta_content("name", "author"), "author meta tag")
+        paragraphs = [
+            "".join(element.itertext())
+            for element in root.xpath("//article")[0].iter(*self.PARAGRAPH_TAGS)
+        ]
+
+        return article_id, title, author, paragraphs, duration_minutes
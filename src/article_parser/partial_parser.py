@@ -0,0 +1,60 @@
+import re
+
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+
+from .article_parser import ArticleParser, ParsedArticle
+
+
+class PartialArticleParser(ArticleParser):
+    # Medium splits the byline as "16<!-- --> min read"; the twitter:data1 meta tag holds "16 min read"
+    RAW_DURATION_PATTERN = re.compile(r"(\d+)(?:\s|<!-- -->)*min read")
+    META_TAG_PATTERN = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+
+    def __init__(self, features="html.parser"):
+        self.features = features
+        self.strainer = SoupStrainer(["meta", "article"])
+
+    def parse(self, page_html: str) -> ParsedArticle:
+        def get_meta_content(**attrs):
+            element = soup.find("meta", attrs=attrs)
+            return element["content"] if element else None
+
+        def get_id():
+            parsely_post_id = get_meta_content(name="parsely-post-id")
+            if parsely_post_id:
+                return parsely_post_id
+
+            return self._id_from_url(self._required(get_meta_content(property="og:url"), "og:url meta tag"))
+
+        def get_duration_in_minutes():
+            match = self.RAW_DURATION_PATTERN.search(page_html)
+            if not match:
+                raise TypeError("Missing reading time")
+            return int(match.group(1))
+
+        duration_minutes = get_duration_in_minutes()
+
+        soup = BeautifulSoup(self._head_and_article(page_html), self.features, parse_only=self.strainer)
+
+        article_id = get_id()
+        title = self._required(get_meta_content(name="title"), "title meta tag")
+        author = self._required(get_meta_content(name="author"), "author meta tag")
+        paragraphs = [
+            "".join(node for node in element.descendants if isinstance(node, NavigableString))
+            for element in soup.find("article").find_all(self.PARAGRAPH_TAGS)
+        ]
+
+        return article_id, title, author, paragraphs, duration_minutes
+
+    @classmethod
+    def _head_and_article(cls, page_html: str) -> str:
+        head_end = page_html.find("</head>")
+        article_start = page_html.find("<article")
+        article_end = page_html.rfind("</article>")
+
+        if head_end == -1 or article_start == -1 or article_end < article_start:
+            return page_html
+
+        meta_tags = "".join(cls.META_TAG_PATTERN.findall(page_html, 0, head_end))
+
+        return meta_tags + page_html[article_start:article_end + len("</article>")]
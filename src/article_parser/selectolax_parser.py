@@ -0,0 +1,38 @@
+from selectolax.lexbor import LexborHTMLParser
+
+from .article_parser import ArticleParser, ParsedArticle
+
+
+class SelectolaxArticleParser(ArticleParser):
+    def parse(self, page_html: str) -> ParsedArticle:
+        def get_meta_content(attribute, value):
+            element = tree.css_first(f'meta[{attribute}="{value}"]')
+            return element.attributes.get("content") if element else None
+
+        def get_id():
+            parsely_post_id = get_meta_content("name", "parsely-post-id")
+            if parsely_post_id:
+                return parsely_post_id
+
+            og_url = self._required(get_meta_content("property", "og:url"), "og:url meta tag")
+            return self._id_from_url(og_url)
+
+        def get_duration_in_minutes():
+            for node in tree.root.traverse(include_text=True):
+                if node.tag == "-text" and "min read" in node.text(deep=False):
+                    return self._duration_in_minutes(node.parent.text(deep=True))
+
+            raise TypeError("Missing reading time")
+
+        tree = LexborHTMLParser(page_html)
+
+        duration_minutes = get_duration_in_minutes()
+        article_id = get_id()
+        title = self._required(get_meta_content("name", "title"), "title meta tag")
+        author = self._required(get_meta_content("name", "author"), "author meta tag")
+        paragraphs = [
+            element.text(deep=True)
+            for element in self._required(tree.css_first("article"), "article tag").css(", ".join(self.PARAGRAPH_TAGS))
+        ]
+
+        return article_id, title, author, paragraphs, duration_minutes
@@ -0,0 +1,126 @@
+import csv
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+from .article import Article
+from .article_catalog import ArticleCatalog
+
+
+class ArticleReader(object):
+    FIELDS = ["id", "url", "title", "author", "paragraphs", "duration_minutes"]
+    METADATA_FIELDS = ["id", "url", "title", "author", "duration_minutes"]
+    TEXT_FIELDS = ["id", "paragraphs"]
+
+    def __init__(self, directory, fields: Optional[Iterable[str]] = None):
+        fields = list(fields) if fields is not None else self.FIELDS
+        unknown_fields = set(fields) - set(self.FIELDS)
+        if unknown_fields:
+            raise ValueError(f"Unknown article fields: {sorted(unknown_fields)}")
+
+        self.directory = directory
+        self.fields = {"id", *fields}
+
+        catalog_path = os.path.join(directory, ArticleCatalog.FILE_NAME)
+        self._catalog = ArticleCatalog(catalog_path) if os.path.isfile(catalog_path) else None
+        self._shards: Dict[str, mmap.mmap] = {}
+
+    def __enter__(self) -> "ArticleReader":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        if self._catalog is not None:
+            return len(self._catalog)
+
+        return sum(1 for _ in self._index_rows())
+
+    def __iter__(self) -> Iterator[Article]:
+        rows = self._catalog.iter_rows() if self._catalog is not None else self._index_rows()
+        for row in rows:
+            yield self._to_article(row)
+
+    def get(self, article_id: str) -> Optional[Article]:
+        if self._catalog is not None:
+            row = self._catalog.get(article_id)
+        else:
+            row = next((row for row in self._index_rows() if row["id"] == article_id), None)
+
+        return self._to_article(row) if row is not None else None
+
+    def close(self):
+        self._close_shards()
+
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    def _to_article(self, row: dict) -> Article:
+        article = Article(
+            id=row["id"],
+            url=row["url"] if "url" in self.fields else None,
+            title=row["title"] if "title" in self.fields else None,
+            author=row["author"] if "author" in self.fields else None,
+            duration_minutes=row.get("duration_minutes") if "duration_minutes" in self.fields else None,
+        )
+
+        # The text is only read when it is asked for, so metadata scans never touch the article files
+        if "paragraphs" in self.fields:
+            article.paragraphs = self._read_paragraphs(row)
+
+        return article
+
+    def _read_paragraphs(self, row: dict):
+        # Only corpora read from their index lack the file column, and those always store text files
+        file_name = row["file"] if "file" in row else f"{row['id']}.txt"
+        if file_name is None:
+            return None
+        if file_name.endswith(".txt"):
+            return self._read_text_file(os.path.join(self.directory, file_name)).split("\n")
+
+        end = row["offset"] + row["length"]
+        shard = self._open_shard(os.path.join(self.directory, file_name), end)
+        return json.loads(shard[row["offset"]:end])["paragraphs"]
+
+    def _open_shard(self, path, end) -> mmap.mmap:
+        # Shards are mapped once and sliced per article, so the page cache serves the reads without extra copies
+        if path in self._shards and len(self._shards[path]) < end:
+            # The shard has grown since it was mapped
+            self._shards.pop(path).close()
+
+        if path not in self._shards:
+            # Only one shard stays mapped, so that streaming a whole corpus keeps a flat footprint
+            self._close_shards()
+            with open(path, "rb") as file:
+                self._shards[path] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._shards[path]
+
+    def _close_shards(self):
+        for shard in self._shards.values():
+            shard.close()
+        self._shards.clear()
+
+    @staticmethod
+    def _read_text_file(path) -> str:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return ""
+
+            # The text is decoded straight from the page cache, without copying the file into a buffer first
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content, memoryview(content) as view:
+                return str(view, "utf-8")
+
+    def _index_rows(self) -> Iterator[dict]:
+        # Corpora stored before the catalog existed only have their index
+        with open(os.path.join(self.directory, "index.csv"), newline="", encoding="utf-8") as index:
+            for row in csv.DictReader(index):
+                yield {
+                    "id": row["Id"],
+                    "url": row["URL"],
+                    "title": row["Title"] or None,
+                    "author": row["Author"] or None,
+                }
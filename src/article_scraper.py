@@ -1,45 +1,46 @@
-from dataclasses import dataclass
-from enum import Enum
+import asyncio
+import collections
+from datetime import datetime
+import functools
 from http import HTTPStatus
+import itertools
 import logging
 import multiprocessing
-import re
+import queue
+import threading
 import time
-from typing import Optional, Tuple
+from typing import Counter, Dict, List, Optional, Sequence, Tuple, Union
 from urllib.parse import urlparse
 import warnings
 
-from bs4 import BeautifulSoup
+import aiohttp
 import requests
+from requests.structures import CaseInsensitiveDict
 
 from .article import Article
+from .article_parser.apollo_state_parser import ApolloStateArticleParser
+from .article_parser.article_parser import ArticleParser, ParsedArticle
+from .article_parser.beautiful_soup_parser import BeautifulSoupArticleParser
+from .article_parser.lxml_parser import LxmlArticleParser
+from .article_parser.partial_parser import PartialArticleParser
+from .article_parser.selectolax_parser import SelectolaxArticleParser
 from .article_searcher.archive_searcher import ArchiveSearcher
+from .article_searcher.multi_tag_searcher import MultiTagSearcher, TagQuotas, TagRange
 from .article_storage import ArticleStorage
-from .map_reduce import MapReduce
+from .async_downloader import AsyncDownloader
+from .checkpoint import Checkpoint
+from .http_cache import CacheEntry, HttpCache
+from .http_session import SessionPool
+from .map_reduce import Batch, MapReduce
+from .metrics import PipelineMetrics
+from .page import ErrorCodeNames, ErrorCodes, Page, PageTransport
+from .page_archive import PageArchive
+from .rate_limiter import RateLimiter
+from .retry_queue import RetryQueue
+from .url_deduplicator import UrlDeduplicator
 
 logger = logging.getLogger(f"general_logger.{__name__}")
 
-
-class ErrorCodes(Enum):
-    MISSING_SCHEMA = 1
-    CONNECTION_ERROR = 2
-    TIMEOUT = 3
-    DECODING_ERROR = 4
-    OK = HTTPStatus.OK.value
-    NOT_FOUND = HTTPStatus.NOT_FOUND.value
-    FORBIDDEN = HTTPStatus.FORBIDDEN.value
-    UNKNOWN_ERROR = -1
-
-
-ErrorCodeNames = [code.name for code in ErrorCodes]
-
-
-@dataclass
-class Page:
-    response: Optional[requests.Response]
-    error_code: ErrorCodes
-
-
 num_cpus = multiprocessing.cpu_count()
 
 
@@ -54,11 +55,25 @@ class ArticleScraper(object):
         "x-xsrf-token": "1",
     }
 
+    session_pool = SessionPool()
+
+    THROTTLING_ERROR_CODES = (ErrorCodes.TOO_MANY_REQUESTS, ErrorCodes.SERVICE_UNAVAILABLE)
+    TRANSIENT_ERROR_CODES = (ErrorCodes.TIMEOUT, ErrorCodes.CONNECTION_ERROR) + THROTTLING_ERROR_CODES
+
+    PARSER_BACKENDS = {
+        "html.parser": BeautifulSoupArticleParser,
+        "json": ApolloStateArticleParser,
+        "lxml": LxmlArticleParser,
+        "partial": PartialArticleParser,
+        "selectolax": SelectolaxArticleParser,
+    }
+    article_parser: ArticleParser = BeautifulSoupArticleParser()
+
     @classmethod
     def compile_articles(
             cls,
-            search_term: str,
-            num_articles: int,
+            search_term: Union[str, Sequence[TagRange]],
+            num_articles: Optional[int],
             directory="articles",
             minimum_duration_minutes=5,
             lenient=False,
@@ -66,18 +81,48 @@ class ArticleScraper(object):
             num_download_threads=20,
             num_parse_processes=num_cpus,
             queues_max_size=100,
+            max_download_threads: Optional[int] = None,
+            max_parse_processes: Optional[int] = None,
+            keep_alive=True,
+            shared_session=False,
+            connection_pool_size: Optional[int] = None,
+            download_engine="threads",
+            max_concurrent_downloads=200,
+            page_transport="bytes",
+            parser_backend="html.parser",
+            batch_size=1,
+            batch_linger_seconds=0.05,
+            url_index_path=None,
+            url_index_capacity=10_000_000,
+            resume=False,
+            http_cache_directory=None,
+            http_cache_ttl_seconds=7 * 24 * 3600,
+            http_cache_max_bytes=10 * 1024 ** 3,
+            page_archive_directory=None,
+            requests_per_second_per_host=50.0,
+            max_download_attempts=5,
+            retry_base_delay_seconds=1.0,
+            metrics: Optional[PipelineMetrics] = None,
+            metrics_port: Optional[int] = None,
+            storage_format="text",
     ):
+        cls._check_arguments(search_term, num_articles, download_engine)
+
+        page_transport = PageTransport(page_transport)
+
+        parser = cls._create_parser(parser_backend)
+
         logger.info("Start article compilation")
 
-        searcher = ArchiveSearcher(
-            search_term=search_term,
-            max_threads=num_days_searched_in_parallel,
-            minimum_duration_minutes=minimum_duration_minutes,
-            lenient=lenient
-        )
+        storage, checkpoint = cls._open_storage(directory, resume, storage_format)
+        http_cache = cls._open_http_cache(http_cache_directory, http_cache_ttl_seconds, http_cache_max_bytes)
+        page_archive = PageArchive(page_archive_directory) if page_archive_directory is not None else None
+        rate_limiter = RateLimiter(requests_per_second=requests_per_second_per_host)
+        retry_queue = RetryQueue(max_attempts=max_download_attempts, base_delay_seconds=retry_base_delay_seconds)
 
-        storage = ArticleStorage()
-        storage.create(directory, force=True)
+        searcher, tagged_days, quotas = cls._create_searcher(
+            search_term, storage, checkpoint, num_days_searched_in_parallel, minimum_duration_minutes, lenient, http_cache
+        )
 
         keep_going = multiprocessing.Value("i", 1)
         num_active_searchers = multiprocessing.Value("i", 1)
@@ -88,58 +133,130 @@ class ArticleScraper(object):
         pages: multiprocessing.Queue = multiprocessing.Queue(maxsize=queues_max_size)
         articles: multiprocessing.Queue = multiprocessing.Queue(maxsize=queues_max_size)
 
+        metrics = metrics or PipelineMetrics()
+        for name, q in (("urls", urls), ("pages", pages), ("articles", articles)):
+            metrics.watch_queue(name, q)
+
         logger.info("Create searching results job")
 
-        def get_next_batches():
-            urls_list = searcher.get_next_batches(num_batches=num_days_searched_in_parallel)
-            return urls_list, False
+        deduplicator = UrlDeduplicator(capacity=url_index_capacity, path=url_index_path)
+        pending_urls = checkpoint.pending_urls
+        deduplicator.mark_seen(pending_urls + [article.url for article in checkpoint.stored_articles.values()])
+        # A single tag is known without remembering the tag of every URL
+        default_tag = search_term if isinstance(search_term, str) else None
+        article_tags = dict(checkpoint.found_tags) if default_tag is None else {}
+        url_batches = itertools.chain(
+            [pending_urls],
+            cls._search_new_urls(tagged_days, deduplicator, checkpoint, article_tags if default_tag is None else None),
+        )
 
         get_urls_job = MapReduce(
-            function=get_next_batches,
+            function=functools.partial(cls._get_next_url_batch, url_batches=url_batches, retry_queue=retry_queue),
             num_workers=1,
             output_queue=urls,
             external_workers_to_wait_for=keep_going,
             num_active_workers=num_active_searchers,
-            name="Search Articles Job"
+            name="Search Articles Job",
+            signal_downstream=True,
+            batch_size=batch_size,
+            linger_seconds=batch_linger_seconds,
+            metrics=metrics.stage("search"),
         )
-        get_urls_job.start()
 
         logger.info("Create download articles job")
 
-        download_article_pages_job = MapReduce(
-            function=cls._download_article_page,
-            num_workers=num_download_threads,
-            input_queue=urls,
-            output_queue=pages,
-            external_workers_to_wait_for=num_active_searchers,
-            num_active_workers=num_active_downloaders,
-            name="Download article pages job"
-        )
-        download_article_pages_job.start()
+        download_article_pages_job: Union[AsyncDownloader, MapReduce]
+        if download_engine == "async":
+            download_article_pages_job = AsyncDownloader(
+                function=functools.partial(
+                    cls._download_article_page_async,
+                    page_transport=page_transport,
+                    http_cache=http_cache,
+                    page_archive=page_archive,
+                    rate_limiter=rate_limiter,
+                    retry_queue=retry_queue,
+                ),
+                input_queue=urls,
+                output_queue=pages,
+                external_workers_to_wait_for=num_active_searchers,
+                num_active_workers=num_active_downloaders,
+                max_concurrent_downloads=max_concurrent_downloads,
+                name="Download article pages job",
+                signal_downstream=True,
+                metrics=metrics.stage("download"),
+            )
+        else:
+            session_pool = cls._create_session_pool(
+                keep_alive, shared_session, connection_pool_size, max(num_download_threads, max_download_threads or 0)
+            )
+
+            download_article_pages_job = MapReduce(
+                function=functools.partial(
+                    cls._download_article_page,
+                    session_pool=session_pool,
+                    page_transport=page_transport,
+                    http_cache=http_cache,
+                    page_archive=page_archive,
+                    rate_limiter=rate_limiter,
+                    retry_queue=retry_queue,
+                ),
+                num_workers=num_download_threads,
+                max_workers=max_download_threads,
+                input_queue=urls,
+                output_queue=pages,
+                external_workers_to_wait_for=num_active_searchers,
+                num_active_workers=num_active_downloaders,
+                name="Download article pages job",
+                signal_downstream=True,
+                batch_size=batch_size,
+                linger_seconds=batch_linger_seconds,
+                metrics=metrics.stage("download"),
+            )
 
         logger.info("Create parse articles job")
 
         parse_articles_job = MapReduce(
-            function=cls._page_to_article,
+            function=functools.partial(cls._page_to_article, parser=parser),
             num_workers=num_parse_processes,
+            max_workers=max_parse_processes,
             input_queue=pages,
             output_queue=articles,
             external_workers_to_wait_for=num_active_downloaders,
             num_active_workers=num_active_parsers,
             name="Parse article pages job",
-            concurrent=True
+            concurrent=True,
+            signal_downstream=True,
+            batch_size=batch_size,
+            linger_seconds=batch_linger_seconds,
+            metrics=metrics.stage("parse"),
         )
-        parse_articles_job.start()
 
         logger.info("Create save articles job")
 
+        done = threading.Event()
+        outcomes: Counter[ErrorCodes] = collections.Counter()
+        is_target_reached = functools.partial(
+            cls._is_target_reached, storage=storage, num_articles=num_articles, quotas=quotas
+        )
+
         def save_article(article):
             article_object, error_code = article
+            outcomes[error_code] += 1
 
-            if error_code != ErrorCodes.OK:
+            # The same article may be listed under several URLs
+            if error_code != ErrorCodes.OK or done.is_set() or storage.contains(article_object.id):
                 return
 
-            storage.add(article_object)
+            tag = article_tags.pop(article_object.id, default_tag)
+            if quotas.is_reached(tag):
+                return
+
+            storage.add(article_object, search_term=tag)
+            quotas.record_stored(tag)
+            deduplicator.mark_stored(article_object.id)
+            checkpoint.record_stored(article_object)
+            if is_target_reached():
+                done.set()
 
         save_articles_job = MapReduce(
             function=save_article,
@@ -147,68 +264,489 @@ class ArticleScraper(object):
             input_queue=articles,
             external_workers_to_wait_for=num_active_parsers,
             num_active_workers=multiprocessing.Value("i", 1),
-            name="Save articles job"
+            name="Save articles job",
+            metrics=metrics.stage("save"),
         )
+
+        # Fork the parsers before the other stages spawn threads, so no child inherits a lock held by one of them
+        parse_articles_job.start()
+        metrics.start(port=metrics_port)
+        get_urls_job.start()
+        download_article_pages_job.start()
         save_articles_job.start()
 
-        while num_active_parsers.value > 0:
-            if storage.num_articles >= num_articles:
-                logger.info("Objective number of articles reached. Stop retrieving URLs")
-                with keep_going.get_lock():
-                    keep_going.value = 0
-                break
+        def wait_for_save_job():
+            save_articles_job.join()
+            done.set()
 
-            logger.info(f"Number of articles saved: {storage.num_articles}")
-            time.sleep(20)
+        threading.Thread(target=wait_for_save_job, daemon=True).start()
+
+        jobs = [get_urls_job, download_article_pages_job, parse_articles_job, save_articles_job]
+        cls._cancel_jobs_when_target_is_reached(jobs, done, storage, is_target_reached, keep_going, metrics)
 
-        logger.info("Downloading remaining URLs")
         get_urls_job.join()
+        searcher.close()
         download_article_pages_job.join()
         parse_articles_job.join()
         save_articles_job.join()
 
-        storage.close()
+        cls._discard_queued_pages(pages)
+        for q in (urls, pages, articles):
+            q.cancel_join_thread()
+
+        metrics.stop()
+        cls._close_resources(storage, deduplicator, checkpoint, http_cache, page_archive)
+        logger.info(metrics.summary())
+        cls._log_failures(outcomes, retry_queue)
 
         logger.info("Compilation finished")
         logger.info(f"{storage.num_articles} articles saved in folder {directory}")
 
     @classmethod
-    def _download_article_page(cls, url) -> Page:
+    def reparse_archive(
+            cls,
+            archive_directory,
+            directory="articles",
+            num_parse_processes=num_cpus,
+            queues_max_size=100,
+            parser_backend="html.parser",
+            batch_size=16,
+            batch_linger_seconds=0.05,
+            storage_format="text",
+    ):
+        parser = cls._create_parser(parser_backend)
+
+        logger.info(f"Start re-parsing the pages archived in folder {archive_directory}")
+
+        storage = ArticleStorage(storage_format)
+        storage.create(directory, force=True)
+
+        num_active_readers = multiprocessing.Value("i", 1)
+        num_active_parsers = multiprocessing.Value("i", num_parse_processes)
+
+        pages: multiprocessing.Queue = multiprocessing.Queue(maxsize=queues_max_size)
+        articles: multiprocessing.Queue = multiprocessing.Queue(maxsize=queues_max_size)
+
+        archived_pages = PageArchive.read(archive_directory)
+
+        def get_next_pages():
+            # The pages stay compressed until a parse process reads them, so decompression is spread over all cores
+            next_pages = list(itertools.islice(archived_pages, 100))
+            return next_pages, len(next_pages) < 100
+
+        def save_article(article):
+            article_object, error_code = article
+
+            # The same page may have been archived by several runs
+            if error_code != ErrorCodes.OK or storage.contains(article_object.id):
+                return
+
+            storage.add(article_object)
+
+        jobs = [
+            MapReduce(
+                function=functools.partial(cls._page_to_article, parser=parser),
+                num_workers=num_parse_processes,
+                input_queue=pages,
+                output_queue=articles,
+                external_workers_to_wait_for=num_active_readers,
+                num_active_workers=num_active_parsers,
+                name="Parse archived pages job",
+                concurrent=True,
+                signal_downstream=True,
+                batch_size=batch_size,
+                linger_seconds=batch_linger_seconds,
+            ),
+            MapReduce(
+                function=get_next_pages,
+                num_workers=1,
+                output_queue=pages,
+                external_workers_to_wait_for=multiprocessing.Value("i", 1),
+                num_active_workers=num_active_readers,
+                name="Read archived pages job",
+                signal_downstream=True,
+                batch_size=batch_size,
+                linger_seconds=batch_linger_seconds,
+            ),
+            MapReduce(
+                function=save_article,
+                num_workers=1,
+                input_queue=articles,
+                external_workers_to_wait_for=num_active_parsers,
+                num_active_workers=multiprocessing.Value("i", 1),
+                name="Save articles job",
+            ),
+        ]
+
+        # The parse processes are forked first, before the other stages start their threads
+        for job in jobs:
+            job.start()
+        for job in jobs:
+            job.join()
+
+        storage.close()
+
+        logger.info("Re-parsing finished")
+        logger.info(f"{storage.num_articles} articles saved in folder {directory}")
+
+    @classmethod
+    def _create_parser(cls, parser_backend) -> ArticleParser:
+        if parser_backend not in cls.PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser_backend}")
+
+        return cls.PARSER_BACKENDS[parser_backend]()
+
+    @staticmethod
+    def _create_session_pool(keep_alive, shared, pool_size, num_download_threads) -> SessionPool:
+        # A shared session makes the threads wait for a free connection, so by default each of them gets one
+        if pool_size is None:
+            pool_size = num_download_threads if shared else SessionPool().pool_size
+
+        return SessionPool(pool_size=pool_size, keep_alive=keep_alive, shared=shared)
+
+    @staticmethod
+    def _open_http_cache(directory, ttl_seconds, max_size_bytes) -> Optional[HttpCache]:
+        if directory is None:
+            return None
+
+        return HttpCache(directory, ttl_seconds=ttl_seconds, max_size_bytes=max_size_bytes)
+
+    @staticmethod
+    def _open_storage(directory, resume, storage_format="text"):
+        storage = ArticleStorage(storage_format)
+
+        if resume:
+            checkpoint = Checkpoint.load(directory)
+            # Articles checkpointed before their text reached the disk are downloaded again
+            stored_articles = storage.resume(directory, checkpoint.stored_articles.values())
+            checkpoint.stored_articles = {article.id: article for article in stored_articles}
+            logger.info(
+                f"Resume with {storage.num_articles} articles saved and {len(checkpoint.pending_urls)} URLs pending"
+            )
+        else:
+            storage.create(directory, force=True)
+            checkpoint = Checkpoint(directory)
+
+        checkpoint.start(start_date=datetime.today().date())
+        return storage, checkpoint
+
+    @staticmethod
+    def _check_arguments(search_term, num_articles, download_engine):
+        if download_engine not in ("threads", "async"):
+            raise ValueError(f"Unknown download engine: {download_engine}")
+        if num_articles is None and isinstance(search_term, str):
+            # Tag ranges end on their first day, but a single tag is searched back without end
+            raise ValueError("A number of articles is needed to know when to stop searching a single tag")
+
+    @staticmethod
+    def _create_searcher(
+            search_term, storage, checkpoint, num_days_searched_in_parallel, minimum_duration_minutes, lenient, http_cache
+    ):
+        if isinstance(search_term, str):
+            searcher = ArchiveSearcher(
+                search_term=search_term,
+                max_threads=num_days_searched_in_parallel,
+                minimum_duration_minutes=minimum_duration_minutes,
+                lenient=lenient,
+                start_date=checkpoint.next_search_date,
+                http_cache=http_cache,
+            )
+            tagged_days = (
+                (search_term, day, urls) for day, urls in searcher.iter_days(window=num_days_searched_in_parallel)
+            )
+            return searcher, tagged_days, TagQuotas({search_term: None})
+
+        # All the tags share the searching threads, and the pipeline after them
+        searcher = MultiTagSearcher(
+            tag_ranges=search_term,
+            max_threads=num_days_searched_in_parallel,
+            minimum_duration_minutes=minimum_duration_minutes,
+            lenient=lenient,
+            http_cache=http_cache,
+            searched_days=checkpoint.searched_tag_days,
+            num_stored=storage.catalog.count_by_search_term(),
+        )
+        return searcher, searcher.iter_days(), searcher.quotas
+
+    @staticmethod
+    def _get_next_url_batch(url_batches, retry_queue: RetryQueue) -> Tuple[List[str], bool]:
+        url_batch = next(url_batches, None)
+        if url_batch is not None:
+            urls = retry_queue.pop_due() + url_batch
+            retry_queue.start_downloads(urls)
+            return urls, False
+
+        # Every day has been searched, and only the downloads that may still have to be retried are left
+        time.sleep(0.1)
+        urls = retry_queue.pop_due()
+        retry_queue.start_downloads(urls)
+        return urls, retry_queue.is_settled()
+
+    @staticmethod
+    def _is_target_reached(storage: ArticleStorage, num_articles: Optional[int], quotas: TagQuotas) -> bool:
+        return (num_articles is not None and storage.num_articles >= num_articles) or quotas.all_reached()
+
+    @staticmethod
+    def _search_new_urls(tagged_days, deduplicator, checkpoint, article_tags: Optional[Dict[str, str]] = None):
+        for tag, day, urls in tagged_days:
+            new_urls = deduplicator.filter_new(urls)
+            checkpoint.record_day(day, new_urls, tag=tag)
+            if article_tags is not None:
+                article_tags.update((UrlDeduplicator.article_id(url), tag) for url in new_urls)
+            yield new_urls
+
+    @staticmethod
+    def _cancel_jobs_when_target_is_reached(jobs, done, storage, is_target_reached, keep_going, metrics):
+        while not done.wait(timeout=20):
+            logger.info(f"Number of articles saved: {storage.num_articles}")
+            logger.info(metrics.summary())
+
+        if not is_target_reached():
+            return
+
+        logger.info("Objective number of articles reached. Cancel the remaining jobs")
+        with keep_going.get_lock():
+            keep_going.value = 0
+
+        for job in jobs:
+            job.cancel()
+
+    @staticmethod
+    def _log_failures(outcomes: Counter[ErrorCodes], retry_queue: RetryQueue):
+        # The downloads still waiting for a retry when the pipeline stops are lost as well
+        lost = outcomes + retry_queue.pending_reasons()
+        for error_code in sorted(set(lost) | set(retry_queue.num_retries), key=lambda code: code.name):
+            if error_code == ErrorCodes.OK:
+                continue
+
+            logger.info(
+                f"{error_code.name}: {lost[error_code]} pages lost"
+                f" and {retry_queue.num_retries[error_code]} downloads retried"
+            )
+
+    @staticmethod
+    def _close_resources(*resources):
+        for resource in resources:
+            if resource is not None:
+                resource.close()
+
+    @staticmethod
+    def _discard_queued_pages(pages: multiprocessing.Queue):
+        while True:
+            try:
+                page = pages.get(block=True, timeout=0.1)
+            except queue.Empty:
+                return
+
+            if isinstance(page, (Page, Batch)):
+                page.release()
+
+    @classmethod
+    def _download_article_page(
+            cls,
+            url,
+            session_pool: Optional[SessionPool] = None,
+            page_transport=PageTransport.BYTES,
+            http_cache: Optional[HttpCache] = None,
+            page_archive: Optional[PageArchive] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_queue: Optional[RetryQueue] = None,
+    ) -> Optional[Page]:
         try:
-            response = requests.get(f"{url}", cls.HEADERS, timeout=15)
+            page = cls._fetch_article_page(url, session_pool, http_cache, rate_limiter)
+            if cls._retry_if_transient_failure(url, page, rate_limiter, retry_queue):
+                return None
+        finally:
+            if retry_queue is not None:
+                retry_queue.finish_download()
 
-            http_status_name = HTTPStatus(response.status_code).name
-            if http_status_name in ErrorCodeNames:
-                error_code = ErrorCodes[http_status_name]
-            else:
-                error_code = ErrorCodes.UNKNOWN_ERROR
+        if page_archive is not None:
+            page_archive.add(page)
 
-            return Page(response, error_code)
+        return page.pack(page_transport)
+
+    @classmethod
+    def _fetch_article_page(
+            cls,
+            url,
+            session_pool: Optional[SessionPool] = None,
+            http_cache: Optional[HttpCache] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+    ) -> Page:
+        get = (session_pool or cls.session_pool).get_session().get
+        if rate_limiter is not None:
+            get = functools.partial(rate_limiter.get, get)
+        if http_cache is not None:
+            # Pages served from the cache do not go through the rate limiter
+            get = functools.partial(http_cache.get, get)
+
+        try:
+            response = get(f"{url}", params=cls.HEADERS, timeout=15)
+
+            return Page(
+                url=response.url,
+                error_code=cls._status_code_to_error_code(response.status_code),
+                content=response.content,
+                encoding=response.encoding,
+            )
 
         except requests.exceptions.Timeout:
             warnings.warn(f"Timeout for url {url}")
-            return Page(None, ErrorCodes.TIMEOUT)
+            return Page(url, ErrorCodes.TIMEOUT)
 
         except requests.exceptions.ConnectionError:
-            return Page(None, ErrorCodes.CONNECTION_ERROR)
+            return Page(url, ErrorCodes.CONNECTION_ERROR)
 
         except requests.exceptions.MissingSchema:
-            return Page(None, ErrorCodes.MISSING_SCHEMA)
+            return Page(url, ErrorCodes.MISSING_SCHEMA)
+
+    @classmethod
+    async def _download_article_page_async(
+            cls,
+            session: aiohttp.ClientSession,
+            url,
+            page_transport=PageTransport.BYTES,
+            http_cache: Optional[HttpCache] = None,
+            page_archive: Optional[PageArchive] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_queue: Optional[RetryQueue] = None,
+    ) -> Optional[Page]:
+        try:
+            page = await cls._fetch_article_page_async(session, url, http_cache, rate_limiter)
+            if cls._retry_if_transient_failure(url, page, rate_limiter, retry_queue):
+                return None
+        finally:
+            if retry_queue is not None:
+                retry_queue.finish_download()
+
+        # Disk work runs off the event loop so it never stalls the downloads in flight
+        loop = asyncio.get_running_loop()
+        if page_archive is not None:
+            await loop.run_in_executor(None, page_archive.add, page)
+
+        return await loop.run_in_executor(None, page.pack, page_transport)
+
+    @classmethod
+    async def _fetch_article_page_async(
+            cls,
+            session: aiohttp.ClientSession,
+            url,
+            http_cache: Optional[HttpCache] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+    ) -> Page:
+        loop = asyncio.get_running_loop()
+        entry, content = None, None
+        if http_cache is not None:
+            entry, content = await loop.run_in_executor(None, http_cache.lookup_fresh, f"{url}")
+        if entry is not None and content is not None:
+            return cls._cached_page(entry, content)
+
+        try:
+            page, response = await cls._get_article_page_async(
+                session, url, HttpCache.validation_headers(entry), rate_limiter
+            )
+            if http_cache is None:
+                return page
+
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                content = await loop.run_in_executor(None, http_cache.revalidate, entry)
+                if entry is not None and content is not None:
+                    return cls._cached_page(entry, content)
+
+                # The body was evicted after the lookup, so the page is downloaded again without the validators
+                page, response = await cls._get_article_page_async(session, url, {}, rate_limiter)
+
+            await loop.run_in_executor(
+                None,
+                http_cache.record_download,
+                f"{url}",
+                response.status,
+                str(response.url),
+                page.content or b"",
+                page.encoding,
+                response.headers,
+            )
+            return page
+
+        except asyncio.TimeoutError:
+            warnings.warn(f"Timeout for url {url}")
+            return Page(url, ErrorCodes.TIMEOUT)
+
+        except aiohttp.InvalidURL:
+            return Page(url, ErrorCodes.MISSING_SCHEMA)
+
+        except aiohttp.ClientError:
+            return Page(url, ErrorCodes.CONNECTION_ERROR)
 
     @classmethod
-    def _page_to_article(cls, page) -> Tuple[Optional[Article], ErrorCodes]:
-        if page.error_code != ErrorCodes.OK:
-            return None, page.error_code
+    def _retry_if_transient_failure(
+            cls, url, page: Page, rate_limiter: Optional[RateLimiter], retry_queue: Optional[RetryQueue]
+    ) -> bool:
+        if retry_queue is None:
+            return False
+
+        if page.error_code not in cls.TRANSIENT_ERROR_CODES:
+            retry_queue.forget(f"{url}")
+            return False
+
+        # A throttled page is downloaded again once the host lets us in, any other one after an exponential backoff
+        delay_seconds = None
+        if rate_limiter is not None and page.error_code in cls.THROTTLING_ERROR_CODES:
+            delay_seconds = rate_limiter.blocked_seconds(f"{url}")
+
+        return retry_queue.retry(f"{url}", page.error_code, delay_seconds)
+
+    @classmethod
+    async def _get_article_page_async(
+            cls, session: aiohttp.ClientSession, url, headers, rate_limiter: Optional[RateLimiter]
+    ) -> Tuple[Page, aiohttp.ClientResponse]:
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async(f"{url}")
+
+        async with session.get(
+                f"{url}", params=cls.HEADERS, headers=headers, timeout=aiohttp.ClientTimeout(total=15)
+        ) as response:
+            page = Page(
+                url=str(response.url),
+                error_code=cls._status_code_to_error_code(response.status),
+                content=await response.read(),
+                encoding=requests.utils.get_encoding_from_headers(CaseInsensitiveDict(response.headers)),
+            )
+
+        if rate_limiter is not None:
+            rate_limiter.update(f"{url}", response.status, response.headers.get("Retry-After"))
+
+        return page, response
+
+    @staticmethod
+    def _cached_page(entry: CacheEntry, content: bytes) -> Page:
+        return Page(url=entry.url, error_code=ErrorCodes.OK, content=content, encoding=entry.encoding)
 
+    @staticmethod
+    def _status_code_to_error_code(status_code) -> ErrorCodes:
+        http_status_name = HTTPStatus(status_code).name
+        if http_status_name in ErrorCodeNames:
+            return ErrorCodes[http_status_name]
+
+        return ErrorCodes.UNKNOWN_ERROR
+
+    @classmethod
+    def _page_to_article(cls, page, parser: Optional[ArticleParser] = None) -> Tuple[Optional[Article], ErrorCodes]:
         try:
-            article_id, title, author, paragraphs, duration_minutes = cls._parse_article_page(page.response.text)
-        except TypeError as e:
-            logger.info(f"TypeError: {e}")
+            if page.error_code != ErrorCodes.OK:
+                return None, page.error_code
+
+            article_id, title, author, paragraphs, duration_minutes = cls._parse_article_page(page.read_text(), parser)
+        except (TypeError, AttributeError, IndexError) as e:
+            logger.info("%s: %s", type(e).__name__, e)
             return None, ErrorCodes.DECODING_ERROR
+        finally:
+            # Pages that were never read still hold their shared memory block, which nobody else would unlink
+            page.release()
 
         return Article(
             id=article_id,
-            url=cls._remove_query_parameters(page.response.url),
+            url=cls._remove_query_parameters(page.url),
             author=author,
             title=title,
             paragraphs=paragraphs,
@@ -220,29 +758,6 @@ class ArticleScraper(object):
         url_components = urlparse(url)
         return f"{url_components.scheme}://{url_components.netloc}{url_components.path}"
 
-    @staticmethod
-    def _parse_article_page(page_html):
-        def get_id():
-            parsely_post_id = soup.find("meta", attrs={"name": "parsely-post-id"})
-            if parsely_post_id:
-                return parsely_post_id["content"]
-
-            url = soup.find("meta", attrs={"property": "og:url"})["content"]
-            return url.split("-")[-1]
-
-        def get_duration_in_minutes():
-            min_read = soup.find(text=re.compile("min read"))
-            return int(re.findall(r"(\d+) min read", min_read.parent.text)[0])
-
-        soup = BeautifulSoup(page_html, "html.parser")
-
-        duration_minutes = get_duration_in_minutes()
-        article_id = get_id()
-        title = soup.find("meta", attrs={"name": "title"})["content"]
-        author = soup.find("meta", attrs={"name": "author"})["content"]
-        paragraphs = [
-            "".join(element.find_all(text=True))
-            for element in soup.find("article").find_all(["p", "li", "h1", "h2", "h3", "h4"])
-        ]
-
-        return article_id, title, author, paragraphs, duration_minutes
+    @classmethod
+    def _parse_article_page(cls, page_html, parser: Optional[ArticleParser] = None) -> ParsedArticle:
+        return (parser or cls.article_parser).parse(page_html)
@@ -1,14 +1,16 @@
-from datetime import datetime, timedelta
+from concurrent.futures import Future, wait
+from datetime import date, datetime, timedelta
 from http import HTTPStatus
 import logging
-import queue
-import threading
+from typing import Iterator, List, Optional, Tuple
 import warnings
 
 from bs4 import BeautifulSoup
 import requests
 
 from .article_searcher import ArticleSearcher
+from .day_window import DayWindow
+from ..http_cache import HttpCache
 
 
 logger = logging.getLogger(f"general_logger.{__name__}")
@@ -16,6 +18,7 @@ logger = logging.getLogger(f"general_logger.{__name__}")
 
 class ArchiveSearcher(ArticleSearcher):
     timeout = 15
+    base_url = "https://medium.com"
 
     HEADERS = {
         'accept': 'text/html,application/xhtml+xml,application/xml,application/json',
@@ -24,47 +27,67 @@ class ArchiveSearcher(ArticleSearcher):
                       ' Chrome/90.0.4430.85 Safari/537.36',
     }
 
-    def __init__(self, search_term: str, minimum_duration_minutes=None, lenient=True, max_threads=2):
+    def __init__(
+            self,
+            search_term: str,
+            minimum_duration_minutes=None,
+            lenient=True,
+            max_threads=2,
+            start_date: Optional[date] = None,
+            http_cache: Optional[HttpCache] = None,
+    ):
         super().__init__(search_term)
         self.minimum_duration_minutes = minimum_duration_minutes
         self.lenient = lenient
         self.max_threads = max_threads
-        self._query_date = datetime.today().date()
+        self._query_date = start_date or datetime.today().date()
+        self.http_cache = http_cache
+        self._days = DayWindow(max_threads)
 
     def get_next_batches(self, num_batches=1):
-        def download_urls():
-            while not dates.empty():
-                date = dates.get_nowait()
-                urls_list = self._get_articles_for_day(
-                    self.search_term, date, self.minimum_duration_minutes, self.lenient
-                )
-                for url in urls_list:
-                    urls.put(url)
-
-        num_download_threads = min(num_batches, self.max_threads)
-
-        dates = queue.Queue()
-        for i in range(1, num_batches + 1):
-            dates.put_nowait(self._query_date - timedelta(days=i))
-        self._query_date -= timedelta(days=num_batches)
-
-        urls = queue.Queue()
-        download_threads = []
-        for _ in range(num_download_threads):
-            thread = threading.Thread(target=download_urls, daemon=True, args=())
-            thread.start()
-            download_threads.append(thread)
-
-        for thread in download_threads:
-            thread.join()
-
-        return list(urls.queue)
+        days = [self._submit_next_day() for _ in range(num_batches)]
+        wait(days)
+
+        urls = []
+        for day in days:
+            urls += self._days.pop(day)[2]
+
+        return urls
+
+    def iter_batches(self, window: Optional[int] = None) -> Iterator[List[str]]:
+        return (urls for _, urls in self.iter_days(window))
+
+    def iter_days(self, window: Optional[int] = None) -> Iterator[Tuple[date, List[str]]]:
+        # The archive has no first day to stop at, so the search walks back until the caller stops it
+        days = self._days.iter_days(lambda: self._submit_next_day() is not None, window or self.max_threads)
+        return ((day, urls) for _, day, urls in days)
+
+    def close(self):
+        self._days.close()
+
+    def _submit_next_day(self) -> Future:
+        self._query_date -= timedelta(days=1)
+        return self._days.submit(
+            self.search_term,
+            self._query_date,
+            self._get_articles_for_day,
+            self.minimum_duration_minutes,
+            self.lenient,
+            http_cache=self.http_cache,
+        )
 
     @classmethod
-    def _get_articles_for_day(cls, tag: str, day: datetime.date, minimum_duration_minutes=None, lenient=True):
+    def _get_articles_for_day(
+            cls,
+            tag: str,
+            day: datetime.date,
+            minimum_duration_minutes=None,
+            lenient=True,
+            http_cache: Optional[HttpCache] = None,
+    ):
         logger.info(f"Get urls from day: {day}")
         try:
-            response = cls._download_tag_day_page(tag=tag, day=day)
+            response = cls._download_tag_day_page(tag=tag, day=day, http_cache=http_cache)
         except requests.exceptions.Timeout:
             warnings.warn(f"Timeout when getting articles for the day {day}")
             return []
@@ -76,8 +99,12 @@ class ArchiveSearcher(ArticleSearcher):
         return cls._get_article_urls_from_tag_day_page(response.text, minimum_duration_minutes, lenient)
 
     @classmethod
-    def _download_tag_day_page(cls, tag: str, day: datetime.date):
-        return requests.get(f"https://medium.com/tag/{tag}/archive/{day.strftime('%Y/%m/%d')}", timeout=cls.timeout)
+    def _download_tag_day_page(cls, tag: str, day: datetime.date, http_cache: Optional[HttpCache] = None):
+        url = f"{cls.base_url}/tag/{tag}/archive/{day.strftime('%Y/%m/%d')}"
+        if http_cache is not None:
+            return http_cache.get(requests.get, url, timeout=cls.timeout)
+
+        return requests.get(url, timeout=cls.timeout)
 
     @classmethod
     def _get_article_urls_from_tag_day_page(cls, tag_day_page: str, minimum_duration_minutes=None, lenient=True):
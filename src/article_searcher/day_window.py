@@ -0,0 +1,60 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class DayWindow(object):
+    def __init__(self, max_threads: int):
+        self.max_threads = max_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Dict[Future, Tuple[str, date]] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def submit(self, tag: str, day: date, function: Callable, *args, **kwargs) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="Archive day")
+
+        future = self._executor.submit(function, tag, day, *args, **kwargs)
+        self._in_flight[future] = (tag, day)
+
+        return future
+
+    def iter_days(self, submit_next_day: Callable[[], bool], window: int) -> Iterator[Tuple[str, date, List[str]]]:
+        # Days are handed out as soon as they complete, and each one is replaced right away to keep the window full
+        try:
+            while True:
+                while len(self._in_flight) < window and submit_next_day():
+                    pass
+
+                if not self._in_flight:
+                    return
+
+                done, _ = wait(self._in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self.pop(future)
+        finally:
+            self.cancel()
+
+    def pop(self, future: Future) -> Tuple[str, date, List[str]]:
+        tag, day = self._in_flight.pop(future)
+        try:
+            return tag, day, future.result()
+        except Exception as e:
+            logger.info(f"Error getting urls of tag {tag} from day {day}: {e}")
+            return tag, day, []
+
+    def cancel(self):
+        for future in self._in_flight:
+            future.cancel()
+        self._in_flight.clear()
+
+    def close(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,124 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+import logging
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .archive_searcher import ArchiveSearcher
+from .day_window import DayWindow
+from ..http_cache import HttpCache
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+@dataclass(frozen=True)
+class TagRange:
+    tag: str
+    start_date: date
+    end_date: date
+    quota: Optional[int] = None
+
+    def __post_init__(self):
+        if self.start_date > self.end_date:
+            raise ValueError(f"The range of tag {self.tag} starts on {self.start_date}, after its end {self.end_date}")
+
+    def days(self) -> Iterator[date]:
+        # Newest days first, like the archive searcher
+        day = self.end_date
+        while day >= self.start_date:
+            yield day
+            day -= timedelta(days=1)
+
+
+class TagQuotas(object):
+    def __init__(self, quotas: Dict[str, Optional[int]], num_stored: Optional[Dict[str, int]] = None):
+        self.quotas = quotas
+        self.num_stored: Counter = Counter({tag: (num_stored or {}).get(tag, 0) for tag in quotas})
+        self._lock = threading.Lock()
+
+    def is_reached(self, tag: str) -> bool:
+        quota = self.quotas.get(tag)
+        with self._lock:
+            return quota is not None and self.num_stored[tag] >= quota
+
+    def all_reached(self) -> bool:
+        return all(self.is_reached(tag) for tag in self.quotas)
+
+    def record_stored(self, tag: str):
+        with self._lock:
+            self.num_stored[tag] += 1
+
+
+class MultiTagSearcher(object):
+    def __init__(
+            self,
+            tag_ranges: Iterable[TagRange],
+            minimum_duration_minutes=None,
+            lenient=True,
+            max_threads=5,
+            http_cache: Optional[HttpCache] = None,
+            searched_days: Optional[Set[Tuple[str, date]]] = None,
+            num_stored: Optional[Dict[str, int]] = None,
+    ):
+        self.tag_ranges = list(tag_ranges)
+        self.minimum_duration_minutes = minimum_duration_minutes
+        self.lenient = lenient
+        self.max_threads = max_threads
+        self.http_cache = http_cache
+
+        quotas: Dict[str, Optional[int]] = {}
+        for tag_range in self.tag_ranges:
+            if tag_range.tag in quotas:
+                raise ValueError(f"Tag {tag_range.tag} has more than one range")
+            quotas[tag_range.tag] = tag_range.quota
+        self.quotas = TagQuotas(quotas, num_stored)
+
+        searched_days = searched_days or set()
+        self._days_left: Dict[str, Iterator[date]] = {
+            tag_range.tag: (day for day in tag_range.days() if (tag_range.tag, day) not in searched_days)
+            for tag_range in self.tag_ranges
+        }
+        self._turn = 0
+        self._days = DayWindow(max_threads)
+
+    def iter_days(self) -> Iterator[Tuple[str, date, List[str]]]:
+        return self._days.iter_days(self._submit_next_day, self.max_threads)
+
+    def close(self):
+        self._days.close()
+
+    def _next_tag_day(self) -> Optional[Tuple[str, date]]:
+        # The tags take turns, so that each of them gets the same share of the searching threads
+        for _ in range(len(self.tag_ranges)):
+            tag = self.tag_ranges[self._turn].tag
+            self._turn = (self._turn + 1) % len(self.tag_ranges)
+
+            if tag not in self._days_left:
+                continue
+
+            day = next(self._days_left[tag], None)
+            if day is None or self.quotas.is_reached(tag):
+                logger.info(f"Stop searching tag {tag}")
+                del self._days_left[tag]
+                continue
+
+            return tag, day
+
+        return None
+
+    def _submit_next_day(self) -> bool:
+        tag_day = self._next_tag_day()
+        if tag_day is None:
+            return False
+
+        tag, day = tag_day
+        self._days.submit(
+            tag,
+            day,
+            ArchiveSearcher._get_articles_for_day,
+            self.minimum_duration_minutes,
+            self.lenient,
+            http_cache=self.http_cache,
+        )
+        return True
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from .article import Article
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class ArticleShards(object):
+    SHARD_PREFIX = "articles-"
+    SHARD_SUFFIX = ".jsonl"
+    INDEX_SUFFIX = ".idx"
+
+    def __init__(self, directory, max_shard_bytes: int = 256 * 1024 ** 2):
+        self.directory = directory
+        self.max_shard_bytes = max_shard_bytes
+
+        self._lock = threading.Lock()
+        self._shard: Optional[BinaryIO] = None
+        self._index: Optional[BinaryIO] = None
+        self._shard_path = ""
+        self._shard_size = 0
+
+        shard_paths = self.shard_paths(directory)
+        self._shard_index = len(shard_paths)
+        if shard_paths:
+            # Keep appending to the last shard, once whatever a killed run left half written is cut off
+            self._shard_index -= 1
+            self._shard_size = self._recover(shard_paths[-1])
+
+    def add(self, article: Article) -> Tuple[str, int, int]:
+        line = (json.dumps(self.to_record(article), ensure_ascii=False) + "\n").encode("utf-8")
+
+        with self._lock:
+            if self._shard_size and self._shard_size + len(line) > self.max_shard_bytes:
+                self._close_shard()
+                self._shard_index += 1
+                self._shard_size = 0
+
+            shard, index = self._open_shard()
+            offset = self._shard_size
+            shard.write(line)
+            index.write(f"{article.id}\t{offset}\t{len(line)}\n".encode("utf-8"))
+            self._shard_size += len(line)
+
+            return self._shard_path, offset, len(line)
+
+    def flush(self):
+        with self._lock:
+            # The shard goes to disk before its index, so the index never points past the end of the shard
+            if self._shard is not None:
+                self._shard.flush()
+                self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._close_shard()
+
+    @classmethod
+    def read(cls, directory) -> Iterator[Article]:
+        for path in cls.shard_paths(directory):
+            with open(path, "rb") as shard:
+                for line in shard:
+                    if not line.endswith(b"\n"):
+                        logger.info(f"Stop reading truncated shard {path}")
+                        break
+                    yield cls.from_record(json.loads(line))
+
+    @classmethod
+    def read_index(cls, shard_path) -> Iterator[Tuple[str, int, int]]:
+        index_path = cls.index_path(shard_path)
+        if not os.path.isfile(index_path):
+            return
+
+        with open(index_path, "rb") as index:
+            for line in index:
+                fields = line.decode("utf-8").rstrip("\n").split("\t")
+                if not line.endswith(b"\n") or len(fields) != 3:
+                    break
+                yield fields[0], int(fields[1]), int(fields[2])
+
+    @classmethod
+    def shard_paths(cls, directory) -> List[str]:
+        if not os.path.isdir(directory):
+            return []
+
+        return sorted(
+            os.path.join(directory, file) for file in os.listdir(directory)
+            if file.startswith(cls.SHARD_PREFIX) and file.endswith(cls.SHARD_SUFFIX)
+        )
+
+    @classmethod
+    def index_path(cls, shard_path) -> str:
+        return shard_path[:-len(cls.SHARD_SUFFIX)] + cls.INDEX_SUFFIX
+
+    @staticmethod
+    def to_record(article: Article) -> dict:
+        return {
+            "id": article.id,
+            "url": article.url,
+            "title": article.title,
+            "author": article.author,
+            "duration_minutes": article.duration_minutes,
+            "paragraphs": article.paragraphs,
+        }
+
+    @staticmethod
+    def from_record(record: dict) -> Article:
+        return Article(**record)
+
+    def _recover(self, shard_path) -> int:
+        shard_size = os.path.getsize(shard_path)
+        entries = []
+        for article_id, offset, length in self.read_index(shard_path):
+            if offset + length > shard_size:
+                break
+            entries.append((article_id, offset, length))
+
+        end = entries[-1][1] + entries[-1][2] if entries else 0
+        if end < shard_size:
+            logger.info(f"Cut {shard_size - end} unindexed bytes off the end of shard {shard_path}")
+        os.truncate(shard_path, end)
+
+        with open(self.index_path(shard_path), "wb") as index:
+            index.writelines(f"{article_id}\t{offset}\t{length}\n".encode("utf-8") for article_id, offset, length in entries)
+
+        return end
+
+    def _open_shard(self) -> Tuple[BinaryIO, BinaryIO]:
+        if self._shard is None or self._index is None:
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            self._shard_path = os.path.join(
+                self.directory, f"{self.SHARD_PREFIX}{self._shard_index:05d}{self.SHARD_SUFFIX}"
+            )
+            self._shard = open(self._shard_path, "ab")
+            self._index = open(self.index_path(self._shard_path), "ab")
+
+        return self._shard, self._index
+
+    def _close_shard(self):
+        if self._shard is not None:
+            self._shard.close()
+            self._index.close()
+            self._shard = None
+            self._index = None
@@ -1,12 +1,22 @@
+import csv
+from enum import Enum
 import os
 from os import listdir
 from os import path
 from pathlib import Path
 import shutil
-
-import pandas as pd
+import time
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple, Union
 
 from .article import Article
+from .article_catalog import ArticleCatalog
+from .article_reader import ArticleReader
+from .article_shards import ArticleShards
+
+
+class StorageFormat(Enum):
+    TEXT = "text"
+    JSONL = "jsonl"
 
 
 class ArticleStorage(object):
@@ -15,14 +25,34 @@ class ArticleStorage(object):
     AUTHOR = "Author"
     TITLE = "Title"
     FIELDS = [ID, URL, AUTHOR, TITLE]
+    INDEX_FILE_NAME = "index.csv"
 
-    def __init__(self):
+    def __init__(
+            self,
+            storage_format: Union[str, StorageFormat] = StorageFormat.TEXT,
+            max_shard_bytes: int = 256 * 1024 ** 2,
+            index_flush_rows: int = 100,
+            index_flush_seconds: float = 5.0,
+    ):
+        self.storage_format = StorageFormat(storage_format)
+        self.max_shard_bytes = max_shard_bytes
+        self.index_flush_rows = index_flush_rows
+        self.index_flush_seconds = index_flush_seconds
         self.directory = None
-        self._metadata = None
+        self._num_articles = 0
+        self.catalog: Optional[ArticleCatalog] = None
+        self._shards: Optional[ArticleShards] = None
+        self._index: Optional[TextIO] = None
+        self._pending_rows: List[List[Optional[str]]] = []
+        self._last_flush_time = 0.0
 
     @property
     def num_articles(self) -> int:
-        return len(self._metadata)
+        return self._num_articles
+
+    @staticmethod
+    def open(directory, fields: Optional[Iterable[str]] = None) -> ArticleReader:
+        return ArticleReader(directory, fields)
 
     def create(self, directory, force=False):
         def directory_is_not_empty():
@@ -42,27 +72,116 @@ class ArticleStorage(object):
             Path(directory).mkdir(parents=True, exist_ok=True)
 
         self.directory = directory
-        self._metadata = []
+        self._open_index(directory, [])
+        self._open_shards()
+        self.catalog = ArticleCatalog(os.path.join(directory, ArticleCatalog.FILE_NAME))
+
+    def resume(self, directory, articles: Iterable[Article]) -> List[Article]:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        self.directory = directory
+        self._open_shards()
+
+        # The checkpoint may list articles whose text a killed run never flushed, which are left to download again
+        locations = self._stored_locations(directory)
+        articles = [article for article in articles if article.id in locations]
+        self._open_index(directory, articles)
+
+        # The catalog may lack the last articles stored before a crash, but keeps the details of the others
+        self.catalog = ArticleCatalog(os.path.join(directory, ArticleCatalog.FILE_NAME))
+        for article in articles:
+            self.catalog.add(article, location=locations[article.id], replace=False)
+
+        return articles
 
     def close(self):
-        pd.DataFrame(
-            self._metadata,
-            columns=self.FIELDS
-        ).to_csv(f"{self.directory}/index.csv", index=False, header=True)
+        if self._index is None:
+            return
+
+        self.flush()
+        self._index.close()
+        self._index = None
 
-    def add(self, article):
-        self._metadata.append(self._get_metadata(article))
-        self._article_to_text_file(article)
+        if self._shards is not None:
+            self._shards.close()
+        self.catalog.close()
 
-    @classmethod
-    def _get_metadata(cls, article: Article):
+    def contains(self, article_id: str) -> bool:
+        return self.catalog is not None and article_id in self.catalog
+
+    def add(self, article, search_term: Optional[str] = None):
+        if self.catalog is None:
+            raise ValueError("The storage must be created or resumed before adding articles")
+
+        if self._shards is not None:
+            path, offset, length = self._shards.add(article)
+            location = (os.path.basename(path), offset, length)
+        else:
+            location = self._article_to_text_file(article)
+
+        self.catalog.add(article, search_term=search_term, location=location)
+
+        # The row is only indexed after its article is written, so the index never lists a missing article
+        self._pending_rows.append(self._get_row(article))
+        self._num_articles += 1
+
+        if len(self._pending_rows) >= self.index_flush_rows or self._time_since_last_flush() >= self.index_flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self._shards is not None:
+            self._shards.flush()
+
+        csv.writer(self._index, lineterminator="\n").writerows(self._pending_rows)
+        self._index.flush()
+        self.catalog.flush()
+        self._pending_rows = []
+        self._last_flush_time = time.monotonic()
+
+    @staticmethod
+    def _get_row(article: Article) -> List[Optional[str]]:
+        return [article.id, article.url, article.author, article.title]
+
+    def _open_index(self, directory, articles: Iterable[Article]):
+        # The index starts over from the articles known to be stored, and is swapped in whole
+        index_path = os.path.join(directory, self.INDEX_FILE_NAME)
+        self._num_articles = 0
+        with open(f"{index_path}.tmp", "w", newline="", encoding="utf-8") as index:
+            writer = csv.writer(index, lineterminator="\n")
+            writer.writerow(self.FIELDS)
+            for article in articles:
+                writer.writerow(self._get_row(article))
+                self._num_articles += 1
+        os.replace(f"{index_path}.tmp", index_path)
+
+        self._index = open(index_path, "a", newline="", encoding="utf-8")
+        self._pending_rows = []
+        self._last_flush_time = time.monotonic()
+
+    def _time_since_last_flush(self) -> float:
+        return time.monotonic() - self._last_flush_time
+
+    def _stored_locations(self, directory) -> Dict[str, Tuple[str, int, int]]:
+        if self._shards is None:
+            return {
+                file[:-len(".txt")]: (file, 0, os.path.getsize(os.path.join(directory, file)))
+                for file in listdir(directory) if file.endswith(".txt")
+            }
+
+        # Opening the shards has cut off whatever their indexes do not cover
         return {
-            cls.ID: article.id,
-            cls.URL: article.url,
-            cls.AUTHOR: article.author,
-            cls.TITLE: article.title,
+            article_id: (os.path.basename(shard_path), offset, length)
+            for shard_path in ArticleShards.shard_paths(directory)
+            for article_id, offset, length in ArticleShards.read_index(shard_path)
         }
 
-    def _article_to_text_file(self, article):
-        with open(f"{self.directory}/{article.id}.txt", "w", encoding="utf-8") as file:
-            file.write("\n".join(article.paragraphs))
+    def _open_shards(self):
+        if self.storage_format == StorageFormat.JSONL:
+            self._shards = ArticleShards(self.directory, max_shard_bytes=self.max_shard_bytes)
+
+    def _article_to_text_file(self, article) -> Tuple[str, int, int]:
+        content = "\n".join(article.paragraphs).encode("utf-8")
+        with open(f"{self.directory}/{article.id}.txt", "wb") as file:
+            file.write(content)
+
+        return f"{article.id}.txt", 0, len(content)
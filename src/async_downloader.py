@@ -0,0 +1,151 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+import aiohttp
+
+from .map_reduce import BatchReader, MapReduce, StopSignal
+from .metrics import output_error_code, StageMetrics
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class AsyncDownloader(object):
+    queue_timeout_seconds = 2
+
+    def __init__(
+            self,
+            function: Callable[[aiohttp.ClientSession, str], Awaitable],
+            input_queue: multiprocessing.Queue,
+            output_queue: multiprocessing.Queue,
+            external_workers_to_wait_for=None,
+            num_active_workers=None,
+            max_concurrent_downloads: int = 200,
+            name: Optional[str] = None,
+            signal_downstream=False,
+            metrics: Optional[StageMetrics] = None,
+    ):
+        self.function = function
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.external_workers_to_wait_for = external_workers_to_wait_for
+        self.num_active_workers = num_active_workers
+        self.max_concurrent_downloads = max_concurrent_downloads
+        self.name = name
+        self.signal_downstream = signal_downstream
+        self.metrics = metrics
+
+        with num_active_workers.get_lock():
+            num_active_workers.value = 1
+
+        if metrics is not None:
+            metrics.set_workers(max_concurrent_downloads)
+
+        self.cancel_event = threading.Event()
+        self._input_reader = BatchReader(input_queue)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def join(self):
+        self._thread.join()
+
+    def cancel(self):
+        self.cancel_event.set()
+        MapReduce._wake_blocked_readers(self.input_queue)
+
+    def _run(self):
+        try:
+            asyncio.run(self._download_until_input_is_exhausted())
+        finally:
+            with self.num_active_workers.get_lock():
+                self.num_active_workers.value -= 1
+
+    async def _download_until_input_is_exhausted(self):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+        in_flight = set()
+
+        # Blocking queue operations run off the event loop so they never stall the downloads in flight
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"{self.name} queue") as queue_executor:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent_downloads)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                while not self.cancel_event.is_set():
+                    upstream_finished = self.external_workers_to_wait_for.value <= 0
+                    url = await loop.run_in_executor(queue_executor, self._get_next_input)
+                    if isinstance(url, StopSignal):
+                        break
+                    if url is None:
+                        if upstream_finished:
+                            break
+                        continue
+
+                    await semaphore.acquire()
+                    if self.cancel_event.is_set():
+                        semaphore.release()
+                        break
+                    task = asyncio.ensure_future(self._download(session, url, semaphore, queue_executor))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+
+                if self.cancel_event.is_set():
+                    for task in in_flight:
+                        task.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+            if self.signal_downstream:
+                await loop.run_in_executor(
+                    queue_executor,
+                    MapReduce._put_element_in_queue,
+                    StopSignal(),
+                    self.output_queue,
+                    self.queue_timeout_seconds,
+                    self.name,
+                    self.cancel_event,
+                )
+
+    def _get_next_input(self):
+        try:
+            return self._input_reader.get(block=True, timeout=self.queue_timeout_seconds)
+        except queue.Empty:
+            logger.debug("%s. Input queue is empty", self.name)
+            return None
+
+    async def _download(self, session, url, semaphore, queue_executor):
+        start = time.perf_counter()
+        try:
+            output = await self.function(session, url)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.record(time.perf_counter() - start, error=e)
+            logger.info("%s. Error applying function: %s", self.name, e)
+            return
+        finally:
+            semaphore.release()
+
+        if self.metrics is not None:
+            self.metrics.record(
+                time.perf_counter() - start,
+                num_outputs=int(output is not None),
+                error_code=output_error_code(output),
+            )
+
+        if output is None:
+            return
+
+        # Shielded so that a cancellation still hands the output over, or releases it, instead of dropping it silently
+        await asyncio.shield(asyncio.get_running_loop().run_in_executor(
+            queue_executor,
+            MapReduce._put_in_queue,
+            output,
+            self.output_queue,
+            self.queue_timeout_seconds,
+            self.name,
+            self.cancel_event,
+        ))
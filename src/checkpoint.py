@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from .article import Article
+from .url_deduplicator import UrlDeduplicator
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class Checkpoint(object):
+    FILE_NAME = "checkpoint.jsonl"
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self.start_date: Optional[date] = None
+        self.searched_days: Set[date] = set()
+        self.searched_tag_days: Set[Tuple[str, date]] = set()
+        self.found_urls: Dict[str, str] = {}
+        self.found_tags: Dict[str, str] = {}
+        self.stored_articles: Dict[str, Article] = {}
+
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, directory) -> "Checkpoint":
+        checkpoint = cls(directory)
+        if not os.path.isfile(checkpoint.path):
+            return checkpoint
+
+        with open(checkpoint.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    checkpoint._replay(json.loads(line))
+                except ValueError:
+                    # The process may have been killed halfway through writing the last line
+                    logger.info(f"Skip unreadable checkpoint line: {line[:100]}")
+
+        return checkpoint
+
+    @property
+    def pending_urls(self) -> List[str]:
+        return [url for article_id, url in self.found_urls.items() if article_id not in self.stored_articles]
+
+    @property
+    def next_search_date(self) -> Optional[date]:
+        if self.start_date is None:
+            return None
+
+        # Days complete out of order, so the search resumes after the last day with no gap before it
+        next_search_date = self.start_date
+        while next_search_date - timedelta(days=1) in self.searched_days:
+            next_search_date -= timedelta(days=1)
+
+        return next_search_date
+
+    def start(self, start_date: date):
+        with self._lock:
+            needs_new_line = self._last_line_is_incomplete()
+            self._file = open(self.path, "a", encoding="utf-8")
+            if needs_new_line:
+                self._file.write("\n")
+
+        if self.start_date is None:
+            self.start_date = start_date
+            self._write({"start": start_date.isoformat()})
+
+    def record_day(self, day: date, urls: List[str], tag: Optional[str] = None):
+        record = {"day": day.isoformat(), "urls": urls}
+        if tag is not None:
+            record["tag"] = tag
+        self._write(record)
+
+    def record_stored(self, article: Article):
+        self._write({"stored": {"id": article.id, "url": article.url, "title": article.title, "author": article.author}})
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _last_line_is_incomplete(self) -> bool:
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+            return False
+
+        with open(self.path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) != b"\n"
+
+    def _write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(f"{line}\n")
+            self._file.flush()
+
+    def _replay(self, record: dict):
+        if "start" in record:
+            self.start_date = date.fromisoformat(record["start"])
+        elif "day" in record:
+            day = date.fromisoformat(record["day"])
+            self.searched_days.add(day)
+            tag = record.get("tag")
+            if tag is not None:
+                self.searched_tag_days.add((tag, day))
+
+            for url in record["urls"]:
+                article_id = UrlDeduplicator.article_id(url)
+                self.found_urls[article_id] = url
+                if tag is not None:
+                    self.found_tags[article_id] = tag
+        elif "stored" in record:
+            article = Article(**record["stored"])
+            self.stored_articles[article.id] = article
@@ -0,0 +1,232 @@
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+import hashlib
+from http import HTTPStatus
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    url: str
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    size: int
+
+
+class HttpCache(object):
+    def __init__(self, directory, ttl_seconds: float = 7 * 24 * 3600, max_size_bytes: int = 10 * 1024 ** 3):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+
+        self.num_hits = 0
+        self.num_revalidations = 0
+        self.num_misses = 0
+
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._load_index()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, fetch: Callable[..., requests.Response], url: str, **kwargs) -> requests.Response:
+        entry, content = self.lookup_fresh(url)
+        if entry is not None and content is not None:
+            return self._to_response(entry, content)
+
+        headers = kwargs.pop("headers", None) or {}
+        response = fetch(url, headers={**headers, **self.validation_headers(entry)}, **kwargs)
+
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            content = self.revalidate(entry)
+            if entry is not None and content is not None:
+                return self._to_response(entry, content)
+
+            # The body was evicted after the lookup, so it is downloaded again without the validators
+            response = fetch(url, headers=headers, **kwargs)
+
+        self.record_download(url, response.status_code, response.url, response.content, response.encoding, response.headers)
+        return response
+
+    def lookup_fresh(self, url: str) -> Tuple[Optional[CacheEntry], Optional[bytes]]:
+        # The body is only returned when the entry can be served without asking the server
+        entry = self.lookup(url)
+        if entry is None or not self.is_fresh(entry):
+            return entry, None
+
+        content = self.read(entry)
+        if content is not None:
+            self.record_hit()
+
+        return entry, content
+
+    def revalidate(self, entry: Optional[CacheEntry]) -> Optional[bytes]:
+        # Called on a 304, which leaves the caller to download the page again when the body is gone
+        if entry is None:
+            return None
+
+        content = self.read(entry)
+        if content is not None:
+            self.record_revalidation()
+            self.refresh(entry)
+
+        return content
+
+    def record_download(
+            self,
+            url: str,
+            status_code: int,
+            response_url: str,
+            content: bytes,
+            encoding: Optional[str],
+            headers: Mapping[str, str],
+    ):
+        self.record_miss()
+        if status_code == HTTPStatus.OK:
+            self.store(url, response_url, content, encoding, headers)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        key = self._key(url)
+        try:
+            with open(self._path(key, ".json"), "r", encoding="utf-8") as file:
+                return CacheEntry(**json.load(file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at < self.ttl_seconds
+
+    def read(self, entry: CacheEntry) -> Optional[bytes]:
+        body_path = self._path(entry.key, ".body")
+        try:
+            with open(body_path, "rb") as file:
+                content = file.read()
+            # The body modification time is what orders the entries the next time the cache is opened
+            os.utime(body_path)
+        except OSError:
+            # Evicted by another thread between the lookup and the read
+            return None
+
+        with self._lock:
+            if entry.key in self._sizes:
+                self._sizes.move_to_end(entry.key)
+
+        return content
+
+    def store(self, url: str, response_url: str, content: bytes, encoding: Optional[str], headers: Mapping[str, str]):
+        key = self._key(url)
+        entry = CacheEntry(
+            key=key,
+            url=response_url,
+            encoding=encoding,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            stored_at=time.time(),
+            size=len(content),
+        )
+
+        Path(self._path(key, "")).parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomically(self._path(key, ".body"), content)
+        self._write_entry(entry)
+
+        with self._lock:
+            self._size += entry.size - self._sizes.pop(key, 0)
+            self._sizes[key] = entry.size
+            self._evict_least_recently_used()
+
+    def record_hit(self):
+        with self._lock:
+            self.num_hits += 1
+
+    def record_revalidation(self):
+        with self._lock:
+            self.num_revalidations += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.num_misses += 1
+
+    def refresh(self, entry: CacheEntry):
+        entry.stored_at = time.time()
+        self._write_entry(entry)
+
+    def close(self):
+        logger.info(
+            f"HTTP cache: {self.num_hits} hits, {self.num_revalidations} revalidated and {self.num_misses} misses"
+        )
+
+    @staticmethod
+    def validation_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def _load_index(self):
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+
+        bodies = sorted(Path(self.directory).glob("*/*.body"), key=lambda body: body.stat().st_mtime)
+        for body in bodies:
+            self._sizes[body.stem] = body.stat().st_size
+            self._size += self._sizes[body.stem]
+
+        with self._lock:
+            self._evict_least_recently_used()
+
+    def _evict_least_recently_used(self):
+        while self._size > self.max_size_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._size -= size
+            for suffix in (".json", ".body"):
+                try:
+                    os.remove(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def _write_entry(self, entry: CacheEntry):
+        self._write_atomically(self._path(entry.key, ".json"), json.dumps(asdict(entry)).encode("utf-8"))
+
+    @staticmethod
+    def _write_atomically(path: str, content: bytes):
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}{suffix}")
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _to_response(entry: CacheEntry, content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = HTTPStatus.OK
+        response.url = entry.url
+        response.encoding = entry.encoding
+        response._content = content
+        return response
@@ -0,0 +1,58 @@
+import threading
+from typing import Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool(object):
+    def __init__(
+            self,
+            pool_size: int = 10,
+            keep_alive: bool = True,
+            shared: bool = False,
+            verify: Union[bool, str] = True,
+    ):
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.shared = shared
+        self.verify = verify
+
+        self._local = threading.local()
+        self._shared_session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    def get_session(self) -> requests.Session:
+        if self.shared:
+            with self._lock:
+                if self._shared_session is None:
+                    self._shared_session = self._create_session()
+                return self._shared_session
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._create_session()
+            self._local.session = session
+
+        return session
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        # A thread sends one request at a time, so its own session never needs more than a connection per host.
+        # A shared session blocks for a free connection instead, so the pool size bounds the connections of all threads.
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size if self.shared else 1,
+            pool_block=self.shared,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.verify = self.verify
+        if self.verify is not True:
+            # Otherwise REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE silently take precedence over session.verify
+            session.trust_env = False
+
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
@@ -1,15 +1,129 @@
+from collections import deque
 from collections.abc import Iterable
 import logging
 import multiprocessing
 import queue
 import threading
+import time
 from typing import Callable, List, Optional, Union
 
+from .metrics import InstrumentedFunction, queue_depth, StageMetrics
+
 logger = logging.getLogger(f"general_logger.{__name__}")
 
 
+class StopSignal(object):
+    pass
+
+
+class Batch(list):
+    def release(self):
+        for element in self:
+            if hasattr(element, "release"):
+                element.release()
+
+
+class BatchWriter(object):
+    def __init__(self, q, batch_size, linger_seconds, name="Job name", cancel_event=None):
+        self.q = q
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self.name = name
+        self.cancel_event = cancel_event
+        self.pending = Batch()
+        self.first_pending_time = 0.0
+
+    def put(self, element, block=True, timeout=None):
+        if isinstance(element, StopSignal):
+            self.flush()
+            MapReduce._put_element_in_queue(
+                element, self.q, timeout or MapReduce.queue_timeout_seconds, self.name, self.cancel_event
+            )
+            return
+
+        if not self.pending:
+            self.first_pending_time = time.monotonic()
+        self.pending.append(element)
+
+        if len(self.pending) >= self.batch_size or self.linger_time_left() <= 0:
+            self.flush()
+
+    def linger_time_left(self):
+        return self.first_pending_time + self.linger_seconds - time.monotonic()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, Batch()
+        MapReduce._put_element_in_queue(batch, self.q, MapReduce.queue_timeout_seconds, self.name, self.cancel_event)
+
+
+class WorkerSlot(object):
+    park_seconds = 0.1
+
+    def __init__(self, index, target_workers):
+        self.index = index
+        self.target_workers = target_workers
+
+    def is_parked(self):
+        return self.index >= self.target_workers.value
+
+
+class BatchReader(object):
+    def __init__(self, q, writer: Optional[BatchWriter] = None, slot: Optional[WorkerSlot] = None):
+        self.q = q
+        self.writer = writer
+        self.slot = slot
+        self.pending: deque = deque()
+
+    def get(self, block=True, timeout=None):
+        if self.pending:
+            return self.pending.popleft()
+
+        if self.slot is not None and self.slot.is_parked():
+            # A parked worker hands over its partial batch and leaves the input to the active workers
+            if self.writer is not None:
+                self.writer.flush()
+            time.sleep(self.slot.park_seconds if timeout is None else min(self.slot.park_seconds, timeout))
+            raise queue.Empty
+
+        if self.writer is not None and self.writer.pending:
+            # Hand over the partial batch once it has lingered, instead of holding it while the input is idle
+            linger_time_left = max(self.writer.linger_time_left(), 0)
+            if timeout is None or linger_time_left < timeout:
+                try:
+                    return self._unbatch(self.q.get(block=True, timeout=linger_time_left))
+                except queue.Empty:
+                    self.writer.flush()
+                    timeout = None if timeout is None else timeout - linger_time_left
+
+        return self._unbatch(self.q.get(block=True, timeout=timeout))
+
+    def put(self, element, block=True, timeout=None):
+        self.q.put(element, block=block, timeout=timeout)
+
+    def release(self):
+        Batch(self.pending).release()
+        self.pending.clear()
+
+    def _unbatch(self, element):
+        if not isinstance(element, Batch):
+            return element
+
+        self.pending.extend(element)
+        if not self.pending:
+            raise queue.Empty
+        return self.pending.popleft()
+
+
 class MapReduce(object):
     queue_timeout_seconds = 2
+    # Elements put by other processes may still be on their way through the pipe when the upstream workers finish
+    drain_timeout_seconds = 0.5
+    autoscale_interval_seconds = 2.0
+    scale_up_utilization = 0.75
+    scale_down_utilization = 0.3
 
     def __init__(
             self,
@@ -20,14 +134,43 @@ class MapReduce(object):
             external_workers_to_wait_for=None,
             num_active_workers=None,
             name: Optional[str] = None,
-            concurrent=False
+            concurrent=False,
+            signal_downstream=False,
+            batch_size: int = 1,
+            linger_seconds: float = 0.05,
+            metrics: Optional[StageMetrics] = None,
+            max_workers: Optional[int] = None,
     ):
+        if max_workers is not None and max_workers > num_workers and input_queue is None:
+            raise ValueError("Only jobs with an input queue can be autoscaled")
+
         self.input_queue = input_queue
         self.output_queue = output_queue
         self.name = name
+        self.concurrent = concurrent
+        self.signal_downstream = signal_downstream and output_queue is not None
+        self._signal_thread: Optional[threading.Thread] = None
+        self.cancel_event = multiprocessing.Event() if concurrent else threading.Event()
+
+        # Every worker up to the maximum is started, and the ones over the target number of workers stay parked
+        self.min_workers = num_workers
+        self.max_workers = max(max_workers or num_workers, num_workers)
+        self.target_workers = multiprocessing.Value("i", num_workers)
+        self.num_active_workers = num_active_workers
+        self._autoscaler_thread: Optional[threading.Thread] = None
+        self._autoscaler_stop_event = threading.Event()
 
         with num_active_workers.get_lock():
-            num_active_workers.value = num_workers
+            num_active_workers.value = self.max_workers
+
+        if metrics is None and self.max_workers > self.min_workers:
+            # The utilization of the workers decides when to scale
+            metrics = StageMetrics(name or "Job name")
+        self.metrics = metrics
+
+        if metrics is not None:
+            metrics.set_workers(num_workers)
+            function = InstrumentedFunction(function, metrics, input_queue is not None, output_queue is not None)
 
         if not concurrent:
             self.workers: List[Union[threading.Thread, multiprocessing.Process]] = [
@@ -40,10 +183,15 @@ class MapReduce(object):
                         output_queue,
                         external_workers_to_wait_for,
                         num_active_workers,
-                        f"{name} (worker {i})"
+                        f"{name} (worker {i})",
+                        self.signal_downstream,
+                        self.cancel_event,
+                        batch_size,
+                        linger_seconds,
+                        self._slot(i),
                     )
                 )
-                for i in range(num_workers)
+                for i in range(self.max_workers)
             ]
         else:
             self.workers = [
@@ -55,133 +203,306 @@ class MapReduce(object):
                         output_queue,
                         external_workers_to_wait_for,
                         num_active_workers,
-                        f"{name} (worker {i})"
+                        f"{name} (worker {i})",
+                        False,
+                        self.cancel_event,
+                        batch_size,
+                        linger_seconds,
+                        self._slot(i),
                     )
                 )
-                for i in range(num_workers)
+                for i in range(self.max_workers)
             ]
 
+    @property
+    def num_workers(self):
+        return self.target_workers.value
+
     def start(self):
         for work in self.workers:
             work.start()
 
+        if self.concurrent and self.signal_downstream:
+            self._signal_thread = threading.Thread(target=self._signal_downstream_when_workers_exit, daemon=True)
+            self._signal_thread.start()
+
+        if self.max_workers > self.min_workers:
+            self._autoscaler_thread = threading.Thread(target=self._autoscale_until_finished, daemon=True)
+            self._autoscaler_thread.start()
+
     def join(self):
         for work in self.workers:
             work.join()
 
+        if self._signal_thread is not None:
+            self._signal_thread.join()
+
+        if self._autoscaler_thread is not None:
+            self._autoscaler_stop_event.set()
+            self._autoscaler_thread.join()
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.input_queue is not None:
+            self._wake_blocked_readers(self.input_queue, self.max_workers)
+
+    def resize(self, num_workers):
+        num_workers = min(max(num_workers, self.min_workers), self.max_workers)
+        if num_workers == self.target_workers.value:
+            return
+
+        logger.info(f"{self.name}. Scale from {self.target_workers.value} to {num_workers} workers")
+        self.target_workers.value = num_workers
+        self.metrics.set_workers(num_workers)
+
+    def next_num_workers(self, utilization, input_queue_depth):
+        # Busy workers with a backlog need help, while idle ones are waiting on their input or their output
+        if utilization >= self.scale_up_utilization and input_queue_depth != 0:
+            return self.num_workers + max(1, self.num_workers // 4)
+        if utilization < self.scale_down_utilization:
+            return self.num_workers - 1
+
+        return self.num_workers
+
+    def _slot(self, index):
+        return WorkerSlot(index, self.target_workers) if self.max_workers > self.min_workers else None
+
+    def _autoscale_until_finished(self):
+        busy_seconds = self.metrics.snapshot()["busy_seconds"]
+
+        while not self._autoscaler_stop_event.wait(self.autoscale_interval_seconds):
+            if self.cancel_event.is_set() or self.num_active_workers.value == 0:
+                return
+
+            snapshot = self.metrics.snapshot()
+            utilization = (snapshot["busy_seconds"] - busy_seconds) / (self.autoscale_interval_seconds * self.num_workers)
+            busy_seconds = snapshot["busy_seconds"]
+
+            self.resize(self.next_num_workers(utilization, queue_depth(self.input_queue)))
+
+    def _signal_downstream_when_workers_exit(self):
+        # A worker process flushes its queue buffers when it exits, so the signal is queued behind all of its outputs
+        for work in self.workers:
+            work.join()
+
+        self._put_element_in_queue(
+            StopSignal(), self.output_queue, self.queue_timeout_seconds, self.name, self.cancel_event
+        )
+
     @classmethod
     def run_function_in_loop(
-            cls, function, input_queue, output_queue, external_workers_to_wait_for, num_active_workers, name
+            cls,
+            function,
+            input_queue,
+            output_queue,
+            external_workers_to_wait_for,
+            num_active_workers,
+            name,
+            signal_downstream=False,
+            cancel_event=None,
+            batch_size=1,
+            linger_seconds=0.05,
+            slot=None,
     ):
+        cancel_event = cancel_event or threading.Event()
+
+        writer = None
+        if output_queue is not None and batch_size > 1:
+            writer = output_queue = BatchWriter(output_queue, batch_size, linger_seconds, name, cancel_event)
+        if input_queue is not None:
+            input_queue = BatchReader(input_queue, writer, slot)
+
         if input_queue is None and output_queue is not None:
             cls._fill_output_queue_until_finished_or_stop_event_is_set(
-                function, output_queue, external_workers_to_wait_for, name
+                function, output_queue, external_workers_to_wait_for, name, cancel_event
             )
         elif input_queue is not None and output_queue is None:
-            cls._consume_input_queue_until_stop_event_is_set(
-                function, input_queue, external_workers_to_wait_for, name
+            stopped = cls._consume_input_queue_until_stop_event_is_set(
+                function, input_queue, external_workers_to_wait_for, name, cancel_event
             )
-            cls._consume_input_queue_until_it_is_empty(function, input_queue, name)
+            if not stopped:
+                cls._consume_input_queue_until_it_is_empty(function, input_queue, name, cancel_event)
         else:
-            cls._run_until_stop_event_is_set(function, input_queue, output_queue, external_workers_to_wait_for, name)
-            cls._run_until_input_queue_is_empty(function, input_queue, output_queue, name)
+            stopped = cls._run_until_stop_event_is_set(
+                function, input_queue, output_queue, external_workers_to_wait_for, name, cancel_event
+            )
+            if not stopped:
+                cls._run_until_input_queue_is_empty(function, input_queue, output_queue, name, cancel_event)
+
+        if writer is not None:
+            writer.flush()
 
         with num_active_workers.get_lock():
             num_active_workers.value -= 1
+            is_last_worker = num_active_workers.value == 0
+
+        if cancel_event.is_set():
+            cls._abandon_buffered_elements(input_queue, output_queue)
+
+        # Threads share their process' queue buffer, so the last one to finish queues the signal behind every output
+        if signal_downstream and is_last_worker:
+            cls._put_element_in_queue(StopSignal(), output_queue, cls.queue_timeout_seconds, name, cancel_event)
+
+    @staticmethod
+    def _abandon_buffered_elements(input_reader, output_queue):
+        if input_reader is not None:
+            input_reader.release()
+
+        # Nobody reads what is still buffered after a cancellation, so flushing it must not block the exit
+        for q in (input_reader, output_queue):
+            q = getattr(q, "q", q)
+            if hasattr(q, "cancel_join_thread"):
+                q.cancel_join_thread()
+
+    @staticmethod
+    def _wake_blocked_readers(q, num_readers=1):
+        # Workers waiting on an empty input only see the cancellation once their read times out. Each one gets its
+        # own signal, since a cancelled process may exit before the signal it hands on leaves its queue buffer
+        try:
+            for _ in range(num_readers):
+                q.put_nowait(StopSignal())
+        except queue.Full:
+            # Readers of a full queue are not blocked
+            pass
+
+        # Nobody may be left to read the signal, so flushing it must not block the exit
+        if hasattr(q, "cancel_join_thread"):
+            q.cancel_join_thread()
 
     @classmethod
-    def _put_in_queue(cls, value, q, timeout=5, name="Job name"):
+    def _is_stop_signal(cls, input, input_queue, name, cancel_event=None):
+        if not isinstance(input, StopSignal):
+            return False
+
+        # Hand the signal on to the sibling workers reading from the same queue
+        cls._put_element_in_queue(input, input_queue, cls.queue_timeout_seconds, name, cancel_event)
+        return True
+
+    @classmethod
+    def _put_in_queue(cls, value, q, timeout=5, name="Job name", cancel_event=None):
         if isinstance(value, Iterable):
             for element in value:
-                cls._put_element_in_queue(element, q, timeout, name)
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                cls._put_element_in_queue(element, q, timeout, name, cancel_event)
         else:
-            cls._put_element_in_queue(value, q, timeout, name)
+            cls._put_element_in_queue(value, q, timeout, name, cancel_event)
 
     @staticmethod
-    def _put_element_in_queue(element, q, timeout=5, name="Job name"):
+    def _put_element_in_queue(element, q, timeout=5, name="Job name", cancel_event=None):
         while True:
             try:
                 q.put(element, block=True, timeout=timeout)
                 return
             except queue.Full:
-                logger.info(f"{name}. Output queue is full. Trying to put element: {element}")
+                if cancel_event is not None and cancel_event.is_set():
+                    # Nobody will read the element, so give back whatever it holds outside the process
+                    if hasattr(element, "release"):
+                        element.release()
+                    return
+                logger.info("%s. Output queue is full. Trying to put element: %s", name, element)
 
     @classmethod
     def _fill_output_queue_until_finished_or_stop_event_is_set(
-            cls, function, output_queue, external_workers_to_wait_for, name
+            cls, function, output_queue, external_workers_to_wait_for, name, cancel_event
     ):
-        while external_workers_to_wait_for.value > 0:
+        while external_workers_to_wait_for.value > 0 and not cancel_event.is_set():
             try:
                 output, is_finished = function()
             except Exception as e:
-                logger.info(f"{name}. Error applying function: {e}")
+                logger.info("%s. Error applying function: %s", name, e)
                 continue
 
-            cls._put_in_queue(output, output_queue, cls.queue_timeout_seconds, name)
+            cls._put_in_queue(output, output_queue, cls.queue_timeout_seconds, name, cancel_event)
+            if isinstance(output_queue, BatchWriter):
+                # Sources produce their outputs in bursts, so the end of a burst is a natural batch boundary
+                output_queue.flush()
 
             if is_finished:
                 break
 
     @classmethod
     def _consume_input_queue_until_stop_event_is_set(
-            cls, function, input_queue, external_workers_to_wait_for, name
+            cls, function, input_queue, external_workers_to_wait_for, name, cancel_event
     ):
-        while external_workers_to_wait_for.value > 0:
+        while external_workers_to_wait_for.value > 0 and not cancel_event.is_set():
             try:
                 input = input_queue.get(block=True, timeout=cls.queue_timeout_seconds)
             except queue.Empty:
-                logger.info(f"{name}. Input queue is empty")
+                logger.debug("%s. Input queue is empty", name)
                 continue
 
+            if cls._is_stop_signal(input, input_queue, name, cancel_event):
+                return True
+
             try:
                 function(input)
             except Exception as e:
-                logger.info(f"{name}. Error applying function: {e}")
+                logger.info("%s. Error applying function: %s", name, e)
                 continue
 
+        return False
+
     @classmethod
-    def _consume_input_queue_until_it_is_empty(cls, function, input_queue, name):
-        while True:
+    def _consume_input_queue_until_it_is_empty(cls, function, input_queue, name, cancel_event):
+        while not cancel_event.is_set():
             try:
-                input = input_queue.get_nowait()
+                input = input_queue.get(block=True, timeout=cls.drain_timeout_seconds)
             except queue.Empty:
                 return
 
+            if cls._is_stop_signal(input, input_queue, name, cancel_event):
+                return
+
             try:
                 function(input)
             except Exception as e:
-                logger.info(f"{name}. Error applying function: {e}")
+                logger.info("%s. Error applying function: %s", name, e)
                 continue
 
     @classmethod
-    def _run_until_stop_event_is_set(cls, function, input_queue, output_queue, external_workers_to_wait_for, name):
-        while external_workers_to_wait_for.value > 0:
+    def _run_until_stop_event_is_set(
+            cls, function, input_queue, output_queue, external_workers_to_wait_for, name, cancel_event
+    ):
+        while external_workers_to_wait_for.value > 0 and not cancel_event.is_set():
             try:
                 input = input_queue.get(block=True, timeout=cls.queue_timeout_seconds)
             except queue.Empty:
-                logger.info(f"{name}. Input queue is empty")
+                logger.debug("%s. Input queue is empty", name)
                 continue
 
+            if cls._is_stop_signal(input, input_queue, name, cancel_event):
+                return True
+
             try:
                 output = function(input)
             except Exception as e:
-                logger.info(f"{name}. Error applying function: {e}")
+                logger.info("%s. Error applying function: %s", name, e)
                 continue
 
-            cls._put_element_in_queue(output, output_queue, cls.queue_timeout_seconds, name)
+            # Functions return None when an input gives nothing to pass on, like a download put off for a retry
+            if output is not None:
+                cls._put_element_in_queue(output, output_queue, cls.queue_timeout_seconds, name, cancel_event)
+
+        return False
 
     @classmethod
-    def _run_until_input_queue_is_empty(cls, function, input_queue, output_queue, name):
-        while True:
+    def _run_until_input_queue_is_empty(cls, function, input_queue, output_queue, name, cancel_event):
+        while not cancel_event.is_set():
             try:
-                input = input_queue.get_nowait()
+                input = input_queue.get(block=True, timeout=cls.drain_timeout_seconds)
             except queue.Empty:
                 return
 
+            if cls._is_stop_signal(input, input_queue, name, cancel_event):
+                return
+
             try:
                 output = function(input)
             except Exception as e:
-                logger.info(f"{name}. Error applying function: {e}")
+                logger.info("%s. Error applying function: %s", name, e)
                 continue
 
-            cls._put_element_in_queue(output, output_queue, cls.queue_timeout_seconds, name)
+            # Functions return None when an input gives nothing to pass on, like a download put off for a retry
+            if output is not None:
+                cls._put_element_in_queue(output, output_queue, cls.queue_timeout_seconds, name, cancel_event)
@@ -0,0 +1,293 @@
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sized, Tuple
+
+from .page import ErrorCodes
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+def queue_depth(q) -> int:
+    try:
+        return q.qsize()
+    except NotImplementedError:
+        # macOS does not implement sem_getvalue
+        return -1
+
+
+def output_error_code(output) -> Optional[ErrorCodes]:
+    # Downloads output pages, and parses output articles paired with their error code
+    error_code = output[-1] if isinstance(output, tuple) and output else getattr(output, "error_code", None)
+    return error_code if isinstance(error_code, ErrorCodes) else None
+
+
+class StageMetrics(object):
+    LATENCY_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    MAX_ERROR_TYPES = 16
+    ERROR_NAME_BYTES = 64
+    ITEMS_IN, ITEMS_OUT, ERRORS, BUSY_SECONDS, LATENCY_SUM, WORKERS = range(6)
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+
+        # Shared memory, so that the workers of a stage report to the same counters whether they are threads or processes
+        self._lock = multiprocessing.Lock()
+        self._values = multiprocessing.Array("d", 6, lock=False)
+        self._latency_counts = multiprocessing.Array("d", len(self.LATENCY_BUCKETS_SECONDS) + 1, lock=False)
+        self._error_counts = multiprocessing.Array("d", self.MAX_ERROR_TYPES, lock=False)
+        self._error_names = multiprocessing.Array("c", self.MAX_ERROR_TYPES * self.ERROR_NAME_BYTES, lock=False)
+
+    def record(
+            self,
+            seconds: float,
+            num_inputs: int = 1,
+            num_outputs: int = 1,
+            error: Optional[Exception] = None,
+            error_code: Optional[ErrorCodes] = None,
+    ):
+        bucket = next(
+            (i for i, bound in enumerate(self.LATENCY_BUCKETS_SECONDS) if seconds <= bound),
+            len(self.LATENCY_BUCKETS_SECONDS),
+        )
+
+        with self._lock:
+            self._values[self.ITEMS_IN] += num_inputs
+            self._values[self.BUSY_SECONDS] += seconds
+            self._values[self.LATENCY_SUM] += seconds
+            self._latency_counts[bucket] += 1
+
+            if error is not None:
+                self._count_error(type(error).__name__)
+                return
+
+            # Failed pages are handed on rather than raised, so they count as outputs as well as errors
+            self._values[self.ITEMS_OUT] += num_outputs
+            if error_code is not None and error_code != ErrorCodes.OK:
+                self._count_error(error_code.name)
+
+    def set_workers(self, num_workers: int):
+        with self._lock:
+            self._values[self.WORKERS] = num_workers
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = list(self._values)
+            latency_counts = list(self._latency_counts)
+            errors = {
+                self._error_name(slot): int(self._error_counts[slot])
+                for slot in range(self.MAX_ERROR_TYPES) if self._error_counts[slot]
+            }
+
+        elapsed_seconds = max(time.time() - self.started_at, 1e-9)
+        workers = values[self.WORKERS]
+
+        return {
+            "items_in": int(values[self.ITEMS_IN]),
+            "items_out": int(values[self.ITEMS_OUT]),
+            "errors": int(values[self.ERRORS]),
+            "errors_by_type": errors,
+            "workers": int(workers),
+            "busy_seconds": values[self.BUSY_SECONDS],
+            "utilization": values[self.BUSY_SECONDS] / (elapsed_seconds * workers) if workers else 0.0,
+            "items_out_per_second": values[self.ITEMS_OUT] / elapsed_seconds,
+            "latency_seconds": {
+                "buckets": [
+                    (bound, int(latency_counts[i]))
+                    for i, bound in enumerate(self.LATENCY_BUCKETS_SECONDS + (float("inf"),))
+                ],
+                "count": int(sum(latency_counts)),
+                "sum": values[self.LATENCY_SUM],
+            },
+        }
+
+    def _count_error(self, error_name: str):
+        self._values[self.ERRORS] += 1
+        self._error_counts[self._error_slot(error_name)] += 1
+
+    def _error_slot(self, error_name: str) -> int:
+        encoded = error_name.encode("utf-8")[:self.ERROR_NAME_BYTES]
+        for slot in range(self.MAX_ERROR_TYPES):
+            name = self._error_name(slot)
+            if not name:
+                start = slot * self.ERROR_NAME_BYTES
+                self._error_names[start:start + len(encoded)] = encoded
+                return slot
+            if name == error_name[:self.ERROR_NAME_BYTES]:
+                return slot
+
+        # Every slot is taken, so the rarest types end up counted together with the last one
+        return self.MAX_ERROR_TYPES - 1
+
+    def _error_name(self, slot: int) -> str:
+        start = slot * self.ERROR_NAME_BYTES
+        return self._error_names[start:start + self.ERROR_NAME_BYTES].rstrip(b"\0").decode("utf-8", errors="replace")
+
+
+class InstrumentedFunction(object):
+    def __init__(self, function: Callable, metrics: StageMetrics, has_input: bool, has_output: bool):
+        self.function = function
+        self.metrics = metrics
+        self.has_input = has_input
+        self.has_output = has_output
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        try:
+            output = self.function(*args)
+        except Exception as e:
+            self.metrics.record(time.perf_counter() - start, num_inputs=int(self.has_input), error=e)
+            raise
+
+        self.metrics.record(
+            time.perf_counter() - start,
+            int(self.has_input),
+            self._count_outputs(output),
+            error_code=output_error_code(output),
+        )
+        return output
+
+    def _count_outputs(self, output) -> int:
+        if output is None and self.has_output:
+            return 0
+        if self.has_input or not self.has_output:
+            return 1
+
+        # Sources return their outputs together with whether they are finished, and each output is queued on its own
+        output = output[0]
+        return len(output) if isinstance(output, Sized) and isinstance(output, Iterable) else 1
+
+
+class PipelineMetrics(object):
+    def __init__(self, sample_interval_seconds: float = 1.0, max_samples: int = 3600):
+        self.sample_interval_seconds = sample_interval_seconds
+        self.stages: Dict[str, StageMetrics] = {}
+        self.queues: Dict[str, multiprocessing.Queue] = {}
+        self.queue_samples: Dict[str, Deque[Tuple[float, int]]] = {}
+
+        self._max_samples = max_samples
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._server.server_port if self._server is not None else None
+
+    def stage(self, name: str) -> StageMetrics:
+        if name not in self.stages:
+            self.stages[name] = StageMetrics(name)
+
+        return self.stages[name]
+
+    def watch_queue(self, name: str, q: multiprocessing.Queue):
+        self.queues[name] = q
+        self.queue_samples[name] = deque(maxlen=self._max_samples)
+
+    def start(self, port: Optional[int] = None):
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._sample_queues_until_stopped, daemon=True)
+        self._sampler.start()
+
+        if port is not None:
+            self._server = self._serve_prometheus(port)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def snapshot(self) -> dict:
+        return {
+            "stages": {name: stage.snapshot() for name, stage in self.stages.items()},
+            "queues": {
+                name: {
+                    "depth": queue_depth(q),
+                    "max_depth": max((depth for _, depth in self.queue_samples[name]), default=0),
+                    "samples": list(self.queue_samples[name]),
+                }
+                for name, q in self.queues.items()
+            },
+        }
+
+    def summary(self) -> str:
+        snapshot = self.snapshot()
+        stages = ", ".join(
+            f"{name} {stage['items_out']} out ({stage['items_out_per_second']:.1f}/s,"
+            f" {stage['utilization']:.0%} busy, {stage['errors']} errors)"
+            for name, stage in snapshot["stages"].items()
+        )
+        queues = ", ".join(f"{name} {queue['depth']}" for name, queue in snapshot["queues"].items())
+
+        return f"Stages: {stages}. Queues: {queues}"
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def add(metric, metric_type, samples):
+            lines.append(f"# TYPE {metric} {metric_type}")
+            lines.extend(f"{metric}{{{labels}}} {value}" for labels, value in samples)
+
+        stages = snapshot["stages"].items()
+        add("scraper_stage_items_in_total", "counter", [(f'stage="{n}"', s["items_in"]) for n, s in stages])
+        add("scraper_stage_items_out_total", "counter", [(f'stage="{n}"', s["items_out"]) for n, s in stages])
+        add(
+            "scraper_stage_errors_total",
+            "counter",
+            [(f'stage="{n}",type="{t}"', count) for n, s in stages for t, count in s["errors_by_type"].items()],
+        )
+        add("scraper_stage_busy_seconds_total", "counter", [(f'stage="{n}"', s["busy_seconds"]) for n, s in stages])
+        add("scraper_stage_workers", "gauge", [(f'stage="{n}"', s["workers"]) for n, s in stages])
+
+        lines.append("# TYPE scraper_stage_latency_seconds histogram")
+        for name, stage in stages:
+            cumulative = 0
+            for bound, count in stage["latency_seconds"]["buckets"]:
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else bound
+                lines.append(f'scraper_stage_latency_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'scraper_stage_latency_seconds_sum{{stage="{name}"}} {stage["latency_seconds"]["sum"]}')
+            lines.append(f'scraper_stage_latency_seconds_count{{stage="{name}"}} {stage["latency_seconds"]["count"]}')
+
+        add("scraper_queue_depth", "gauge", [(f'queue="{n}"', q["depth"]) for n, q in snapshot["queues"].items()])
+
+        return "\n".join(lines) + "\n"
+
+    def _sample_queues_until_stopped(self):
+        while not self._stop_event.wait(self.sample_interval_seconds):
+            now = time.time()
+            for name, q in self.queues.items():
+                self.queue_samples[name].append((now, queue_depth(q)))
+
+    def _serve_prometheus(self, port: int) -> ThreadingHTTPServer:
+        metrics = self
+
+        class PrometheusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), PrometheusHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"Serve pipeline metrics on http://127.0.0.1:{server.server_port}/metrics")
+
+        return server
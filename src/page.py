@@ -0,0 +1,85 @@
+from dataclasses import dataclass, replace
+from enum import Enum
+from http import HTTPStatus
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+import zlib
+
+
+class ErrorCodes(Enum):
+    MISSING_SCHEMA = 1
+    CONNECTION_ERROR = 2
+    TIMEOUT = 3
+    DECODING_ERROR = 4
+    OK = HTTPStatus.OK.value
+    NOT_FOUND = HTTPStatus.NOT_FOUND.value
+    FORBIDDEN = HTTPStatus.FORBIDDEN.value
+    TOO_MANY_REQUESTS = HTTPStatus.TOO_MANY_REQUESTS.value
+    SERVICE_UNAVAILABLE = HTTPStatus.SERVICE_UNAVAILABLE.value
+    UNKNOWN_ERROR = -1
+
+
+ErrorCodeNames = [code.name for code in ErrorCodes]
+
+
+class PageTransport(Enum):
+    BYTES = "bytes"
+    COMPRESSED = "compressed"
+    SHARED_MEMORY = "shared_memory"
+
+
+@dataclass
+class Page:
+    url: Optional[str]
+    error_code: ErrorCodes
+    content: Optional[bytes] = None
+    encoding: Optional[str] = None
+    compressed: bool = False
+    shared_memory_name: Optional[str] = None
+    content_length: int = 0
+
+    def pack(self, transport: PageTransport = PageTransport.BYTES) -> "Page":
+        if self.content is None or transport == PageTransport.BYTES:
+            return self
+
+        if transport == PageTransport.COMPRESSED:
+            return replace(self, content=zlib.compress(self.content, 1), compressed=True)
+
+        block = shared_memory.SharedMemory(create=True, size=max(len(self.content), 1))
+        block.buf[:len(self.content)] = self.content  # type: ignore[index]
+        # The consumer unlinks the block, so the producer must not claim it at exit
+        resource_tracker.unregister(block._name, "shared_memory")  # type: ignore[attr-defined]
+        block.close()
+
+        return replace(self, content=None, shared_memory_name=block.name, content_length=len(self.content))
+
+    def read_text(self) -> str:
+        if self.shared_memory_name is None:
+            return self._decode(self.content or b"")
+
+        block = shared_memory.SharedMemory(name=self.shared_memory_name)
+        try:
+            buffer = block.buf[:self.content_length]  # type: ignore[index]
+            text = self._decode(buffer)
+            buffer.release()
+        finally:
+            block.close()
+            block.unlink()
+            self.shared_memory_name = None
+
+        return text
+
+    def release(self):
+        if self.shared_memory_name is None:
+            return
+
+        block = shared_memory.SharedMemory(name=self.shared_memory_name)
+        block.close()
+        block.unlink()
+        self.shared_memory_name = None
+
+    def _decode(self, content) -> str:
+        if self.compressed:
+            content = zlib.decompress(content)
+
+        return str(content, self.encoding or "utf-8", errors="replace")
@@ -0,0 +1,103 @@
+import hashlib
+import io
+import logging
+import os
+from pathlib import Path
+import tarfile
+import threading
+import time
+from typing import Iterator, Optional
+import zlib
+
+from .page import ErrorCodes, Page
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class PageArchive(object):
+    SHARD_PREFIX = "pages-"
+    SHARD_SUFFIX = ".tar"
+    MEMBER_SUFFIX = ".html.zlib"
+
+    def __init__(self, directory, max_shard_bytes: int = 1024 ** 3, compression_level: int = 6):
+        self.directory = directory
+        self.max_shard_bytes = max_shard_bytes
+        self.compression_level = compression_level
+        self.num_pages = 0
+
+        self._lock = threading.Lock()
+        self._shard: Optional[tarfile.TarFile] = None
+        self._shard_index = len(self.shard_paths(directory))
+
+    def add(self, page: Page):
+        if page.error_code != ErrorCodes.OK or page.url is None or page.content is None:
+            return
+
+        # Every page is compressed on its own, by the thread that downloaded it, so only the append is serialised
+        content = zlib.compress(page.content, self.compression_level)
+
+        member = tarfile.TarInfo(f"{hashlib.sha1(page.url.encode('utf-8')).hexdigest()}{self.MEMBER_SUFFIX}")
+        member.size = len(content)
+        member.mtime = int(time.time())
+        member.pax_headers = {"url": page.url, "encoding": page.encoding or ""}
+
+        with self._lock:
+            shard = self._open_shard()
+            shard.addfile(member, io.BytesIO(content))
+            shard.fileobj.flush()  # type: ignore[attr-defined]
+            self.num_pages += 1
+
+            if shard.offset >= self.max_shard_bytes:
+                self._close_shard()
+
+    def close(self):
+        with self._lock:
+            self._close_shard()
+
+        logger.info(f"{self.num_pages} raw pages archived in folder {self.directory}")
+
+    @classmethod
+    def read(cls, directory) -> Iterator[Page]:
+        for path in cls.shard_paths(directory):
+            try:
+                with tarfile.open(path, "r:") as shard:
+                    for member in shard:
+                        file = shard.extractfile(member)
+                        if file is None:
+                            # Only pages are archived as regular files
+                            continue
+
+                        yield Page(
+                            url=member.pax_headers["url"],
+                            error_code=ErrorCodes.OK,
+                            content=file.read(),
+                            encoding=member.pax_headers["encoding"] or None,
+                            compressed=True,
+                        )
+            except (tarfile.ReadError, EOFError) as e:
+                # The last shard of a run that was killed ends halfway through a page
+                logger.info(f"Stop reading truncated shard {path}: {e}")
+
+    @classmethod
+    def shard_paths(cls, directory):
+        if not os.path.isdir(directory):
+            return []
+
+        return sorted(
+            os.path.join(directory, file) for file in os.listdir(directory)
+            if file.startswith(cls.SHARD_PREFIX) and file.endswith(cls.SHARD_SUFFIX)
+        )
+
+    def _open_shard(self) -> tarfile.TarFile:
+        if self._shard is None:
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            path = os.path.join(self.directory, f"{self.SHARD_PREFIX}{self._shard_index:05d}{self.SHARD_SUFFIX}")
+            self._shard = tarfile.open(path, "w:", format=tarfile.PAX_FORMAT)
+            self._shard_index += 1
+
+        return self._shard
+
+    def _close_shard(self):
+        if self._shard is not None:
+            self._shard.close()
+            self._shard = None
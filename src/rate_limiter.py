@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+import logging
+import multiprocessing
+import time
+from typing import Callable, Optional
+from urllib.parse import urlparse
+import zlib
+
+import requests
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class RateLimiter(object):
+    TOKENS, UPDATED_AT, RATE, BLOCKED_UNTIL = range(4)
+    NUM_FIELDS = 4
+
+    def __init__(
+            self,
+            requests_per_second: float = 50.0,
+            min_requests_per_second: float = 0.5,
+            backoff_factor: float = 0.5,
+            recovery_step: float = 0.1,
+            num_slots: int = 64,
+    ):
+        self.max_requests_per_second = requests_per_second
+        self.min_requests_per_second = min(min_requests_per_second, requests_per_second)
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.num_slots = num_slots
+
+        # Shared memory, so the buckets are the same for every thread and every forked process
+        self._lock = multiprocessing.Lock()
+        self._slots = multiprocessing.Array("d", num_slots * self.NUM_FIELDS, lock=False)
+        now = time.time()
+        for slot in range(num_slots):
+            self._set(slot, self.TOKENS, 1.0)
+            self._set(slot, self.UPDATED_AT, now)
+            self._set(slot, self.RATE, requests_per_second)
+
+    def get(self, fetch: Callable[..., requests.Response], url: str, **kwargs) -> requests.Response:
+        self.acquire(url)
+        response = fetch(url, **kwargs)
+        self.update(url, response.status_code, response.headers.get("Retry-After"))
+        return response
+
+    def acquire(self, url: str):
+        wait_seconds = self._reserve(url)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    async def acquire_async(self, url: str):
+        wait_seconds = self._reserve(url)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+    def update(self, url: str, status_code: int, retry_after: Optional[str] = None) -> Optional[float]:
+        if status_code in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE):
+            return self.throttled(url, self.parse_retry_after(retry_after))
+
+        self.succeeded(url)
+        return None
+
+    def throttled(self, url: str, retry_after_seconds: Optional[float] = None) -> float:
+        slot = self._slot(url)
+        with self._lock:
+            now = time.time()
+            blocked_until = self._get(slot, self.BLOCKED_UNTIL)
+            # The requests already in flight are throttled together, so they only count as one signal
+            if now >= blocked_until:
+                rate = max(self._get(slot, self.RATE) * self.backoff_factor, self.min_requests_per_second)
+                self._set(slot, self.RATE, rate)
+                logger.info("Throttled by %s. Slow down to %.2f requests per second", urlparse(url).netloc, rate)
+
+            delay = retry_after_seconds if retry_after_seconds is not None else 1 / self._get(slot, self.RATE)
+            blocked_until = max(blocked_until, now + delay)
+            self._set(slot, self.BLOCKED_UNTIL, blocked_until)
+            # The bucket starts refilling when the block is over, so the next requests are spread out after it
+            self._set(slot, self.TOKENS, 0.0)
+            self._set(slot, self.UPDATED_AT, blocked_until)
+
+            return blocked_until - now
+
+    def succeeded(self, url: str):
+        slot = self._slot(url)
+        with self._lock:
+            rate = min(self._get(slot, self.RATE) + self.recovery_step, self.max_requests_per_second)
+            self._set(slot, self.RATE, rate)
+
+    def requests_per_second(self, url: str) -> float:
+        return self._get(self._slot(url), self.RATE)
+
+    def blocked_seconds(self, url: str) -> float:
+        return max(self._get(self._slot(url), self.BLOCKED_UNTIL) - time.time(), 0.0)
+
+    @staticmethod
+    def parse_retry_after(retry_after: Optional[str]) -> Optional[float]:
+        if not retry_after:
+            return None
+
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+
+        try:
+            return max((parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def _reserve(self, url: str) -> float:
+        slot = self._slot(url)
+        with self._lock:
+            now = time.time()
+            rate = self._get(slot, self.RATE)
+            tokens, updated_at = self._get(slot, self.TOKENS), self._get(slot, self.UPDATED_AT)
+            # The bucket does not refill while the host is blocked, which keeps the update time in the future
+            if now > updated_at:
+                tokens, updated_at = min(tokens + (now - updated_at) * rate, max(rate, 1.0)), now
+
+            # Taking the token in advance keeps the requests in the order they arrived, whoever wakes up first
+            tokens -= 1
+            self._set(slot, self.TOKENS, tokens)
+            self._set(slot, self.UPDATED_AT, updated_at)
+
+            return updated_at - now + max(-tokens / rate, 0.0)
+
+    def _slot(self, url: str) -> int:
+        return zlib.crc32(urlparse(url).netloc.encode("utf-8")) % self.num_slots
+
+    def _get(self, slot: int, field: int) -> float:
+        return self._slots[slot * self.NUM_FIELDS + field]
+
+    def _set(self, slot: int, field: int, value: float):
+        self._slots[slot * self.NUM_FIELDS + field] = value
@@ -0,0 +1,90 @@
+from collections import Counter
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class RetryQueue(object):
+    def __init__(self, max_attempts: int = 5, base_delay_seconds: float = 1.0, max_delay_seconds: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+        self.num_retries: Counter = Counter()
+        self.num_given_up: Counter = Counter()
+
+        self._heap: List[Tuple[float, int, str]] = []
+        self._attempts: Dict[str, int] = {}
+        self._reasons: Dict[str, Hashable] = {}
+        self._num_downloading = 0
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def num_downloading(self) -> int:
+        return self._num_downloading
+
+    def start_downloads(self, urls: List[str]):
+        with self._lock:
+            self._num_downloading += len(urls)
+
+    def finish_download(self):
+        with self._lock:
+            self._num_downloading -= 1
+
+    def is_settled(self) -> bool:
+        # A download that fails is scheduled before it is finished, so nothing comes back once both are empty
+        with self._lock:
+            return self._num_downloading == 0 and not self._heap
+
+    def pending_reasons(self) -> Counter:
+        with self._lock:
+            return Counter(self._reasons[url] for _, _, url in self._heap if url in self._reasons)
+
+    def retry(self, url: str, reason: Hashable, delay_seconds: Optional[float] = None) -> bool:
+        with self._lock:
+            attempt = self._attempts.get(url, 0) + 1
+            if attempt > self.max_attempts:
+                del self._attempts[url]
+                self._reasons.pop(url, None)
+                self.num_given_up[reason] += 1
+                return False
+
+            self._attempts[url] = attempt
+            self._reasons[url] = reason
+            self.num_retries[reason] += 1
+
+        if delay_seconds is None:
+            delay_seconds = self.backoff_seconds(attempt)
+
+        self.schedule(url, delay_seconds)
+        return True
+
+    def forget(self, url: str):
+        with self._lock:
+            self._attempts.pop(url, None)
+            self._reasons.pop(url, None)
+
+    def backoff_seconds(self, attempt: int) -> float:
+        delay = min(self.base_delay_seconds * 2 ** (attempt - 1), self.max_delay_seconds)
+        # Half of the delay is random, so the URLs that failed together are not retried together
+        return delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+
+    def schedule(self, url: str, delay_seconds: float):
+        with self._lock:
+            heapq.heappush(self._heap, (time.time() + delay_seconds, next(self._order), url))
+
+    def pop_due(self) -> List[str]:
+        now = time.time()
+        urls = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                urls.append(heapq.heappop(self._heap)[2])
+
+        return urls
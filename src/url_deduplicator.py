@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterable, List, Optional, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger(f"general_logger.{__name__}")
+
+
+class BloomFilter(object):
+    MAGIC = b"URLBLOOM"
+    HEADER = struct.Struct("<8sQQ")
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001, path: Optional[str] = None):
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+        self._bits: Union[bytearray, mmap.mmap] = bytearray()
+        self._offset = 0
+
+        if path is not None and os.path.isfile(path):
+            self._open(path)
+            return
+
+        self.num_bits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(round(self.num_bits / capacity * math.log(2)), 1)
+
+        if path is None:
+            self._bits = bytearray(math.ceil(self.num_bits / 8))
+        else:
+            self._create(path)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[self._offset + (i >> 3)] & (1 << (i & 7)) for i in self._bit_indices(key))
+
+    def add(self, key: str) -> bool:
+        is_new = False
+        for i in self._bit_indices(key):
+            byte, mask = self._offset + (i >> 3), 1 << (i & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                is_new = True
+
+        return is_new
+
+    def flush(self):
+        # Only a filter kept in a file has anything to write back
+        if isinstance(self._bits, mmap.mmap):
+            self._bits.flush()
+
+    def close(self):
+        if self._file is None or not isinstance(self._bits, mmap.mmap):
+            return
+
+        self._bits.flush()
+        self._bits.close()
+        self._file.close()
+        self._file = None
+
+    def _bit_indices(self, key: str) -> List[int]:
+        h1, h2 = struct.unpack("<QQ", hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest())
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _create(self, path: str):
+        with open(path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.num_bits, self.num_hashes))
+            file.truncate(self.HEADER.size + math.ceil(self.num_bits / 8))
+
+        self._open(path)
+
+    def _open(self, path: str):
+        file = open(path, "r+b")
+        magic, self.num_bits, self.num_hashes = self.HEADER.unpack(file.read(self.HEADER.size))
+        if magic != self.MAGIC:
+            file.close()
+            raise ValueError(f"{path} is not a URL index")
+
+        # The OS only loads the pages that are touched, so the filter does not have to fit in memory
+        self._file = file
+        self._bits = mmap.mmap(file.fileno(), 0)
+        self._offset = self.HEADER.size
+
+
+class UrlDeduplicator(object):
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001, path: Optional[str] = None):
+        self.seen = BloomFilter(capacity, error_rate)
+        self.stored = BloomFilter(capacity, error_rate, path) if path is not None else None
+        self.num_duplicates = 0
+
+    def filter_new(self, urls: Iterable[str]) -> List[str]:
+        new_urls = []
+        for url in urls:
+            article_id = self.article_id(url)
+            if (self.stored is not None and article_id in self.stored) or not self.seen.add(article_id):
+                self.num_duplicates += 1
+                continue
+
+            new_urls.append(url)
+
+        return new_urls
+
+    def mark_seen(self, urls: Iterable[str]):
+        for url in urls:
+            self.seen.add(self.article_id(url))
+
+    def mark_stored(self, article_id: str):
+        if self.stored is not None:
+            self.stored.add(article_id)
+
+    def close(self):
+        logger.info(f"{self.num_duplicates} duplicated URLs skipped")
+        if self.stored is not None:
+            self.stored.close()
+
+    @staticmethod
+    def article_id(url: str) -> str:
+        # Medium suffixes every post path with its id, whatever the domain or slug it is reached through
+        return urlparse(url).path.rstrip("/").split("-")[-1]
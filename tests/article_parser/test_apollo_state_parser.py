@@ -0,0 +1,117 @@
+import copy
+import json
+import unittest
+from unittest import mock
+
+from src.article_parser.apollo_state_parser import ApolloStateArticleParser
+from src.article_parser.beautiful_soup_parser import BeautifulSoupArticleParser
+
+
+def apollo_state_page(state):
+    return f"<html><body><script>window.__APOLLO_STATE__ = {json.dumps(state)}</script></body></html>"
+
+
+class ApolloStateArticleParserTests(unittest.TestCase):
+    state = {
+        "ROOT_QUERY": {'postResult({"id":"3a6d1ce1e86a"})': {"__ref": "Post:3a6d1ce1e86a"}},
+        "Post:3a6d1ce1e86a": {
+            "id": "3a6d1ce1e86a",
+            "title": "Paella",
+            "readingTime": 6.2,
+            "creator": {"__ref": "User:1"},
+            "content({})": {"bodyModel": {"paragraphs": [{"__ref": "Paragraph:1"}, {"__ref": "Paragraph:2"}]}},
+        },
+        "User:1": {"name": "miggy"},
+        "Paragraph:1": {"type": "P", "text": "Rice\nand saffron"},
+        "Paragraph:2": {
+            "type": "MIXTAPE_EMBED",
+            "text": "Recipes\nwww.paella.com",
+            "markups": [{"type": "STRONG", "end": 8}, {"type": "EM", "end": 22}],
+        },
+    }
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        with open("tests/helpers/example_article_1.html", "r", encoding="utf-8") as file:
+            cls.article_html = file.read()
+
+    def test_extract_article_fields_from_apollo_state(self):
+        # Given
+        fallback = mock.MagicMock()
+        # When
+        article_id, title, author, paragraphs, duration_minutes = ApolloStateArticleParser(fallback).parse(
+            self.article_html
+        )
+        # Then
+        fallback.parse.assert_not_called()
+        self.assertEqual("92fad4f5a39", article_id)
+        self.assertEqual("SEO Secrets: Reverse-Engineering Google’s Algorithm", title)
+        self.assertEqual("benjamin bannister", author)
+        self.assertEqual(16, duration_minutes)
+
+    def test_paragraphs_match_the_dom_parse(self):
+        # Given
+        expected_paragraphs = BeautifulSoupArticleParser().parse(self.article_html)[3]
+        # When
+        paragraphs = ApolloStateArticleParser().parse(self.article_html)[3]
+        # Then
+        self.assertEqual(expected_paragraphs, paragraphs)
+
+    def test_link_previews_are_split_into_title_description_and_domain(self):
+        # When
+        paragraphs = ApolloStateArticleParser().parse(self.article_html)[3]
+        # Then
+        index = paragraphs.index("How Google Search Works | Search Algorithms")
+        self.assertTrue(paragraphs[index + 1].startswith("From analyzing words in your Search term"))
+        self.assertEqual("www.google.com", paragraphs[index + 2])
+
+    def test_fall_back_to_the_dom_when_apollo_state_is_missing(self):
+        # Given
+        article_html = self.article_html.replace("window.__APOLLO_STATE__", "window.__SOMETHING_ELSE__")
+        fallback = mock.MagicMock()
+        fallback.parse.return_value = "parsed from the DOM"
+        # When
+        parsed = ApolloStateArticleParser(fallback).parse(article_html)
+        # Then
+        fallback.parse.assert_called_once_with(article_html)
+        self.assertEqual("parsed from the DOM", parsed)
+
+    def test_fall_back_to_the_dom_when_apollo_state_is_malformed(self):
+        # Given
+        article_html = self.article_html.replace('"ROOT_QUERY"', '"NOT_ROOT_QUERY"')
+        # When
+        parsed = ApolloStateArticleParser().parse(article_html)
+        # Then
+        self.assertEqual(BeautifulSoupArticleParser().parse(article_html), parsed)
+
+    def test_extract_article_fields_from_a_minimal_apollo_state(self):
+        # When
+        parsed = ApolloStateArticleParser(mock.MagicMock()).parse(apollo_state_page(self.state))
+        # Then
+        self.assertEqual(("3a6d1ce1e86a", "Paella", "miggy", ["Riceand saffron", "Recipes", "www.paella.com"], 7), parsed)
+
+    def test_fall_back_to_the_dom_when_the_apollo_state_has_no_article(self):
+        def without(*path):
+            state = copy.deepcopy(self.state)
+            parent = state
+            for key in path[:-1]:
+                parent = parent[key]
+            del parent[path[-1]]
+            return state
+
+        states = {
+            "no post": without("ROOT_QUERY", 'postResult({"id":"3a6d1ce1e86a"})'),
+            "no id": without("Post:3a6d1ce1e86a", "id"),
+            "no title": without("Post:3a6d1ce1e86a", "title"),
+            "no reading time": without("Post:3a6d1ce1e86a", "readingTime"),
+            "no content": without("Post:3a6d1ce1e86a", "content({})"),
+        }
+        for description, state in states.items():
+            with self.subTest(state=description):
+                # Given
+                fallback = mock.MagicMock()
+                fallback.parse.return_value = "parsed from the DOM"
+                # When
+                parsed = ApolloStateArticleParser(fallback).parse(apollo_state_page(state))
+                # Then
+                self.assertEqual("parsed from the DOM", parsed)
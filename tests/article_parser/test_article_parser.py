@@ -0,0 +1,8 @@
+import unittest
+
+from src.article_parser.article_parser import ArticleParser
+
+
+class ArticleParserTests(unittest.TestCase):
+    def test_raise_not_implemented_error_when_parsing_with_the_abstract_class(self):
+        self.assertRaises(NotImplementedError, ArticleParser().parse, "<html></html>")
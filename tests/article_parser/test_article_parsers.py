@@ -0,0 +1,119 @@
+import unittest
+
+from src.article_parser.beautiful_soup_parser import BeautifulSoupArticleParser
+from src.article_parser.lxml_parser import LxmlArticleParser
+from src.article_parser.selectolax_parser import SelectolaxArticleParser
+from src.article_scraper import ArticleScraper
+from src.page import ErrorCodes, Page
+
+
+class ArticleParsersTests(unittest.TestCase):
+    parsers = [
+        BeautifulSoupArticleParser("lxml"),
+        LxmlArticleParser(),
+        SelectolaxArticleParser(),
+    ]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        with open("tests/helpers/example_article_1.html", "r", encoding="utf-8") as file:
+            cls.article_html = file.read()
+
+    def test_html_parser_backend_extracts_article_fields(self):
+        # When
+        article_id, title, author, paragraphs, duration_minutes = BeautifulSoupArticleParser().parse(
+            self.article_html
+        )
+        # Then
+        self.assertEqual("92fad4f5a39", article_id)
+        self.assertEqual("benjamin bannister", author)
+        self.assertEqual("SEO Secrets: Reverse-Engineering Google’s Algorithm", paragraphs[0])
+        self.assertEqual(16, duration_minutes)
+
+    def test_every_backend_gives_the_same_output_as_html_parser(self):
+        # Given
+        expected = BeautifulSoupArticleParser().parse(self.article_html)
+        for parser in self.parsers:
+            with self.subTest(parser=type(parser).__name__):
+                # When
+                parsed = parser.parse(self.article_html)
+                # Then
+                self.assertEqual(expected, parsed)
+
+    def test_every_backend_takes_the_id_from_the_url_when_the_post_id_is_missing(self):
+        # Given
+        article_html = self.article_html.replace('name="parsely-post-id"', 'name="no-parsely-post-id"')
+        for parser in [BeautifulSoupArticleParser()] + self.parsers:
+            with self.subTest(parser=type(parser).__name__):
+                # When
+                article_id, *_ = parser.parse(article_html)
+                # Then
+                self.assertEqual("92fad4f5a39", article_id)
+
+    def test_every_backend_reads_the_reading_time_from_its_own_element(self):
+        # Given
+        article_html = (
+            '<html><head><meta name="parsely-post-id" content="3a6d1ce1e86a"/><meta name="title" content="Paella"/>'
+            '<meta name="author" content="miggy"/></head><body><span>7 min read</span>'
+            '<article><h1>Paella</h1><p>Rice</p></article></body></html>'
+        )
+        for parser in [BeautifulSoupArticleParser()] + self.parsers:
+            with self.subTest(parser=type(parser).__name__):
+                # When
+                parsed = parser.parse(article_html)
+                # Then
+                self.assertEqual(("3a6d1ce1e86a", "Paella", "miggy", ["Paella", "Rice"], 7), parsed)
+
+    def test_every_backend_raises_type_error_when_title_is_missing(self):
+        # Given
+        article_html = self.article_html.replace('name="title"', 'name="no-title"')
+        for parser in [BeautifulSoupArticleParser()] + self.parsers:
+            with self.subTest(parser=type(parser).__name__):
+                # Then
+                self.assertRaises(TypeError, parser.parse, article_html)
+
+    def test_pages_without_article_fail_to_decode_with_every_backend(self):
+        # Given
+        page_html = self.article_html.replace("<article", "<section").replace("</article>", "</section>")
+        for parser in [BeautifulSoupArticleParser()] + self.parsers:
+            with self.subTest(parser=type(parser).__name__):
+                # When
+                article, error_code = ArticleScraper._page_to_article(
+                    Page(url="https://medium.com/some-article-92fad4f5a39", error_code=ErrorCodes.OK,
+                         content=page_html.encode("utf-8")),
+                    parser,
+                )
+                # Then
+                self.assertIsNone(article)
+                self.assertEqual(ErrorCodes.DECODING_ERROR, error_code)
+
+    def test_page_to_article_uses_the_given_backend(self):
+        # Given
+        page = Page(
+            url="https://medium.com/some-article-92fad4f5a39?source=tag_archive",
+            error_code=ErrorCodes.OK,
+            content=self.article_html.encode("utf-8"),
+            encoding="utf-8",
+        )
+        # When
+        article, error_code = ArticleScraper._page_to_article(page, parser=SelectolaxArticleParser())
+        # Then
+        self.assertEqual(ErrorCodes.OK, error_code)
+        self.assertEqual("https://medium.com/some-article-92fad4f5a39", article.url)
+        self.assertEqual(16, article.duration_minutes)
+
+    def test_unparseable_page_returns_decoding_error(self):
+        # Given
+        page = Page(
+            url="https://medium.com/some-article",
+            error_code=ErrorCodes.OK,
+            content=b"<html><head></head><body>Nothing here</body></html>",
+            encoding="utf-8",
+        )
+        for parser in [BeautifulSoupArticleParser()] + self.parsers:
+            with self.subTest(parser=type(parser).__name__):
+                # When
+                article, error_code = ArticleScraper._page_to_article(page, parser=parser)
+                # Then
+                self.assertIsNone(article)
+                self.assertEqual(ErrorCodes.DECODING_ERROR, error_code)
@@ -0,0 +1,86 @@
+import tracemalloc
+import unittest
+
+from src.article_parser.beautiful_soup_parser import BeautifulSoupArticleParser
+from src.article_parser.partial_parser import PartialArticleParser
+
+
+class PartialArticleParserTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        with open("tests/helpers/example_article_1.html", "r", encoding="utf-8") as file:
+            cls.article_html = file.read()
+
+    def test_partial_parse_matches_full_parse(self):
+        # Given
+        expected = BeautifulSoupArticleParser().parse(self.article_html)
+        # When
+        parsed = PartialArticleParser().parse(self.article_html)
+        # Then
+        self.assertEqual(expected, parsed)
+
+    def test_partial_parse_with_lxml_matches_full_parse(self):
+        # Given
+        expected = BeautifulSoupArticleParser().parse(self.article_html)
+        # When
+        parsed = PartialArticleParser("lxml").parse(self.article_html)
+        # Then
+        self.assertEqual(expected, parsed)
+
+    def test_reading_time_is_found_when_split_by_empty_comments(self):
+        # Given
+        page_html = (
+            '<html><head><meta name="title" content="Title"/><meta name="author" content="Someone"/>'
+            '<meta name="parsely-post-id" content="abc"/></head>'
+            '<body><span>Apr 26 <!-- -->·<!-- --> <!-- -->7<!-- --> min read</span>'
+            '<article><p>Hello</p></article></body></html>'
+        )
+        # When
+        article_id, title, author, paragraphs, duration_minutes = PartialArticleParser().parse(page_html)
+        # Then
+        self.assertEqual(7, duration_minutes)
+        self.assertEqual(["Hello"], paragraphs)
+        self.assertEqual(("abc", "Title", "Someone"), (article_id, title, author))
+
+    def test_page_without_reading_time_raises_type_error(self):
+        # Given
+        page_html = self.article_html.replace("min read", "minutes")
+        # Then
+        self.assertRaises(TypeError, PartialArticleParser().parse, page_html)
+
+    def test_id_is_taken_from_the_url_when_the_post_id_is_missing(self):
+        # Given
+        page_html = self.article_html.replace('name="parsely-post-id"', 'name="no-parsely-post-id"')
+        # When
+        article_id, *_ = PartialArticleParser().parse(page_html)
+        # Then
+        self.assertEqual("92fad4f5a39", article_id)
+
+    def test_page_without_an_article_is_handed_to_the_parser_whole(self):
+        # Given
+        page_html = "<html><head><title>Title</title></head><body>7 min read</body></html>"
+        # When
+        html = PartialArticleParser._head_and_article(page_html)
+        # Then
+        self.assertEqual(page_html, html)
+
+    def test_only_meta_tags_and_article_are_handed_to_the_parser(self):
+        # When
+        html = PartialArticleParser._head_and_article(self.article_html)
+        # Then
+        self.assertTrue(html.startswith("<meta"))
+        self.assertTrue(html.endswith("</article>"))
+        self.assertNotIn("<script", html.split("<article")[0])
+        self.assertLess(len(html), len(self.article_html) / 2)
+
+    def test_partial_parse_uses_less_memory_than_full_parse(self):
+        def peak_memory(parser):
+            parser.parse(self.article_html)
+            tracemalloc.start()
+            parser.parse(self.article_html)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return peak
+
+        # Then
+        self.assertLess(peak_memory(PartialArticleParser()), peak_memory(BeautifulSoupArticleParser()) * 0.75)
@@ -1,4 +1,7 @@
 from datetime import date, datetime
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 import warnings
@@ -7,6 +10,7 @@ import requests
 import requests_mock
 
 from src.article_searcher.archive_searcher import ArchiveSearcher
+from src.http_cache import HttpCache
 
 
 class ArchiveSearcherTests(unittest.TestCase):
@@ -16,6 +20,12 @@ class ArchiveSearcherTests(unittest.TestCase):
         # Then
         self.assertEqual(datetime.today().date(), searcher._query_date)
 
+    def test_archive_searcher_starts_from_the_given_date(self):
+        # When
+        searcher = ArchiveSearcher(search_term="something", start_date=date(2021, 4, 4))
+        # Then
+        self.assertEqual(date(2021, 4, 4), searcher._query_date)
+
     @mock.patch.object(ArchiveSearcher, "_get_articles_for_day")
     def test_get_next_batches(self, get_articles_for_day_mock):
         # Given
@@ -44,12 +54,71 @@ class ArchiveSearcherTests(unittest.TestCase):
         self.assertEqual(3, get_articles_for_day_mock.call_count)
         get_articles_for_day_mock.assert_has_calls(
             [
-                mock.call("something", date(2021, 4, 3), 33, True),
-                mock.call("something", date(2021, 4, 2), 33, True),
-                mock.call("something", date(2021, 4, 1), 33, True)
+                mock.call("something", date(2021, 4, 3), 33, True, http_cache=None),
+                mock.call("something", date(2021, 4, 2), 33, True, http_cache=None),
+                mock.call("something", date(2021, 4, 1), 33, True, http_cache=None)
             ]
         )
 
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day")
+    def test_consecutive_calls_reuse_the_same_threads(self, get_articles_for_day_mock):
+        # Given
+        searcher = ArchiveSearcher(search_term="something", max_threads=2)
+        searcher._query_date = date(2021, 4, 4)
+        threads = set()
+
+        def get_articles_for_day(tag, day, minimum_duration_minutes, lenient, http_cache):
+            threads.add(threading.get_ident())
+            return [str(day)]
+
+        get_articles_for_day_mock.side_effect = get_articles_for_day
+        # When
+        urls_list = searcher.get_next_batches(num_batches=3) + searcher.get_next_batches(num_batches=3)
+        searcher.close()
+        # Then
+        self.assertEqual(
+            {"2021-04-03", "2021-04-02", "2021-04-01", "2021-03-31", "2021-03-30", "2021-03-29"},
+            set(urls_list)
+        )
+        self.assertLessEqual(len(threads), 2)
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day")
+    def test_iterate_batches_yields_days_as_soon_as_they_complete(self, get_articles_for_day_mock):
+        # Given
+        searcher = ArchiveSearcher(search_term="something", max_threads=3)
+        searcher._query_date = date(2021, 4, 4)
+
+        def get_articles_for_day(tag, day, minimum_duration_minutes, lenient, http_cache):
+            if day == date(2021, 4, 3):
+                time.sleep(1)
+            return [str(day)]
+
+        get_articles_for_day_mock.side_effect = get_articles_for_day
+        batches = searcher.iter_batches(window=3)
+        # When
+        start = time.time()
+        first_batches = [next(batches), next(batches), next(batches)]
+        elapsed = time.time() - start
+        batches.close()
+        searcher.close()
+        # Then
+        self.assertNotIn(["2021-04-03"], first_batches)
+        self.assertLess(elapsed, 1)
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day")
+    def test_iterate_batches_skips_days_that_fail(self, get_articles_for_day_mock):
+        # Given
+        searcher = ArchiveSearcher(search_term="something", max_threads=1)
+        searcher._query_date = date(2021, 4, 4)
+        get_articles_for_day_mock.side_effect = [AttributeError("no stream"), ["salsa.com"]]
+        batches = searcher.iter_batches(window=1)
+        # When
+        first_batches = [next(batches), next(batches)]
+        batches.close()
+        searcher.close()
+        # Then
+        self.assertEqual([[], ["salsa.com"]], first_batches)
+
     @requests_mock.Mocker()
     def test_get_articles_for_date(self, m):
         # Given
@@ -73,6 +142,24 @@ class ArchiveSearcherTests(unittest.TestCase):
             urls
         )
 
+    @requests_mock.Mocker()
+    def test_archive_pages_are_read_from_the_cache_once_downloaded(self, m):
+        # Given
+        expected_archive_url = "https://medium.com/tag/arros_al_forn/archive/2021/04/03"
+        with open("tests/helpers/archive_results_for_day.html", "r", encoding="utf-8") as file:
+            m.get(expected_archive_url, text=file.read(), status_code=200)
+
+        with tempfile.TemporaryDirectory() as directory:
+            http_cache = HttpCache(directory)
+            # When
+            first = ArchiveSearcher._get_articles_for_day("arros_al_forn", date(2021, 4, 3), http_cache=http_cache)
+            second = ArchiveSearcher._get_articles_for_day("arros_al_forn", date(2021, 4, 3), http_cache=http_cache)
+            http_cache.close()
+        # Then
+        self.assertEqual(1, m.call_count)
+        self.assertEqual(4, len(first))
+        self.assertEqual(first, second)
+
     @requests_mock.Mocker()
     def test_get_articles_for_date_returns_empty_list_when_timeout_is_triggered(self, m):
         # Given
@@ -167,3 +254,16 @@ class ArchiveSearcherTests(unittest.TestCase):
             expected_urls,
             urls
         )
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day")
+    def test_iterate_days_yields_each_day_with_its_urls(self, get_articles_for_day_mock):
+        # Given
+        searcher = ArchiveSearcher(search_term="something", max_threads=1, start_date=date(2021, 4, 4))
+        get_articles_for_day_mock.side_effect = [["dogs.com"], ["salsa.com"]]
+        days = searcher.iter_days(window=1)
+        # When
+        first_days = [next(days), next(days)]
+        days.close()
+        searcher.close()
+        # Then
+        self.assertEqual([(date(2021, 4, 3), ["dogs.com"]), (date(2021, 4, 2), ["salsa.com"])], first_days)
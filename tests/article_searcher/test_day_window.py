@@ -0,0 +1,50 @@
+from datetime import date
+import threading
+import unittest
+
+from src.article_searcher.day_window import DayWindow
+
+
+class DayWindowTests(unittest.TestCase):
+    def test_days_that_fail_give_no_urls(self):
+        # Given
+        def get_articles_for_day(tag, day):
+            if day == date(2021, 4, 3):
+                raise AttributeError("no stream")
+            return [f"{tag}-{day}"]
+
+        window = DayWindow(max_threads=2)
+        days = iter([date(2021, 4, 3), date(2021, 4, 2)])
+
+        def submit_next_day():
+            day = next(days, None)
+            return day is not None and window.submit("seo", day, get_articles_for_day) is not None
+
+        # When
+        results = sorted(window.iter_days(submit_next_day, window=2))
+        window.close()
+        # Then
+        self.assertEqual([("seo", date(2021, 4, 2), ["seo-2021-04-02"]), ("seo", date(2021, 4, 3), [])], results)
+
+    def test_closing_cancels_the_days_that_have_not_started(self):
+        # Given
+        started = threading.Event()
+        release = threading.Event()
+
+        def get_articles_for_day(tag, day):
+            started.set()
+            release.wait(5)
+            return []
+
+        window = DayWindow(max_threads=1)
+        running = window.submit("seo", date(2021, 4, 3), get_articles_for_day)
+        waiting = window.submit("seo", date(2021, 4, 2), get_articles_for_day)
+        started.wait(5)
+        # When
+        window.close()
+        window.close()
+        release.set()
+        # Then
+        self.assertEqual(0, len(window))
+        self.assertTrue(waiting.cancelled())
+        self.assertEqual([], running.result(timeout=5))
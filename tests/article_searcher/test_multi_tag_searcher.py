@@ -0,0 +1,118 @@
+from datetime import date
+import unittest
+from unittest import mock
+
+from src.article_searcher.archive_searcher import ArchiveSearcher
+from src.article_searcher.multi_tag_searcher import MultiTagSearcher, TagQuotas, TagRange
+
+
+def urls_for_day(tag, day, *args, **kwargs):
+    return [f"https://medium.com/{tag}-{day:%Y%m%d}"]
+
+
+class MultiTagSearcherTests(unittest.TestCase):
+    def test_a_range_that_ends_before_it_starts_is_rejected(self):
+        # When / Then
+        with self.assertRaises(ValueError):
+            TagRange("seo", start_date=date(2021, 4, 4), end_date=date(2021, 4, 1))
+
+    def test_a_tag_with_more_than_one_range_is_rejected(self):
+        # When / Then
+        with self.assertRaises(ValueError):
+            MultiTagSearcher([
+                TagRange("seo", start_date=date(2021, 4, 1), end_date=date(2021, 4, 4)),
+                TagRange("seo", start_date=date(2021, 3, 1), end_date=date(2021, 3, 4)),
+            ])
+
+    def test_a_range_lists_its_days_from_the_newest(self):
+        # Given
+        tag_range = TagRange("seo", start_date=date(2021, 4, 2), end_date=date(2021, 4, 4))
+        # When
+        days = list(tag_range.days())
+        # Then
+        self.assertEqual([date(2021, 4, 4), date(2021, 4, 3), date(2021, 4, 2)], days)
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day", side_effect=urls_for_day)
+    def test_tags_take_turns_until_their_ranges_are_searched(self, get_articles_for_day_mock):
+        # Given
+        searcher = MultiTagSearcher(
+            [
+                TagRange("seo", start_date=date(2021, 4, 1), end_date=date(2021, 4, 3)),
+                TagRange("python", start_date=date(2020, 1, 1), end_date=date(2020, 1, 1)),
+            ],
+            max_threads=1,
+        )
+        # When
+        days = [(tag, day) for tag, day, _ in searcher.iter_days()]
+        # Then
+        self.assertEqual(
+            [
+                ("seo", date(2021, 4, 3)),
+                ("python", date(2020, 1, 1)),
+                ("seo", date(2021, 4, 2)),
+                ("seo", date(2021, 4, 1)),
+            ],
+            days,
+        )
+        self.assertEqual(4, get_articles_for_day_mock.call_count)
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day", side_effect=urls_for_day)
+    def test_days_searched_by_a_previous_run_are_skipped(self, _):
+        # Given
+        searcher = MultiTagSearcher(
+            [TagRange("seo", start_date=date(2021, 4, 1), end_date=date(2021, 4, 3))],
+            searched_days={("seo", date(2021, 4, 2)), ("python", date(2021, 4, 1))},
+        )
+        # When
+        days = {day for _, day, _ in searcher.iter_days()}
+        # Then
+        self.assertEqual({date(2021, 4, 3), date(2021, 4, 1)}, days)
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day", side_effect=urls_for_day)
+    def test_tags_stop_being_searched_once_their_quota_is_stored(self, _):
+        # Given
+        searcher = MultiTagSearcher(
+            [
+                TagRange("seo", start_date=date(2021, 1, 1), end_date=date(2021, 4, 3), quota=2),
+                TagRange("python", start_date=date(2021, 4, 1), end_date=date(2021, 4, 3)),
+            ],
+            max_threads=1,
+            num_stored={"seo": 1},
+        )
+        # When
+        days = []
+        for tag, day, _ in searcher.iter_days():
+            days.append((tag, day))
+            if tag == "seo":
+                searcher.quotas.record_stored(tag)
+        # Then
+        self.assertEqual(
+            [("seo", date(2021, 4, 3)), ("python", date(2021, 4, 3)), ("python", date(2021, 4, 2)),
+             ("python", date(2021, 4, 1))],
+            days,
+        )
+        self.assertTrue(searcher.quotas.is_reached("seo"))
+        self.assertFalse(searcher.quotas.is_reached("python"))
+
+    @mock.patch.object(ArchiveSearcher, "_get_articles_for_day", side_effect=urls_for_day)
+    def test_closing_stops_the_search(self, _):
+        # Given
+        searcher = MultiTagSearcher(
+            [TagRange("seo", start_date=date(2021, 1, 1), end_date=date(2021, 4, 3))], max_threads=1
+        )
+        days = searcher.iter_days()
+        next(days)
+        # When
+        days.close()
+        searcher.close()
+        # Then
+        self.assertEqual(0, len(searcher._days))
+
+    def test_quotas_are_all_reached_only_when_every_tag_has_one(self):
+        # Given
+        quotas = TagQuotas({"seo": 1, "python": None})
+        # When
+        quotas.record_stored("seo")
+        # Then
+        self.assertTrue(quotas.is_reached("seo"))
+        self.assertFalse(quotas.all_reached())
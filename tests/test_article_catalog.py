@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.article import Article
+from src.article_catalog import ArticleCatalog
+
+
+class ArticleCatalogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, ArticleCatalog.FILE_NAME)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_articles_are_found_by_id_with_their_location(self):
+        # Given
+        catalog = ArticleCatalog(self.path)
+        article = Article(
+            id="234", url="somepage.com/234", title="Don Quijote", author="Cervantes",
+            paragraphs=["En un lugar de la mancha"], duration_minutes=9,
+        )
+        # When
+        catalog.add(article, search_term="novels", location=("articles-00000.jsonl", 120, 80))
+        # Then
+        self.assertIn("234", catalog)
+        self.assertNotIn("asdf4", catalog)
+        self.assertEqual(
+            {
+                "id": "234", "url": "somepage.com/234", "title": "Don Quijote", "author": "Cervantes",
+                "duration_minutes": 9, "num_words": 6, "search_term": "novels",
+                "file": "articles-00000.jsonl", "offset": 120, "length": 80,
+            },
+            catalog.get("234"),
+        )
+        self.assertIsNone(catalog.get("asdf4"))
+        catalog.close()
+
+    def test_articles_are_filtered_by_author_and_duration(self):
+        # Given
+        catalog = ArticleCatalog(self.path)
+        for i, (author, duration_minutes) in enumerate([("Cervantes", 5), ("Cervantes", 12), ("Lope", 20)]):
+            catalog.add(Article(id=str(i), url=f"somepage.com/{i}", author=author, duration_minutes=duration_minutes))
+        # When
+        long_articles_by_cervantes = catalog.find(author="Cervantes", min_duration_minutes=8)
+        long_articles = catalog.find(min_duration_minutes=8, limit=1)
+        # Then
+        self.assertEqual(["1"], [row["id"] for row in long_articles_by_cervantes])
+        self.assertEqual(1, len(long_articles))
+        self.assertEqual(3, len(catalog.find()))
+        catalog.close()
+
+    def test_articles_are_counted_by_search_term(self):
+        # Given
+        catalog = ArticleCatalog(self.path)
+        for i, search_term in enumerate(["seo", "python", "seo", None]):
+            catalog.add(Article(id=str(i), url=f"somepage.com/{i}"), search_term=search_term)
+        # When
+        counts = catalog.count_by_search_term()
+        # Then
+        self.assertEqual({"seo": 2, "python": 1, None: 1}, counts)
+        catalog.close()
+
+    def test_articles_are_kept_between_runs_unless_only_added_when_missing(self):
+        # Given
+        catalog = ArticleCatalog(self.path)
+        catalog.add(Article(id="234", url="somepage.com/234", author="Cervantes", duration_minutes=9))
+        catalog.close()
+        # When
+        reopened = ArticleCatalog(self.path)
+        reopened.add(Article(id="234", url="somepage.com/234"), replace=False)
+        # Then
+        self.assertEqual(1, len(reopened))
+        self.assertEqual(9, reopened.get("234")["duration_minutes"])
+        reopened.close()
+
+    def test_range_queries_take_milliseconds_on_large_catalogs(self):
+        # Given
+        catalog = ArticleCatalog(self.path, flush_rows=100_000)
+        for i in range(100_000):
+            catalog.add(Article(id=str(i), url=f"somepage.com/{i}", author=f"author-{i % 1000}", duration_minutes=i % 30))
+        catalog.flush()
+        # When
+        start = time.perf_counter()
+        for i in range(100):
+            catalog.find(author=f"author-{i}", min_duration_minutes=8)
+            assert str(i * 7) in catalog
+        elapsed = time.perf_counter() - start
+        # Then
+        self.assertLess(elapsed / 100, 0.005)
+        catalog.close()
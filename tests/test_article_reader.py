@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+
+from src.article import Article
+from src.article_catalog import ArticleCatalog
+from src.article_reader import ArticleReader
+from src.article_storage import ArticleStorage
+
+
+class ArticleReaderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.articles = [
+            Article(
+                id="234",
+                url="somepage.com/path/to/article",
+                title="Don Quijote New Version",
+                author="Cervantes",
+                paragraphs=["En un lugar de la mancha de cuyo nombre no quiero acordarme...", "no hace mucho"],
+                duration_minutes=9,
+            ),
+            Article(
+                id="asdf4",
+                url="somepage.com/path/to/other_article",
+                title="Sonetos y más sonetos",
+                author="Lope de Vega",
+                paragraphs=["Un soneto me ha mandado hacer Violante,", "en mi vida me he visto en tal aprieto,"],
+                duration_minutes=3,
+            ),
+        ]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def store(self, storage_format):
+        storage = ArticleStorage(storage_format)
+        storage.create(self.directory.name, force=True)
+        for article in self.articles:
+            storage.add(article)
+        storage.close()
+
+    def test_articles_are_read_back_from_either_storage_format(self):
+        for storage_format in ["text", "jsonl"]:
+            with self.subTest(storage_format=storage_format):
+                # Given
+                self.store(storage_format)
+                # When
+                with ArticleStorage.open(self.directory.name) as reader:
+                    articles = list(reader)
+                    num_articles = len(reader)
+                # Then
+                self.assertEqual(self.articles, articles)
+                self.assertEqual(2, num_articles)
+
+    def test_metadata_projection_does_not_read_the_text(self):
+        # Given
+        self.store("text")
+        for article in self.articles:
+            os.remove(os.path.join(self.directory.name, f"{article.id}.txt"))
+        # When
+        with ArticleStorage.open(self.directory.name, fields=ArticleReader.METADATA_FIELDS) as reader:
+            articles = list(reader)
+        # Then
+        self.assertEqual(["Cervantes", "Lope de Vega"], [article.author for article in articles])
+        self.assertEqual([None, None], [article.paragraphs for article in articles])
+
+    def test_text_projection_only_reads_the_text(self):
+        # Given
+        self.store("jsonl")
+        # When
+        with ArticleStorage.open(self.directory.name, fields=ArticleReader.TEXT_FIELDS) as reader:
+            article = reader.get("asdf4")
+        # Then
+        self.assertEqual(Article(id="asdf4", url=None, paragraphs=self.articles[1].paragraphs), article)
+
+    def test_corpora_without_a_catalog_are_read_from_their_index(self):
+        # Given
+        self.store("text")
+        os.remove(os.path.join(self.directory.name, ArticleCatalog.FILE_NAME))
+        # When
+        with ArticleStorage.open(self.directory.name) as reader:
+            articles = list(reader)
+            missing_article = reader.get("9af0")
+        # Then
+        self.assertEqual(["234", "asdf4"], [article.id for article in articles])
+        self.assertEqual(self.articles[0].paragraphs, articles[0].paragraphs)
+        self.assertIsNone(missing_article)
+
+    def test_unknown_fields_are_rejected(self):
+        # Then
+        self.assertRaises(ValueError, ArticleStorage.open, self.directory.name, fields=["id", "body"])
+
+    def test_articles_without_text_are_read_back_with_an_empty_paragraph(self):
+        # Given
+        self.articles[1].paragraphs = []
+        self.store("text")
+        # When
+        with ArticleStorage.open(self.directory.name) as reader:
+            article = reader.get("asdf4")
+        # Then
+        self.assertEqual([""], article.paragraphs)
+
+    def test_articles_appended_after_a_shard_was_mapped_are_read(self):
+        # Given
+        storage = ArticleStorage("jsonl")
+        storage.create(self.directory.name, force=True)
+        storage.add(self.articles[0])
+        storage.flush()
+        reader = ArticleStorage.open(self.directory.name)
+        first_article = reader.get("234")
+        # When
+        storage.add(self.articles[1])
+        storage.flush()
+        second_article = reader.get("asdf4")
+        reader.close()
+        storage.close()
+        # Then
+        self.assertEqual(self.articles, [first_article, second_article])
+
+    def test_articles_cataloged_without_their_text_are_read_back_without_paragraphs(self):
+        # Given
+        self.store("jsonl")
+        catalog = ArticleCatalog(os.path.join(self.directory.name, ArticleCatalog.FILE_NAME))
+        catalog.add(Article(id="9af0", url="somepage.com/9af0", title="Lost"))
+        catalog.close()
+        # When
+        with ArticleStorage.open(self.directory.name) as reader:
+            article = reader.get("9af0")
+        # Then
+        self.assertEqual("Lost", article.title)
+        self.assertIsNone(article.paragraphs)
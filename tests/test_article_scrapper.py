@@ -1,15 +1,28 @@
+import collections
+from datetime import date
 from http import HTTPStatus
+import os
+import tempfile
+import time
 import unittest
 from unittest import mock
 
+import pandas as pd
 import requests
 import requests_mock
 
+from src.article import Article
 from src.article_scraper import ArticleScraper, ErrorCodes
+from src.article_storage import ArticleStorage
+from src.http_cache import HttpCache
+from src.page import Page
+from src.page_archive import PageArchive
+from src.rate_limiter import RateLimiter
+from src.retry_queue import RetryQueue
 
 
 class ArticleScrapperTests(unittest.TestCase):
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_trying_to_download_wrong_url_returns_none_with_error_code(self, get_mock):
         # Given
         get_mock.side_effect = requests.exceptions.ConnectionError
@@ -18,7 +31,7 @@ class ArticleScrapperTests(unittest.TestCase):
         page = ArticleScraper._download_article_page(url)
         # Then
         self.assertEqual(ErrorCodes.CONNECTION_ERROR, page.error_code)
-        self.assertIsNone(page.response)
+        self.assertIsNone(page.content)
 
     @requests_mock.Mocker()
     def test_not_found_page_returns_article_with_error_code(self, mock):
@@ -30,7 +43,7 @@ class ArticleScrapperTests(unittest.TestCase):
         # Then
         self.assertEqual(ErrorCodes.NOT_FOUND, page.error_code)
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     def test_url_with_missing_schema_returns_article_with_error_code(self, get_mock):
         # Given
         get_mock.side_effect = requests.exceptions.MissingSchema
@@ -142,3 +155,149 @@ class ArticleScrapperTests(unittest.TestCase):
         article, error_code = scraper._page_to_article(page)
         # Then
         self.assertEqual(ErrorCodes.UNKNOWN_ERROR, error_code)
+
+    @requests_mock.Mocker()
+    def test_cached_article_pages_are_parsed_without_downloading_them_again(self, mock):
+        # Given
+        with open("tests/helpers/example_article_1.html", "r", encoding="utf-8") as file:
+            mock.get("http://some_article.com/some_path/article", text=file.read(), status_code=200)
+        with tempfile.TemporaryDirectory() as directory:
+            http_cache = HttpCache(directory)
+            ArticleScraper._download_article_page("http://some_article.com/some_path/article", http_cache=http_cache)
+            # When
+            page = ArticleScraper._download_article_page(
+                "http://some_article.com/some_path/article", http_cache=http_cache
+            )
+        article, error_code = ArticleScraper._page_to_article(page)
+        # Then
+        self.assertEqual(1, mock.call_count)
+        self.assertEqual(ErrorCodes.OK, error_code)
+        self.assertEqual("92fad4f5a39", article.id)
+
+    def test_reparse_archived_pages_without_network(self):
+        # Given
+        with open("tests/helpers/example_article_1.html", "rb") as file:
+            content = file.read()
+        with tempfile.TemporaryDirectory() as archive_directory, tempfile.TemporaryDirectory() as directory:
+            archive = PageArchive(archive_directory)
+            archive.add(Page(url="https://medium.com/seo-92fad4f5a39", error_code=ErrorCodes.OK, content=content))
+            archive.add(Page(url="https://medium.com/seo-92fad4f5a39", error_code=ErrorCodes.OK, content=content))
+            archive.close()
+            # When
+            ArticleScraper.reparse_archive(archive_directory, directory=directory, num_parse_processes=1)
+            # Then
+            index = pd.read_csv(os.path.join(directory, "index.csv"))
+            self.assertEqual(["92fad4f5a39"], list(index["Id"]))
+            self.assertTrue(os.path.isfile(os.path.join(directory, "92fad4f5a39.txt")))
+
+    @requests_mock.Mocker()
+    def test_throttled_pages_are_scheduled_for_a_retry_instead_of_being_lost(self, mock):
+        # Given
+        mock.get("http://some_article.com/some_path/article", status_code=429, headers={"Retry-After": "3"})
+        rate_limiter = RateLimiter()
+        retry_queue = RetryQueue()
+        # When
+        output = ArticleScraper._download_article_page(
+            "http://some_article.com/some_path/article", rate_limiter=rate_limiter, retry_queue=retry_queue
+        )
+        # Then
+        self.assertIsNone(output)
+        self.assertEqual(1, len(retry_queue))
+        self.assertAlmostEqual(3, retry_queue._heap[0][0] - time.time(), places=1)
+        self.assertEqual(25, rate_limiter.requests_per_second("http://some_article.com"))
+
+    @mock.patch("requests.Session.get")
+    def test_failed_downloads_are_retried_until_their_attempts_are_spent(self, get_mock):
+        # Given
+        get_mock.side_effect = requests.exceptions.ConnectionError
+        retry_queue = RetryQueue(max_attempts=2)
+        # When
+        outputs = [
+            ArticleScraper._download_article_page("http://some_article.com/some_path/article", retry_queue=retry_queue)
+            for _ in range(3)
+        ]
+        # Then
+        self.assertIsNone(outputs[0])
+        self.assertIsNone(outputs[1])
+        self.assertEqual(ErrorCodes.CONNECTION_ERROR, outputs[2].error_code)
+        self.assertEqual(2, len(retry_queue))
+        self.assertEqual(2, retry_queue.num_retries[ErrorCodes.CONNECTION_ERROR])
+
+    def test_url_search_finishes_once_the_days_are_searched_and_no_download_can_come_back(self):
+        # Given
+        url_batches = iter([["http://some_article.com/a"]])
+        retry_queue = RetryQueue()
+        retry_queue.schedule("http://some_article.com/b", delay_seconds=0)
+        # When
+        outputs = [ArticleScraper._get_next_url_batch(url_batches, retry_queue) for _ in range(2)]
+        # A download still in flight fails after every day was searched
+        retry_queue.retry("http://some_article.com/a", ErrorCodes.TIMEOUT, delay_seconds=0)
+        retry_queue.finish_download()
+        retry_queue.finish_download()
+        outputs.append(ArticleScraper._get_next_url_batch(url_batches, retry_queue))
+        retry_queue.finish_download()
+        outputs.append(ArticleScraper._get_next_url_batch(url_batches, retry_queue))
+        # Then
+        self.assertEqual(
+            [
+                (["http://some_article.com/b", "http://some_article.com/a"], False),
+                ([], False),
+                (["http://some_article.com/a"], False),
+                ([], True),
+            ],
+            outputs,
+        )
+
+    def test_downloads_still_waiting_for_a_retry_are_reported_as_lost(self):
+        # Given
+        retry_queue = RetryQueue()
+        retry_queue.retry("http://some_article.com/a", ErrorCodes.TIMEOUT, delay_seconds=60)
+        outcomes = collections.Counter({ErrorCodes.OK: 3, ErrorCodes.TIMEOUT: 1})
+        # When
+        with self.assertLogs("general_logger.src.article_scraper", level="INFO") as logs:
+            ArticleScraper._log_failures(outcomes, retry_queue)
+        # Then
+        self.assertEqual(["TIMEOUT: 2 pages lost and 1 downloads retried"], [r.getMessage() for r in logs.records])
+
+    def test_a_single_tag_needs_a_number_of_articles_to_stop_at(self):
+        # When / Then
+        with self.assertRaises(ValueError):
+            ArticleScraper.compile_articles("seo", None)
+
+    def test_shared_session_has_a_connection_for_each_download_thread_by_default(self):
+        # When
+        pools = {
+            "per thread": ArticleScraper._create_session_pool(True, False, None, 20),
+            "shared": ArticleScraper._create_session_pool(True, True, None, 20),
+            "shared with a pool size": ArticleScraper._create_session_pool(False, True, 8, 20),
+        }
+        # Then
+        self.assertEqual(
+            {"per thread": (10, False, True), "shared": (20, True, True), "shared with a pool size": (8, True, False)},
+            {name: (pool.pool_size, pool.shared, pool.keep_alive) for name, pool in pools.items()},
+        )
+
+    def test_resumed_articles_whose_text_was_never_flushed_are_downloaded_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            storage, checkpoint = ArticleScraper._open_storage(directory, resume=False, storage_format="jsonl")
+            stored, lost = (
+                Article(id=article_id, url=f"https://medium.com/some-article-{article_id}", paragraphs=["Rice"])
+                for article_id in ("92fad4f5a39", "3a6d1ce1e86a")
+            )
+            checkpoint.start(date(2021, 4, 3))
+            checkpoint.record_day(date(2021, 4, 3), [stored.url, lost.url])
+            storage.add(stored)
+            storage.flush()
+            checkpoint.record_stored(stored)
+            # The run is killed while the last article is still buffered
+            checkpoint.record_stored(lost)
+            checkpoint.close()
+            # When
+            storage, checkpoint = ArticleScraper._open_storage(directory, resume=True, storage_format="jsonl")
+            storage.close()
+            # Then
+            self.assertEqual(["92fad4f5a39"], list(checkpoint.stored_articles))
+            self.assertEqual([lost.url], checkpoint.pending_urls)
+            with ArticleStorage.open(directory) as reader:
+                self.assertEqual([stored], list(reader))
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+
+from src.article import Article
+from src.article_shards import ArticleShards
+
+
+class ArticleShardsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.articles = [
+            Article(
+                id=f"a{i}",
+                url=f"https://medium.com/article-a{i}",
+                title="Paella",
+                author="Cervantes",
+                paragraphs=["En un lugar de la mancha", "de cuyo nombre no quiero acordarme"],
+                duration_minutes=i,
+            )
+            for i in range(10)
+        ]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_articles_are_read_back_in_the_order_they_were_added(self):
+        # Given
+        shards = ArticleShards(self.directory.name)
+        # When
+        for article in self.articles:
+            shards.add(article)
+        shards.close()
+        # Then
+        self.assertEqual(self.articles, list(ArticleShards.read(self.directory.name)))
+
+    def test_shards_are_rolled_over_once_they_reach_their_maximum_size(self):
+        # Given
+        shards = ArticleShards(self.directory.name, max_shard_bytes=500)
+        # When
+        for article in self.articles:
+            shards.add(article)
+        shards.close()
+        # Then
+        shard_paths = ArticleShards.shard_paths(self.directory.name)
+        self.assertGreater(len(shard_paths), 1)
+        self.assertTrue(all(os.path.getsize(path) <= 500 for path in shard_paths))
+        self.assertEqual(self.articles, list(ArticleShards.read(self.directory.name)))
+
+    def test_index_points_to_each_article_in_its_shard(self):
+        # Given
+        shards = ArticleShards(self.directory.name)
+        locations = [shards.add(article) for article in self.articles]
+        shards.close()
+        path, offset, length = locations[7]
+        # When
+        with open(path, "rb") as shard:
+            shard.seek(offset)
+            line = shard.read(length)
+        # Then
+        self.assertIn(b'"id": "a7"', line)
+        self.assertEqual(
+            [(self.articles[i].id, locations[i][1], locations[i][2]) for i in range(len(self.articles))],
+            list(ArticleShards.read_index(path)),
+        )
+
+    def test_half_written_articles_are_cut_off_when_the_shards_are_reopened(self):
+        # Given
+        shards = ArticleShards(self.directory.name)
+        for article in self.articles[:3]:
+            shards.add(article)
+        shards.close()
+        path = ArticleShards.shard_paths(self.directory.name)[0]
+        with open(path, "ab") as shard:
+            shard.write(b'{"id": "a3", "url": "https://med')
+        # When
+        reopened = ArticleShards(self.directory.name)
+        reopened.add(self.articles[3])
+        reopened.close()
+        # Then
+        self.assertEqual(self.articles[:4], list(ArticleShards.read(self.directory.name)))
+        self.assertEqual(4, len(list(ArticleShards.read_index(path))))
+
+    def test_reading_stops_at_a_half_written_article(self):
+        # Given
+        shards = ArticleShards(self.directory.name)
+        for article in self.articles[:3]:
+            shards.add(article)
+        shards.close()
+        path = ArticleShards.shard_paths(self.directory.name)[0]
+        with open(path, "ab") as shard:
+            shard.write(b'{"id": "a3", "url": "https://med')
+        with open(ArticleShards.index_path(path), "ab") as index:
+            index.write(b"a3\t1234")
+        # When
+        articles = list(ArticleShards.read(self.directory.name))
+        index = list(ArticleShards.read_index(path))
+        # Then
+        self.assertEqual(self.articles[:3], articles)
+        self.assertEqual(["a0", "a1", "a2"], [article_id for article_id, _, _ in index])
+
+    def test_index_entries_past_the_end_of_the_shard_are_dropped_when_reopened(self):
+        # Given
+        shards = ArticleShards(self.directory.name)
+        for article in self.articles[:3]:
+            shards.add(article)
+        shards.close()
+        path = ArticleShards.shard_paths(self.directory.name)[0]
+        os.truncate(path, os.path.getsize(path) - 10)
+        # When
+        reopened = ArticleShards(self.directory.name)
+        reopened.close()
+        # Then
+        self.assertEqual(self.articles[:2], list(ArticleShards.read(self.directory.name)))
+        self.assertEqual(["a0", "a1"], [article_id for article_id, _, _ in ArticleShards.read_index(path)])
+
+    def test_shards_closed_cleanly_are_reopened_as_they_were(self):
+        # Given
+        shards = ArticleShards(self.directory.name)
+        for article in self.articles[:3]:
+            shards.add(article)
+        shards.flush()
+        shards.close()
+        path = ArticleShards.shard_paths(self.directory.name)[0]
+        size = os.path.getsize(path)
+        # When
+        reopened = ArticleShards(self.directory.name)
+        reopened.flush()
+        reopened.close()
+        # Then
+        self.assertEqual(size, os.path.getsize(path))
+        self.assertEqual(self.articles[:3], list(ArticleShards.read(self.directory.name)))
+
+    def test_missing_directories_and_indexes_have_nothing_to_read(self):
+        # Given
+        path = os.path.join(self.directory.name, "articles-00000.jsonl")
+        # Then
+        self.assertEqual([], list(ArticleShards.read(os.path.join(self.directory.name, "missing"))))
+        self.assertEqual([], list(ArticleShards.read_index(path)))
@@ -8,6 +8,7 @@ import pandas as pd
 from pandas._testing import assert_frame_equal
 
 from src.article import Article
+from src.article_shards import ArticleShards
 from src.article_storage import ArticleStorage
 
 
@@ -41,8 +42,7 @@ class ArticleStorageTests(unittest.TestCase):
             file for file in listdir("tests/helpers/new_storage")
             if isfile(join("tests/helpers/new_storage", file))
         ]
-        self.assertEqual(1, len(files_in_directory))
-        self.assertEqual("index.csv", files_in_directory[0])
+        self.assertEqual(["catalog.sqlite", "index.csv"], sorted(files_in_directory))
 
     def test_create_storage_in_an_empty_directory_does_not_fail(self):
         # Given
@@ -56,8 +56,7 @@ class ArticleStorageTests(unittest.TestCase):
             file for file in listdir("tests/helpers/new_storage")
             if isfile(join("tests/helpers/new_storage", file))
         ]
-        self.assertEqual(1, len(files_in_directory))
-        self.assertEqual("index.csv", files_in_directory[0])
+        self.assertEqual(["catalog.sqlite", "index.csv"], sorted(files_in_directory))
 
     def test_create_and_close_storage_creates_an_index_file(self):
         # Given
@@ -70,8 +69,7 @@ class ArticleStorageTests(unittest.TestCase):
             file for file in listdir("tests/helpers/new_storage")
             if isfile(join("tests/helpers/new_storage", file))
         ]
-        self.assertEqual(1, len(files_in_directory))
-        self.assertEqual("index.csv", files_in_directory[0])
+        self.assertEqual(["catalog.sqlite", "index.csv"], sorted(files_in_directory))
         assert_frame_equal(
             pd.DataFrame(
                 [],
@@ -203,3 +201,110 @@ class ArticleStorageTests(unittest.TestCase):
         article_storage.add(article2)
         # Then
         self.assertEqual(2, article_storage.num_articles)
+
+    def test_resumed_storage_keeps_the_articles_already_saved_in_the_index(self):
+        # Given
+        article_storage = ArticleStorage()
+        article_storage.create(directory="tests/helpers/new_storage")
+        article_storage.add(Article(id="234", url="somepage.com/path/to/article", paragraphs=["En un lugar"]))
+        article_storage.close()
+        resumed_storage = ArticleStorage()
+        # When
+        resumed_storage.resume(
+            "tests/helpers/new_storage",
+            [Article(id="234", url="somepage.com/path/to/article", author="Cervantes", title="Don Quijote")]
+        )
+        resumed_storage.add(
+            Article(id="asdf4", url="somepage.com/path/to/other_article", paragraphs=["Un soneto me ha mandado hacer"])
+        )
+        resumed_storage.close()
+        # Then
+        self.assertEqual(2, resumed_storage.num_articles)
+        self.assertTrue(isfile("tests/helpers/new_storage/234.txt"))
+        self.assertEqual(
+            ["234", "asdf4"],
+            list(pd.read_csv("tests/helpers/new_storage/index.csv").astype("str")["Id"])
+        )
+
+    def test_resumed_storage_only_keeps_the_articles_whose_text_was_stored(self):
+        for storage_format in ("text", "jsonl"):
+            with self.subTest(storage_format=storage_format):
+                # Given
+                article_storage = ArticleStorage(storage_format)
+                article_storage.create(directory="tests/helpers/new_storage", force=True)
+                article_storage.add(Article(id="234", url="somepage.com/234", paragraphs=["En un lugar"]))
+                article_storage.close()
+                # The catalog of a killed run may not have been committed either
+                os.remove("tests/helpers/new_storage/catalog.sqlite")
+                resumed_storage = ArticleStorage(storage_format)
+                # When
+                stored_articles = resumed_storage.resume(
+                    "tests/helpers/new_storage",
+                    [Article(id="234", url="somepage.com/234"), Article(id="asdf4", url="somepage.com/asdf4")],
+                )
+                resumed_storage.close()
+                # Then
+                self.assertEqual(["234"], [article.id for article in stored_articles])
+                self.assertEqual(1, resumed_storage.num_articles)
+                with ArticleStorage.open("tests/helpers/new_storage") as reader:
+                    self.assertEqual([("234", ["En un lugar"])], [(a.id, a.paragraphs) for a in reader])
+
+    def test_storage_that_was_not_opened_has_no_articles_and_takes_none(self):
+        # Given
+        article_storage = ArticleStorage()
+        # When / Then
+        self.assertFalse(article_storage.contains("234"))
+        with self.assertRaises(ValueError):
+            article_storage.add(Article(id="234", url="somepage.com/234", paragraphs=["En un lugar"]))
+
+    def test_jsonl_storage_appends_the_articles_to_shards(self):
+        # Given
+        article_storage = ArticleStorage(storage_format="jsonl")
+        article_storage.create(directory="tests/helpers/new_storage")
+        article = Article(id="234", url="somepage.com/path/to/article", author="Cervantes", paragraphs=["En un lugar"])
+        # When
+        article_storage.add(article)
+        article_storage.close()
+        # Then
+        self.assertEqual(
+            ["articles-00000.idx", "articles-00000.jsonl", "catalog.sqlite", "index.csv"],
+            sorted(listdir("tests/helpers/new_storage")),
+        )
+        self.assertEqual([article], list(ArticleShards.read("tests/helpers/new_storage")))
+
+    def test_index_is_written_in_batches_before_the_storage_is_closed(self):
+        # Given
+        article_storage = ArticleStorage(index_flush_rows=2)
+        article_storage.create(directory="tests/helpers/new_storage")
+        # When
+        for article_id in ["234", "asdf4", "9af0"]:
+            article_storage.add(Article(id=article_id, url=f"somepage.com/{article_id}", paragraphs=["En un lugar"]))
+        index_before_closing = pd.read_csv("tests/helpers/new_storage/index.csv").astype("str")
+        article_storage.close()
+        # Then
+        self.assertEqual(["234", "asdf4"], list(index_before_closing["Id"]))
+        self.assertEqual(
+            ["234", "asdf4", "9af0"], list(pd.read_csv("tests/helpers/new_storage/index.csv").astype("str")["Id"])
+        )
+        self.assertEqual(3, article_storage.num_articles)
+
+    def test_index_is_flushed_once_its_rows_have_waited_long_enough(self):
+        # Given
+        article_storage = ArticleStorage(index_flush_seconds=0)
+        article_storage.create(directory="tests/helpers/new_storage")
+        # When
+        article_storage.add(Article(id="234", url="somepage.com/234", paragraphs=["En un lugar"]))
+        # Then
+        self.assertEqual(["234"], list(pd.read_csv("tests/helpers/new_storage/index.csv").astype("str")["Id"]))
+        article_storage.close()
+
+    def test_closing_the_storage_twice_leaves_the_index_as_it_was(self):
+        # Given
+        article_storage = ArticleStorage()
+        article_storage.create(directory="tests/helpers/new_storage")
+        article_storage.add(Article(id="234", url="somepage.com/234", paragraphs=["En un lugar"]))
+        # When
+        article_storage.close()
+        article_storage.close()
+        # Then
+        self.assertEqual(["234"], list(pd.read_csv("tests/helpers/new_storage/index.csv").astype("str")["Id"]))
@@ -0,0 +1,383 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from src.article_scraper import ArticleScraper, ErrorCodes
+from src.async_downloader import AsyncDownloader
+from src.http_cache import HttpCache
+from src.map_reduce import StopSignal
+from src.metrics import StageMetrics
+from src.page import Page
+
+
+class ArticlePageHandler(BaseHTTPRequestHandler):
+    delay_seconds = 0.0
+    etag = '"92fad4f5a39"'
+
+    def do_GET(self):
+        time.sleep(self.delay_seconds)
+
+        if not self.path.startswith("/article"):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        with open("tests/helpers/example_article_1.html", "rb") as file:
+            body = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AsyncDownloaderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        ArticlePageHandler.delay_seconds = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ArticlePageHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def download(self, url, **kwargs):
+        async def download():
+            async with aiohttp.ClientSession() as session:
+                return await ArticleScraper._download_article_page_async(session, url, **kwargs)
+
+        return asyncio.run(download())
+
+    def test_download_and_parse_article_page(self):
+        # When
+        page = self.download(f"{self.base_url}/article")
+        article, error_code = ArticleScraper._page_to_article(page)
+        # Then
+        self.assertEqual(ErrorCodes.OK, error_code)
+        self.assertEqual("92fad4f5a39", article.id)
+        self.assertEqual(f"{self.base_url}/article", article.url)
+        self.assertEqual(16, article.duration_minutes)
+
+    def test_cached_pages_are_served_fresh_and_revalidated_once_stale(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            url = f"{self.base_url}/article"
+            self.download(url, http_cache=HttpCache(directory))
+            fresh_cache, stale_cache = HttpCache(directory), HttpCache(directory, ttl_seconds=0)
+            # When
+            fresh = self.download(url, http_cache=fresh_cache)
+            stale = self.download(url, http_cache=stale_cache)
+            # Then
+            self.assertEqual((ErrorCodes.OK, ErrorCodes.OK), (fresh.error_code, stale.error_code))
+            self.assertEqual(fresh.content, stale.content)
+            self.assertEqual((1, 0, 0), (fresh_cache.num_hits, fresh_cache.num_revalidations, fresh_cache.num_misses))
+            self.assertEqual((0, 1, 0), (stale_cache.num_hits, stale_cache.num_revalidations, stale_cache.num_misses))
+
+    def test_revalidated_pages_whose_body_is_gone_are_downloaded_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            url = f"{self.base_url}/article"
+            self.download(url, http_cache=HttpCache(directory))
+            cache = HttpCache(directory, ttl_seconds=0)
+            os.remove(cache._path(cache.lookup(url).key, ".body"))
+            # When
+            page = self.download(url, http_cache=cache)
+            # Then
+            self.assertEqual(ErrorCodes.OK, page.error_code)
+            self.assertEqual("92fad4f5a39", ArticleScraper._page_to_article(page)[0].id)
+            self.assertEqual((0, 0, 1), (cache.num_hits, cache.num_revalidations, cache.num_misses))
+            self.assertIsNotNone(cache.read(cache.lookup(url)))
+
+    def test_cache_and_archive_are_written_off_the_event_loop(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Given
+            threads = []
+            http_cache = HttpCache(directory)
+            http_cache.record_download = mock.Mock(side_effect=lambda *args: threads.append(threading.current_thread()))
+            page_archive = mock.Mock(add=mock.Mock(side_effect=lambda page: threads.append(threading.current_thread())))
+            # When
+            page = self.download(f"{self.base_url}/article", http_cache=http_cache, page_archive=page_archive)
+            # Then
+            self.assertEqual(ErrorCodes.OK, page.error_code)
+            self.assertEqual(2, len(threads))
+            self.assertNotIn(threading.current_thread(), threads)
+
+    def test_not_found_page_returns_page_with_error_code(self):
+        # When
+        page = self.download(f"{self.base_url}/missing")
+        # Then
+        self.assertEqual(ErrorCodes.NOT_FOUND, page.error_code)
+
+    def test_url_with_missing_schema_returns_page_with_error_code(self):
+        # When
+        page = self.download("google.com")
+        # Then
+        self.assertEqual(ErrorCodes.MISSING_SCHEMA, page.error_code)
+        self.assertIsNone(page.content)
+
+    def test_unreachable_host_returns_page_with_connection_error(self):
+        # Given
+        self.server.shutdown()
+        self.server.server_close()
+        # When
+        page = self.download(f"{self.base_url}/article")
+        # Then
+        self.assertEqual(ErrorCodes.CONNECTION_ERROR, page.error_code)
+
+    def test_downloader_consumes_every_url_and_then_finishes(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(20):
+            input_queue.put(f"{self.base_url}/article-{i}")
+
+        output_queue = queue.Queue()
+        num_active_workers = multiprocessing.Value("i", 0)
+        # When
+        job = AsyncDownloader(
+            function=ArticleScraper._download_article_page_async,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=num_active_workers,
+            max_concurrent_downloads=5,
+            name="Job name",
+        )
+        job.start()
+        job.join()
+        # Then
+        pages = list(output_queue.queue)
+        self.assertEqual(20, len(pages))
+        self.assertTrue(all(page.error_code == ErrorCodes.OK for page in pages))
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_downloads_are_kept_in_flight_concurrently(self):
+        # Given
+        ArticlePageHandler.delay_seconds = 0.5
+        input_queue = queue.Queue()
+        for i in range(20):
+            input_queue.put(f"{self.base_url}/article-{i}")
+
+        output_queue = queue.Queue()
+        # When
+        job = AsyncDownloader(
+            function=ArticleScraper._download_article_page_async,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=multiprocessing.Value("i", 0),
+            max_concurrent_downloads=20,
+            name="Job name",
+        )
+        start = time.time()
+        job.start()
+        job.join()
+        elapsed = time.time() - start
+        # Then
+        self.assertEqual(20, output_queue.qsize())
+        self.assertLess(elapsed, 5)
+
+    def test_downloader_waits_for_upstream_workers_before_finishing(self):
+        # Given
+        input_queue = queue.Queue()
+        output_queue = queue.Queue()
+        external_workers_to_wait_for = multiprocessing.Value("i", 1)
+        job = AsyncDownloader(
+            function=ArticleScraper._download_article_page_async,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=external_workers_to_wait_for,
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+        )
+        job.queue_timeout_seconds = 0.1
+        # When
+        job.start()
+        time.sleep(0.5)
+        input_queue.put(f"{self.base_url}/article")
+        with external_workers_to_wait_for.get_lock():
+            external_workers_to_wait_for.value = 0
+        job.join()
+        # Then
+        self.assertEqual(1, output_queue.qsize())
+
+    def test_cancelled_downloader_abandons_the_remaining_urls(self):
+        # Given
+        ArticlePageHandler.delay_seconds = 0.5
+        input_queue = queue.Queue()
+        for i in range(20):
+            input_queue.put(f"{self.base_url}/article-{i}")
+
+        output_queue = queue.Queue()
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = AsyncDownloader(
+            function=ArticleScraper._download_article_page_async,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_workers,
+            max_concurrent_downloads=2,
+            name="Job name",
+        )
+        # When
+        job.start()
+        time.sleep(0.2)
+        job.cancel()
+        job.join()
+        # Then
+        self.assertLess(output_queue.qsize(), 5)
+        self.assertGreater(input_queue.qsize(), 10)
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_cancelled_downloader_waiting_on_an_empty_input_queue_stops_at_once(self):
+        # Given
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = AsyncDownloader(
+            function=ArticleScraper._download_article_page_async,
+            input_queue=queue.Queue(),
+            output_queue=queue.Queue(),
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_workers,
+            name="Job name",
+        )
+        # When
+        job.start()
+        time.sleep(0.2)
+        job.cancel()
+        start = time.time()
+        job.join()
+        # Then
+        self.assertLess(time.time() - start, AsyncDownloader.queue_timeout_seconds / 2)
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_stop_signal_ends_the_downloads_and_is_passed_downstream(self):
+        # Given
+        async def function(session, url):
+            if url == "failing":
+                raise ConnectionError(url)
+            if url == "retried":
+                return None
+            return [url]
+
+        input_queue = queue.Queue()
+        for url in ("first", "failing", "retried", "second"):
+            input_queue.put(url)
+        input_queue.put(StopSignal())
+        input_queue.put("after the stop")
+
+        output_queue = queue.Queue()
+        metrics = StageMetrics("download")
+        job = AsyncDownloader(
+            function=function,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=multiprocessing.Value("i", 0),
+            max_concurrent_downloads=3,
+            name="Job name",
+            signal_downstream=True,
+            metrics=metrics,
+        )
+        # When
+        job.start()
+        job.join()
+        # Then
+        outputs = list(output_queue.queue)
+        self.assertEqual(["first", "second"], sorted(outputs[:-1]))
+        self.assertIsInstance(outputs[-1], StopSignal)
+        self.assertEqual(["after the stop"], list(input_queue.queue))
+        snapshot = metrics.snapshot()
+        self.assertEqual((4, 2, 1), (snapshot["items_in"], snapshot["items_out"], snapshot["errors"]))
+        self.assertEqual(3, snapshot["workers"])
+
+    def test_downloader_cancelled_before_it_starts_downloads_nothing(self):
+        # Given
+        input_queue = queue.Queue()
+        input_queue.put(f"{self.base_url}/article")
+        output_queue = queue.Queue()
+        job = AsyncDownloader(
+            function=ArticleScraper._download_article_page_async,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+        )
+        # When
+        job.cancel()
+        job.start()
+        job.join()
+        # Then
+        self.assertEqual(0, output_queue.qsize())
+        self.assertEqual(f"{self.base_url}/article", input_queue.get_nowait())
+
+    def test_errors_are_logged_and_the_downloads_go_on(self):
+        # Given
+        async def function(session, url):
+            raise ConnectionError(url)
+
+        input_queue = queue.Queue()
+        input_queue.put("failing")
+        input_queue.put(StopSignal())
+        output_queue = queue.Queue()
+        job = AsyncDownloader(
+            function=function,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+        )
+        # When
+        with self.assertLogs("general_logger.src.async_downloader", level="INFO") as logs:
+            job.start()
+            job.join()
+        # Then
+        self.assertIn("Job name. Error applying function: failing", logs.output[0])
+        self.assertEqual(0, output_queue.qsize())
+
+    def test_pages_with_error_codes_are_counted_by_code(self):
+        # Given
+        async def function(session, url):
+            return Page(url, ErrorCodes.NOT_FOUND if url == "missing" else ErrorCodes.OK)
+
+        input_queue = queue.Queue()
+        for url in ("first", "missing"):
+            input_queue.put(url)
+        input_queue.put(StopSignal())
+        metrics = StageMetrics("download")
+        job = AsyncDownloader(
+            function=function,
+            input_queue=input_queue,
+            output_queue=queue.Queue(),
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            metrics=metrics,
+        )
+        # When
+        job.start()
+        job.join()
+        # Then
+        snapshot = metrics.snapshot()
+        self.assertEqual((2, 2, 1), (snapshot["items_in"], snapshot["items_out"], snapshot["errors"]))
+        self.assertEqual({"NOT_FOUND": 1}, snapshot["errors_by_type"])
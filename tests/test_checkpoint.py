@@ -0,0 +1,99 @@
+from datetime import date
+import os
+import tempfile
+import unittest
+
+from src.article import Article
+from src.checkpoint import Checkpoint
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_loading_a_directory_without_checkpoint_starts_from_scratch(self):
+        # When
+        checkpoint = Checkpoint.load(self.directory.name)
+        # Then
+        self.assertIsNone(checkpoint.start_date)
+        self.assertIsNone(checkpoint.next_search_date)
+        self.assertEqual([], checkpoint.pending_urls)
+
+    def test_loaded_checkpoint_returns_the_urls_found_but_not_stored(self):
+        # Given
+        checkpoint = Checkpoint(self.directory.name)
+        checkpoint.start(date(2021, 4, 4))
+        checkpoint.record_day(date(2021, 4, 3), ["https://medium.com/a-92fad4f5a39", "https://medium.com/b-3a6d1ce1e86a"])
+        checkpoint.record_stored(Article(id="92fad4f5a39", url="https://medium.com/a-92fad4f5a39", title="SEO"))
+        checkpoint.close()
+        # When
+        loaded = Checkpoint.load(self.directory.name)
+        # Then
+        self.assertEqual(["https://medium.com/b-3a6d1ce1e86a"], loaded.pending_urls)
+        self.assertEqual(
+            {"92fad4f5a39": Article(id="92fad4f5a39", url="https://medium.com/a-92fad4f5a39", title="SEO")},
+            loaded.stored_articles
+        )
+
+    def test_search_resumes_at_the_first_day_that_was_not_searched(self):
+        # Given
+        checkpoint = Checkpoint(self.directory.name)
+        checkpoint.start(date(2021, 4, 4))
+        for day in [date(2021, 4, 3), date(2021, 4, 1), date(2021, 4, 2), date(2021, 3, 29)]:
+            checkpoint.record_day(day, [])
+        checkpoint.close()
+        # When
+        loaded = Checkpoint.load(self.directory.name)
+        # Then
+        self.assertEqual(date(2021, 4, 4), loaded.start_date)
+        self.assertEqual(date(2021, 4, 1), loaded.next_search_date)
+
+    def test_a_line_cut_by_a_crash_is_skipped_and_the_next_run_appends_after_it(self):
+        # Given
+        checkpoint = Checkpoint(self.directory.name)
+        checkpoint.start(date(2021, 4, 4))
+        checkpoint.record_day(date(2021, 4, 3), ["https://medium.com/a-92fad4f5a39"])
+        checkpoint.close()
+        with open(os.path.join(self.directory.name, Checkpoint.FILE_NAME), "a", encoding="utf-8") as file:
+            file.write('{"day": "2021-04-02", "ur')
+        # When
+        resumed = Checkpoint.load(self.directory.name)
+        resumed.start(date(2021, 5, 5))
+        resumed.record_day(date(2021, 4, 2), [])
+        resumed.close()
+        loaded = Checkpoint.load(self.directory.name)
+        # Then
+        self.assertEqual(date(2021, 4, 4), loaded.start_date)
+        self.assertEqual({date(2021, 4, 3), date(2021, 4, 2)}, loaded.searched_days)
+        self.assertEqual(["https://medium.com/a-92fad4f5a39"], loaded.pending_urls)
+
+    def test_days_searched_for_each_tag_are_kept_with_the_tag_of_their_urls(self):
+        # Given
+        checkpoint = Checkpoint(self.directory.name)
+        checkpoint.start(date(2021, 4, 4))
+        checkpoint.record_day(date(2021, 4, 3), ["https://medium.com/a-92fad4f5a39"], tag="seo")
+        checkpoint.record_day(date(2021, 4, 3), ["https://medium.com/b-3a6d1ce1e86a"], tag="python")
+        checkpoint.close()
+        # When
+        loaded = Checkpoint.load(self.directory.name)
+        # Then
+        self.assertEqual({("seo", date(2021, 4, 3)), ("python", date(2021, 4, 3))}, loaded.searched_tag_days)
+        self.assertEqual({"92fad4f5a39": "seo", "3a6d1ce1e86a": "python"}, loaded.found_tags)
+
+    def test_records_of_unknown_kinds_are_skipped(self):
+        # Given
+        checkpoint = Checkpoint(self.directory.name)
+        checkpoint.start(date(2021, 4, 4))
+        checkpoint.close()
+        checkpoint.close()
+        with open(os.path.join(self.directory.name, Checkpoint.FILE_NAME), "a", encoding="utf-8") as file:
+            file.write('{"paused": "2021-04-04T10:00:00"}\n')
+        # When
+        loaded = Checkpoint.load(self.directory.name)
+        # Then
+        self.assertEqual(date(2021, 4, 4), loaded.start_date)
+        self.assertEqual(set(), loaded.searched_days)
+        self.assertEqual({}, loaded.stored_articles)
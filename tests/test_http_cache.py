@@ -0,0 +1,211 @@
+import os
+import tempfile
+import time
+import unittest
+
+import requests
+import requests_mock
+
+from src.http_cache import HttpCache
+
+
+class HttpCacheTests(unittest.TestCase):
+    url = "https://medium.com/@miggyperez/7-delicious-paella-recipes-3a6d1ce1e86a"
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.session = requests.Session()
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.directory.cleanup()
+
+    @requests_mock.Mocker()
+    def test_fresh_pages_are_served_without_network(self, m):
+        # Given
+        m.get(self.url, content=b"<html>paella</html>", status_code=200)
+        cache = HttpCache(self.directory.name)
+        cache.get(self.session.get, self.url)
+        # When
+        response = cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual(1, m.call_count)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b"<html>paella</html>", response.content)
+        self.assertEqual(1, cache.num_hits)
+
+    @requests_mock.Mocker()
+    def test_pages_are_kept_between_runs(self, m):
+        # Given
+        m.get(self.url, content=b"<html>paella</html>", status_code=200)
+        HttpCache(self.directory.name).get(self.session.get, self.url)
+        # When
+        response = HttpCache(self.directory.name).get(self.session.get, self.url)
+        # Then
+        self.assertEqual(1, m.call_count)
+        self.assertEqual(b"<html>paella</html>", response.content)
+
+    @requests_mock.Mocker()
+    def test_error_pages_are_not_cached(self, m):
+        # Given
+        m.get(self.url, status_code=404)
+        cache = HttpCache(self.directory.name)
+        cache.get(self.session.get, self.url)
+        # When
+        response = cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual(2, m.call_count)
+        self.assertEqual(404, response.status_code)
+
+    @requests_mock.Mocker()
+    def test_stale_pages_are_revalidated_with_their_etag(self, m):
+        # Given
+        m.get(
+            self.url,
+            [
+                {"content": b"<html>paella</html>", "status_code": 200, "headers": {"ETag": '"v1"'}},
+                {"status_code": 304},
+            ]
+        )
+        cache = HttpCache(self.directory.name, ttl_seconds=0)
+        cache.get(self.session.get, self.url)
+        # When
+        response = cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual('"v1"', m.request_history[1].headers["If-None-Match"])
+        self.assertEqual(b"<html>paella</html>", response.content)
+        self.assertEqual(1, cache.num_revalidations)
+
+    @requests_mock.Mocker()
+    def test_revalidated_pages_whose_body_is_gone_are_downloaded_again_with_the_caller_headers(self, m):
+        # Given
+        m.get(
+            self.url,
+            [
+                {"content": b"<html>paella</html>", "status_code": 200, "headers": {"ETag": '"v1"'}},
+                {"status_code": 304},
+                {"content": b"<html>fideua</html>", "status_code": 200},
+            ]
+        )
+        cache = HttpCache(self.directory.name, ttl_seconds=0)
+        cache.get(self.session.get, self.url)
+        entry = cache.lookup(self.url)
+
+        def fetch(url, **kwargs):
+            response = self.session.get(url, **kwargs)
+            if response.status_code == 304:
+                # Another thread evicts the body between the revalidation and the read
+                os.remove(cache._path(entry.key, ".body"))
+            return response
+
+        # When
+        response = cache.get(fetch, self.url, headers={"User-Agent": "scraper"})
+        # Then
+        self.assertEqual(3, m.call_count)
+        self.assertEqual("scraper", m.request_history[2].headers["User-Agent"])
+        self.assertNotIn("If-None-Match", m.request_history[2].headers)
+        self.assertEqual(b"<html>fideua</html>", response.content)
+        self.assertEqual(b"<html>fideua</html>", cache.read(entry))
+        self.assertEqual(2, cache.num_misses)
+
+    @requests_mock.Mocker()
+    def test_not_modified_answers_to_pages_that_were_never_cached_are_downloaded_again(self, m):
+        # Given
+        m.get(self.url, [{"status_code": 304}, {"content": b"<html>paella</html>", "status_code": 200}])
+        cache = HttpCache(self.directory.name)
+        # When
+        response = cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual(2, m.call_count)
+        self.assertEqual(b"<html>paella</html>", response.content)
+        self.assertEqual((0, 1), (cache.num_revalidations, cache.num_misses))
+
+    @requests_mock.Mocker()
+    def test_stale_pages_that_changed_are_replaced(self, m):
+        # Given
+        m.get(
+            self.url,
+            [
+                {"content": b"<html>paella</html>", "status_code": 200, "headers": {"Last-Modified": "Sat, 03 Apr 2021"}},
+                {"content": b"<html>fideua</html>", "status_code": 200},
+            ]
+        )
+        cache = HttpCache(self.directory.name, ttl_seconds=0)
+        cache.get(self.session.get, self.url)
+        # When
+        cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual("Sat, 03 Apr 2021", m.request_history[1].headers["If-Modified-Since"])
+        self.assertEqual(b"<html>fideua</html>", cache.read(cache.lookup(self.url)))
+
+    @requests_mock.Mocker()
+    def test_least_recently_used_pages_are_evicted_when_the_cache_is_full(self, m):
+        # Given
+        urls = [f"https://medium.com/article-{i}" for i in range(3)]
+        for url in urls:
+            m.get(url, content=b"x" * 100, status_code=200)
+        cache = HttpCache(self.directory.name, max_size_bytes=250)
+        cache.get(self.session.get, urls[0])
+        cache.get(self.session.get, urls[1])
+        time.sleep(0.01)
+        cache.get(self.session.get, urls[0])
+        # When
+        cache.get(self.session.get, urls[2])
+        reopened = HttpCache(self.directory.name, max_size_bytes=250)
+        # Then
+        self.assertIsNotNone(cache.lookup(urls[0]))
+        self.assertIsNone(cache.lookup(urls[1]))
+        self.assertIsNotNone(cache.lookup(urls[2]))
+        self.assertEqual(200, reopened.size)
+        self.assertEqual(
+            2, sum(file.endswith(".body") for _, _, files in os.walk(self.directory.name) for file in files)
+        )
+
+    @requests_mock.Mocker()
+    def test_fresh_pages_whose_body_is_gone_are_downloaded_again(self, m):
+        # Given
+        m.get(self.url, content=b"<html>paella</html>", status_code=200)
+        cache = HttpCache(self.directory.name)
+        cache.get(self.session.get, self.url)
+        os.remove(cache._path(cache.lookup(self.url).key, ".body"))
+        # When
+        response = cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual(2, m.call_count)
+        self.assertEqual(b"<html>paella</html>", response.content)
+        self.assertEqual(0, cache.num_hits)
+        self.assertEqual(2, cache.num_misses)
+
+    @requests_mock.Mocker()
+    def test_pages_whose_files_are_already_gone_are_evicted_all_the_same(self, m):
+        # Given
+        urls = [f"https://medium.com/article-{i}" for i in range(2)]
+        for url in urls:
+            m.get(url, content=b"x" * 100, status_code=200)
+        cache = HttpCache(self.directory.name, max_size_bytes=150)
+        cache.get(self.session.get, urls[0])
+        key = cache.lookup(urls[0]).key
+        for suffix in (".json", ".body"):
+            os.remove(cache._path(key, suffix))
+        # When
+        cache.get(self.session.get, urls[1])
+        with self.assertLogs("general_logger.src.http_cache", level="INFO") as logs:
+            cache.close()
+        # Then
+        self.assertEqual(100, cache.size)
+        self.assertIsNotNone(cache.lookup(urls[1]))
+        self.assertEqual(["HTTP cache: 0 hits, 0 revalidated and 2 misses"], [r.getMessage() for r in logs.records])
+
+    @requests_mock.Mocker()
+    def test_pages_stored_by_another_cache_on_the_same_directory_are_served(self, m):
+        # Given
+        m.get(self.url, content=b"<html>paella</html>", status_code=200)
+        cache = HttpCache(self.directory.name)
+        HttpCache(self.directory.name).get(self.session.get, self.url)
+        # When
+        response = cache.get(self.session.get, self.url)
+        # Then
+        self.assertEqual(1, m.call_count)
+        self.assertEqual(b"<html>paella</html>", response.content)
+        self.assertEqual(1, cache.num_hits)
+        self.assertEqual(0, cache.size)
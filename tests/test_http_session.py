@@ -0,0 +1,77 @@
+import threading
+import unittest
+
+from src.http_session import SessionPool
+
+
+class SessionPoolTests(unittest.TestCase):
+    def test_same_thread_reuses_its_session(self):
+        # Given
+        pool = SessionPool()
+        # When
+        first_session = pool.get_session()
+        second_session = pool.get_session()
+        # Then
+        self.assertIs(first_session, second_session)
+
+    def test_each_thread_gets_its_own_session(self):
+        # Given
+        pool = SessionPool()
+        sessions = []
+        # When
+        threads = [threading.Thread(target=lambda: sessions.append(pool.get_session())) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Then
+        self.assertEqual(3, len({id(session) for session in sessions}))
+
+    def test_shared_pool_returns_the_same_session_to_all_threads(self):
+        # Given
+        pool = SessionPool(shared=True)
+        sessions = []
+        # When
+        threads = [threading.Thread(target=lambda: sessions.append(pool.get_session())) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Then
+        self.assertEqual(1, len({id(session) for session in sessions}))
+
+    def test_shared_session_adapters_block_at_the_configured_pool_size(self):
+        # Given
+        pool = SessionPool(pool_size=7, shared=True)
+        # When
+        session = pool.get_session()
+        # Then
+        for url in ("https://medium.com", "http://medium.com"):
+            self.assertEqual(7, session.get_adapter(url)._pool_maxsize)
+            self.assertTrue(session.get_adapter(url)._pool_block)
+
+    def test_thread_sessions_keep_one_connection_per_host(self):
+        # Given
+        pool = SessionPool(pool_size=7)
+        # When
+        session = pool.get_session()
+        # Then
+        self.assertEqual(1, session.get_adapter("https://medium.com")._pool_maxsize)
+        self.assertFalse(session.get_adapter("https://medium.com")._pool_block)
+
+    def test_disabling_keep_alive_closes_connections_after_each_request(self):
+        # Given
+        pool = SessionPool(keep_alive=False)
+        # When
+        session = pool.get_session()
+        # Then
+        self.assertEqual("close", session.headers["Connection"])
+
+    def test_sessions_with_their_own_certificates_ignore_the_environment(self):
+        # Given
+        pool = SessionPool(verify="/etc/ssl/certs/medium.pem")
+        # When
+        session = pool.get_session()
+        # Then
+        self.assertEqual("/etc/ssl/certs/medium.pem", session.verify)
+        self.assertFalse(session.trust_env)
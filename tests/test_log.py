@@ -0,0 +1,80 @@
+import logging
+import multiprocessing
+import time
+import unittest
+
+from log import RepeatedMessageFilter, start_queue_listener, stop_queue_listener
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def log_in_another_process(logger_name):
+    logging.getLogger(logger_name).info("Parsed %s", "article-1")
+
+
+class LogTests(unittest.TestCase):
+    def test_repeated_messages_are_suppressed_within_the_interval(self):
+        # Given
+        logger = logging.getLogger("test_log.repeated")
+        logger.propagate = False
+        handler = RecordingHandler()
+        handler.addFilter(RepeatedMessageFilter(interval_seconds=0.2))
+        logger.addHandler(handler)
+        # When
+        for i in range(5):
+            logger.warning("%s. Output queue is full. Trying to put element: %s", "Parse job", i)
+        logger.warning("Input queue is empty")
+        time.sleep(0.2)
+        logger.warning("%s. Output queue is full. Trying to put element: %s", "Parse job", 5)
+        # Then
+        self.assertEqual(
+            [
+                "Parse job. Output queue is full. Trying to put element: 0",
+                "Input queue is empty",
+                "Parse job. Output queue is full. Trying to put element: 5 (4 similar messages suppressed)",
+            ],
+            handler.messages,
+        )
+
+    def test_repeated_messages_about_other_subjects_are_not_suppressed(self):
+        # Given
+        logger = logging.getLogger("test_log.subjects")
+        logger.propagate = False
+        handler = RecordingHandler()
+        handler.addFilter(RepeatedMessageFilter(interval_seconds=10))
+        logger.addHandler(handler)
+        # When
+        logger.warning("%s. Error applying function: %s", "Download job", "timeout")
+        logger.warning("%s. Error applying function: %s", "Parse job", "no title")
+        logger.warning("%s. Error applying function: %s", "Parse job", "no title")
+        # Then
+        self.assertEqual(
+            ["Download job. Error applying function: timeout", "Parse job. Error applying function: no title"],
+            handler.messages,
+        )
+
+    def test_records_of_threads_and_child_processes_go_through_the_listener(self):
+        # Given
+        logger = logging.getLogger("test_log.queued")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = RecordingHandler()
+        logger.addHandler(handler)
+        start_queue_listener(logger)
+        # When
+        logger.info("Parsed %s", "article-0")
+        process = multiprocessing.Process(target=log_in_another_process, args=("test_log.queued",))
+        process.start()
+        process.join()
+        stop_queue_listener()
+        # Then
+        self.assertEqual(1, len(logger.handlers))
+        self.assertIsInstance(logger.handlers[0], logging.handlers.QueueHandler)
+        self.assertEqual(["Parsed article-0", "Parsed article-1"], handler.messages)
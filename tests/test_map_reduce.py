@@ -5,7 +5,8 @@ import time
 import unittest
 from unittest import mock
 
-from src.map_reduce import MapReduce
+from src.map_reduce import Batch, BatchReader, BatchWriter, MapReduce, StopSignal, WorkerSlot
+from src.metrics import StageMetrics
 
 
 class MapReduceTests(unittest.TestCase):
@@ -480,7 +481,7 @@ class MapReduceTests(unittest.TestCase):
         t.join()
         # Then
         self.assertEqual(2, q.get())
-        logger_info_mock.assert_called_with("Job name. Output queue is full. Trying to put element: 2")
+        logger_info_mock.assert_called_with("%s. Output queue is full. Trying to put element: %s", "Job name", 2)
 
     def test_execute_one_worker_for_source_job_stop_externally(self):
         # Given
@@ -604,3 +605,674 @@ class MapReduceTests(unittest.TestCase):
         # Then
         self.assertEqual([11, 12, 14, 15], list(output_queue.queue))
         self.assertEqual(0, num_active_workers.value)
+
+    def test_stop_signal_is_queued_after_every_output_of_a_thread_job(self):
+        # Given
+        def function(value):
+            return value + 10
+
+        input_queue = queue.Queue()
+        for i in range(1, 6):
+            input_queue.put(i)
+
+        output_queue = queue.Queue()
+        # When
+        job = MapReduce(
+            function=function,
+            num_workers=3,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            signal_downstream=True,
+        )
+        job.start()
+        job.join()
+        # Then
+        outputs = list(output_queue.queue)
+        self.assertEqual(6, len(outputs))
+        self.assertEqual([11, 12, 13, 14, 15], sorted(outputs[:5]))
+        self.assertIsInstance(outputs[5], StopSignal)
+
+    def test_stop_signal_reaches_every_worker_of_the_downstream_job(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(1, 6):
+            input_queue.put(i)
+        input_queue.put(StopSignal())
+
+        num_active_workers = multiprocessing.Value("i", 0)
+        # When
+        job = MapReduce(
+            function=lambda value: value,
+            num_workers=4,
+            input_queue=input_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_workers,
+            name="Job name",
+        )
+        start = time.time()
+        job.start()
+        job.join()
+        # Then
+        self.assertLess(time.time() - start, MapReduce.queue_timeout_seconds)
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_downstream_thread_job_drains_as_soon_as_upstream_finishes(self):
+        # Given
+        i = [0]
+
+        def produce():
+            i[0] += 1
+            time.sleep(0.1)
+            return i[0], i[0] >= 5
+
+        consumed = []
+        intermediate_queue = queue.Queue()
+        num_active_producers = multiprocessing.Value("i", 1)
+        producer = MapReduce(
+            function=produce,
+            num_workers=1,
+            output_queue=intermediate_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_producers,
+            name="Producer",
+            signal_downstream=True,
+        )
+        consumer = MapReduce(
+            function=consumed.append,
+            num_workers=3,
+            input_queue=intermediate_queue,
+            external_workers_to_wait_for=num_active_producers,
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Consumer",
+        )
+        # When
+        consumer.start()
+        producer.start()
+        producer.join()
+        producer_finished = time.time()
+        consumer.join()
+        drain_latency = time.time() - producer_finished
+        # Then
+        self.assertEqual([1, 2, 3, 4, 5], sorted(consumed))
+        self.assertLess(drain_latency, 0.5)
+
+    def test_downstream_job_drains_as_soon_as_upstream_processes_finish(self):
+        # Given
+        input_queue = multiprocessing.Queue()
+        for i in range(1, 11):
+            input_queue.put(i * 0.01)
+        input_queue.put(StopSignal())
+
+        intermediate_queue = multiprocessing.Queue()
+        consumed = []
+        num_active_processes = multiprocessing.Value("i", 0)
+        processes = MapReduce(
+            function=self.function,
+            num_workers=3,
+            input_queue=input_queue,
+            output_queue=intermediate_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_processes,
+            name="Processes",
+            concurrent=True,
+            signal_downstream=True,
+        )
+        consumer = MapReduce(
+            function=consumed.append,
+            num_workers=1,
+            input_queue=intermediate_queue,
+            external_workers_to_wait_for=num_active_processes,
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Consumer",
+        )
+        # When
+        consumer.start()
+        processes.start()
+        processes.join()
+        processes_finished = time.time()
+        consumer.join()
+        drain_latency = time.time() - processes_finished
+        # Then
+        self.assertEqual(10, len(consumed))
+        self.assertLess(drain_latency, 0.5)
+
+    def test_cancelled_job_stops_without_draining_its_input_queue(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(100):
+            input_queue.put(i)
+
+        def function(x):
+            time.sleep(0.05)
+            return x
+
+        output_queue = queue.Queue()
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = MapReduce(
+            function=function,
+            num_workers=2,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=num_active_workers,
+            name="Job name",
+            signal_downstream=True,
+        )
+        # When
+        job.start()
+        time.sleep(0.2)
+        job.cancel()
+        start = time.time()
+        job.join()
+        # Then
+        self.assertLess(time.time() - start, 0.5)
+        self.assertGreater(input_queue.qsize(), 50)
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_cancelled_job_wakes_the_workers_waiting_on_an_empty_input_queue(self):
+        for concurrent in (False, True):
+            with self.subTest(concurrent=concurrent):
+                # Given
+                input_queue = multiprocessing.Queue() if concurrent else queue.Queue()
+                num_active_workers = multiprocessing.Value("i", 0)
+                job = MapReduce(
+                    function=self.function,
+                    num_workers=3,
+                    input_queue=input_queue,
+                    output_queue=multiprocessing.Queue() if concurrent else queue.Queue(),
+                    external_workers_to_wait_for=multiprocessing.Value("i", 1),
+                    num_active_workers=num_active_workers,
+                    name="Job name",
+                    concurrent=concurrent,
+                )
+                # When
+                job.start()
+                time.sleep(0.5)
+                job.cancel()
+                start = time.time()
+                job.join()
+                # Then
+                self.assertLess(time.time() - start, MapReduce.queue_timeout_seconds / 2)
+                self.assertEqual(0, num_active_workers.value)
+
+    def test_cancelled_source_job_stops_producing(self):
+        # Given
+        def function():
+            time.sleep(0.01)
+            return [1], False
+
+        output_queue = queue.Queue()
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = MapReduce(
+            function=function,
+            num_workers=1,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_workers,
+            name="Job name",
+        )
+        # When
+        job.start()
+        time.sleep(0.1)
+        job.cancel()
+        job.join()
+        produced = output_queue.qsize()
+        time.sleep(0.1)
+        # Then
+        self.assertEqual(produced, output_queue.qsize())
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_waking_the_readers_of_a_full_queue_leaves_it_unchanged(self):
+        # Given
+        q = queue.Queue(maxsize=1)
+        q.put(1)
+        # When
+        MapReduce._wake_blocked_readers(q, 3)
+        # Then
+        self.assertEqual([1], list(q.queue))
+
+    def test_cancelled_process_job_stops_while_its_output_queue_is_full(self):
+        # Given
+        input_queue = multiprocessing.Queue()
+        for i in range(10):
+            input_queue.put(i * 0.01)
+
+        output_queue = multiprocessing.Queue(maxsize=1)
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = MapReduce(
+            function=self.function,
+            num_workers=2,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=num_active_workers,
+            name="Job name",
+            concurrent=True,
+        )
+        # When
+        job.start()
+        time.sleep(0.5)
+        job.cancel()
+        start = time.time()
+        job.join()
+        # Then
+        self.assertLess(time.time() - start, MapReduce.queue_timeout_seconds + 2)
+        self.assertEqual(0, num_active_workers.value)
+
+    def test_put_element_in_queue_gives_up_once_cancelled(self):
+        # Given
+        q = queue.Queue(maxsize=1)
+        q.put(1)
+        cancel_event = threading.Event()
+        t = threading.Thread(
+            target=MapReduce._put_element_in_queue,
+            daemon=True,
+            args=(2, q, 0.1, "Job name", cancel_event),
+        )
+        t.start()
+        # When
+        cancel_event.set()
+        t.join(timeout=1)
+        # Then
+        self.assertFalse(t.is_alive())
+        self.assertEqual([1], list(q.queue))
+
+    def test_outputs_are_put_in_batches_of_the_given_size(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(10):
+            input_queue.put(i)
+
+        output_queue = queue.Queue()
+        # When
+        job = MapReduce(
+            function=lambda x: x * 2,
+            num_workers=1,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            batch_size=4,
+        )
+        job.start()
+        job.join()
+        # Then
+        batches = list(output_queue.queue)
+        self.assertTrue(all(isinstance(batch, Batch) for batch in batches))
+        self.assertEqual([4, 4, 2], [len(batch) for batch in batches])
+        self.assertEqual([2 * i for i in range(10)], [x for batch in batches for x in batch])
+
+    def test_inputs_that_give_no_output_are_not_queued(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(6):
+            input_queue.put(i)
+        input_queue.put(StopSignal())
+
+        output_queue = queue.Queue()
+        metrics = StageMetrics("download")
+        # When
+        job = MapReduce(
+            function=lambda x: x if x % 2 == 0 else None,
+            num_workers=1,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            metrics=metrics,
+        )
+        job.start()
+        job.join()
+        # Then
+        self.assertEqual([0, 2, 4], list(output_queue.queue))
+        self.assertEqual(6, metrics.snapshot()["items_in"])
+        self.assertEqual(3, metrics.snapshot()["items_out"])
+
+    def test_inputs_that_give_no_output_are_left_out_of_the_batches(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(6):
+            input_queue.put(i)
+
+        output_queue = queue.Queue()
+        # When
+        job = MapReduce(
+            function=lambda x: x if x % 2 == 0 else None,
+            num_workers=1,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            batch_size=2,
+        )
+        job.start()
+        job.join()
+        # Then
+        self.assertEqual([[0, 2], [4]], [list(batch) for batch in output_queue.queue])
+
+    def test_partial_batch_is_put_once_it_has_lingered(self):
+        # Given
+        input_queue = queue.Queue()
+        output_queue = queue.Queue()
+        external_workers_to_wait_for = multiprocessing.Value("i", 1)
+        job = MapReduce(
+            function=lambda x: x,
+            num_workers=1,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=external_workers_to_wait_for,
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            batch_size=100,
+            linger_seconds=0.1,
+        )
+        job.start()
+        # When
+        input_queue.put(1)
+        batch = output_queue.get(timeout=1)
+        with external_workers_to_wait_for.get_lock():
+            external_workers_to_wait_for.value = 0
+        job.join()
+        # Then
+        self.assertEqual([1], batch)
+
+    def test_processes_consume_batches_element_by_element(self):
+        # Given
+        input_queue = multiprocessing.Queue()
+        input_queue.put(Batch([0.01, 0.02, 0.03]))
+        input_queue.put(Batch([0.04, 0.05]))
+        input_queue.put(StopSignal())
+
+        output_queue = multiprocessing.Queue()
+        # When
+        job = MapReduce(
+            function=self.function,
+            num_workers=2,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 1),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            concurrent=True,
+            signal_downstream=True,
+            batch_size=10,
+        )
+        job.start()
+        job.join()
+        outputs = []
+        while not isinstance(element := output_queue.get(timeout=1), StopSignal):
+            outputs.extend(element)
+        # Then
+        self.assertEqual([10.01, 10.02, 10.03, 10.04, 10.05], sorted(outputs))
+
+    def test_record_the_metrics_of_every_worker(self):
+        # Given
+        input_queue = queue.Queue()
+        output_queue = queue.Queue()
+        for i in range(5):
+            input_queue.put(i)
+        metrics = StageMetrics("parse")
+        job = MapReduce(
+            function=lambda x: x * 2,
+            num_workers=2,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+            metrics=metrics,
+        )
+        # When
+        job.start()
+        job.join()
+        snapshot = metrics.snapshot()
+        # Then
+        self.assertEqual(2, snapshot["workers"])
+        self.assertEqual(5, snapshot["items_in"])
+        self.assertEqual(5, snapshot["items_out"])
+
+    def test_grow_busy_workers_with_a_backlog_and_shrink_idle_ones(self):
+        # Given
+        job = MapReduce(
+            function=lambda x: x,
+            num_workers=2,
+            max_workers=8,
+            input_queue=queue.Queue(),
+            output_queue=queue.Queue(),
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+        )
+        # Then
+        self.assertEqual(3, job.next_num_workers(utilization=0.9, input_queue_depth=10))
+        self.assertEqual(2, job.next_num_workers(utilization=0.9, input_queue_depth=0))
+        self.assertEqual(2, job.next_num_workers(utilization=0.5, input_queue_depth=10))
+        self.assertEqual(1, job.next_num_workers(utilization=0.1, input_queue_depth=10))
+
+    def test_resize_within_the_worker_range(self):
+        # Given
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = MapReduce(
+            function=lambda x: x,
+            num_workers=2,
+            max_workers=4,
+            input_queue=queue.Queue(),
+            output_queue=queue.Queue(),
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=num_active_workers,
+            name="Job name",
+        )
+        # When
+        job.resize(10)
+        num_workers_after_growing = job.num_workers
+        job.resize(0)
+        # Then
+        self.assertEqual(4, num_workers_after_growing)
+        self.assertEqual(2, job.num_workers)
+        self.assertEqual(4, len(job.workers))
+        self.assertEqual(4, num_active_workers.value)
+
+    def test_parked_workers_do_not_take_inputs(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(10):
+            input_queue.put(i)
+        output_queue = queue.Queue()
+        num_active_workers = multiprocessing.Value("i", 0)
+        thread_names = set()
+
+        def function(value):
+            thread_names.add(threading.current_thread().name)
+            return value
+
+        job = MapReduce(
+            function=function,
+            num_workers=1,
+            max_workers=3,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=num_active_workers,
+            name="Job name",
+        )
+        # When
+        job.start()
+        job.join()
+        # Then
+        self.assertEqual(list(range(10)), sorted(output_queue.queue))
+        self.assertEqual(1, len(thread_names))
+        self.assertEqual(0, num_active_workers.value)
+
+    @mock.patch.object(MapReduce, "autoscale_interval_seconds", 0.2)
+    def test_add_workers_while_they_are_busy_with_a_backlog(self):
+        # Given
+        input_queue = queue.Queue()
+        for i in range(60):
+            input_queue.put(i)
+        output_queue = queue.Queue()
+        external_workers_to_wait_for = multiprocessing.Value("i", 1)
+        num_workers = []
+
+        def function(value):
+            time.sleep(0.05)
+            num_workers.append(job.num_workers)
+            return value
+
+        job = MapReduce(
+            function=function,
+            num_workers=1,
+            max_workers=4,
+            input_queue=input_queue,
+            output_queue=output_queue,
+            external_workers_to_wait_for=external_workers_to_wait_for,
+            num_active_workers=multiprocessing.Value("i", 0),
+            name="Job name",
+        )
+        # When
+        job.start()
+        while not input_queue.empty():
+            time.sleep(0.05)
+        external_workers_to_wait_for.value = 0
+        job.join()
+        # Then
+        self.assertEqual(list(range(60)), sorted(output_queue.queue))
+        self.assertEqual(1, num_workers[0])
+        self.assertGreater(max(num_workers), 1)
+
+    def test_map_job_draining_its_input_stops_at_a_stop_signal(self):
+        # Given
+        input_queue = queue.Queue()
+        for element in (1, StopSignal(), 2):
+            input_queue.put(element)
+        output_queue = queue.Queue()
+        # When
+        MapReduce._run_until_input_queue_is_empty(
+            lambda value: value + 10, input_queue, output_queue, "Job name", threading.Event()
+        )
+        # Then
+        self.assertEqual([11], list(output_queue.queue))
+        self.assertEqual(2, input_queue.get_nowait())
+        self.assertIsInstance(input_queue.get_nowait(), StopSignal)
+
+    def test_cancelled_jobs_neither_queue_nor_drain_any_more_elements(self):
+        # Given
+        input_queue = queue.Queue()
+        input_queue.put(1)
+        output_queue = queue.Queue()
+        function = mock.Mock()
+        cancel_event = threading.Event()
+        cancel_event.set()
+        # When
+        MapReduce._put_in_queue([1, 2, 3], output_queue, 0.1, "Job name", cancel_event)
+        MapReduce._consume_input_queue_until_it_is_empty(function, input_queue, "Job name", cancel_event)
+        # Then
+        self.assertTrue(output_queue.empty())
+        self.assertEqual(1, input_queue.qsize())
+        function.assert_not_called()
+
+    def test_batch_held_up_by_a_full_queue_releases_its_elements_once_cancelled(self):
+        # Given
+        q = queue.Queue(maxsize=1)
+        q.put(1)
+        pages = [mock.Mock(), mock.Mock()]
+        cancel_event = threading.Event()
+        cancel_event.set()
+        # When
+        MapReduce._put_element_in_queue(Batch(pages), q, 0.1, "Job name", cancel_event)
+        # Then
+        self.assertEqual([1], list(q.queue))
+        for page in pages:
+            page.release.assert_called_once_with()
+
+    def test_abandoned_workers_release_their_buffered_inputs_and_stop_flushing_their_queues(self):
+        # Given
+        input_queue = mock.Mock(spec=["get", "put", "cancel_join_thread"])
+        output_queue = mock.Mock(spec=["put", "cancel_join_thread"])
+        reader = BatchReader(input_queue)
+        pages = [mock.Mock(), mock.Mock()]
+        reader.pending.extend(pages + ["https://medium.com/a-92fad4f5a39"])
+        # When
+        MapReduce._abandon_buffered_elements(reader, output_queue)
+        MapReduce._abandon_buffered_elements(None, output_queue)
+        # Then
+        self.assertEqual(0, len(reader.pending))
+        for page in pages:
+            page.release.assert_called_once_with()
+        input_queue.cancel_join_thread.assert_called_once_with()
+        self.assertEqual(2, output_queue.cancel_join_thread.call_count)
+
+    def test_empty_batches_give_no_input(self):
+        # Given
+        q = queue.Queue()
+        q.put(Batch())
+        reader = BatchReader(q)
+        # When / Then
+        with self.assertRaises(queue.Empty):
+            reader.get(timeout=0.1)
+
+    def test_partial_batch_that_lingers_longer_than_the_wait_for_input_is_kept(self):
+        # Given
+        output_queue = queue.Queue()
+        writer = BatchWriter(output_queue, batch_size=10, linger_seconds=60)
+        writer.put(1)
+        reader = BatchReader(queue.Queue(), writer)
+        # When
+        with self.assertRaises(queue.Empty):
+            reader.get(timeout=0.1)
+        # Then
+        self.assertEqual([1], writer.pending)
+        self.assertTrue(output_queue.empty())
+
+    def test_only_jobs_with_an_input_queue_can_be_autoscaled(self):
+        # When / Then
+        with self.assertRaises(ValueError):
+            MapReduce(
+                function=lambda: ([], True),
+                num_workers=1,
+                max_workers=2,
+                output_queue=queue.Queue(),
+                external_workers_to_wait_for=multiprocessing.Value("i", 1),
+                num_active_workers=multiprocessing.Value("i", 0),
+                name="Job name",
+            )
+
+    def test_parked_worker_hands_over_its_partial_batch(self):
+        # Given
+        input_queue = queue.Queue()
+        input_queue.put(1)
+        output_queue = queue.Queue()
+        writer = BatchWriter(output_queue, batch_size=10, linger_seconds=60)
+        writer.put(2)
+        reader = BatchReader(input_queue, writer, WorkerSlot(1, multiprocessing.Value("i", 1)))
+        # When
+        with self.assertRaises(queue.Empty):
+            reader.get(timeout=0.01)
+        # Then
+        self.assertEqual([[2]], list(output_queue.queue))
+        self.assertEqual(1, input_queue.qsize())
+
+    @mock.patch.object(MapReduce, "autoscale_interval_seconds", 0.01)
+    def test_autoscaler_stops_once_every_worker_has_finished(self):
+        # Given
+        num_active_workers = multiprocessing.Value("i", 0)
+        job = MapReduce(
+            function=lambda value: value,
+            num_workers=1,
+            max_workers=2,
+            input_queue=queue.Queue(),
+            output_queue=queue.Queue(),
+            external_workers_to_wait_for=multiprocessing.Value("i", 0),
+            num_active_workers=num_active_workers,
+            name="Job name",
+        )
+        num_active_workers.value = 0
+        # When
+        job._autoscale_until_finished()
+        # Then
+        self.assertEqual(1, job.num_workers)
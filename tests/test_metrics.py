@@ -0,0 +1,182 @@
+import multiprocessing
+import queue
+import time
+import unittest
+from unittest import mock
+import urllib.request
+
+from src.metrics import InstrumentedFunction, PipelineMetrics, StageMetrics
+from src.page import ErrorCodes, Page
+
+
+def record_in_another_process(metrics):
+    metrics.record(0.2, num_outputs=3)
+
+
+class StageMetricsTests(unittest.TestCase):
+    def test_calls_are_counted_with_their_latency(self):
+        # Given
+        metrics = StageMetrics("parse")
+        metrics.set_workers(2)
+        # When
+        metrics.record(0.003, num_outputs=2)
+        metrics.record(0.7)
+        snapshot = metrics.snapshot()
+        # Then
+        self.assertEqual(2, snapshot["items_in"])
+        self.assertEqual(3, snapshot["items_out"])
+        self.assertEqual(2, snapshot["workers"])
+        self.assertAlmostEqual(0.703, snapshot["busy_seconds"])
+        self.assertEqual(2, snapshot["latency_seconds"]["count"])
+        buckets = dict(snapshot["latency_seconds"]["buckets"])
+        self.assertEqual(1, buckets[0.005])
+        self.assertEqual(1, buckets[1.0])
+        self.assertEqual(0, buckets[float("inf")])
+
+    def test_errors_are_counted_by_type(self):
+        # Given
+        metrics = StageMetrics("download")
+        # When
+        metrics.record(0.1, error=TimeoutError())
+        metrics.record(0.1, error=ValueError())
+        metrics.record(0.1, error=TimeoutError())
+        snapshot = metrics.snapshot()
+        # Then
+        self.assertEqual(3, snapshot["errors"])
+        self.assertEqual(0, snapshot["items_out"])
+        self.assertEqual({"TimeoutError": 2, "ValueError": 1}, snapshot["errors_by_type"])
+
+    def test_error_codes_are_counted_by_name_along_with_the_outputs(self):
+        # Given
+        metrics = StageMetrics("download")
+        # When
+        metrics.record(0.1, error_code=ErrorCodes.OK)
+        metrics.record(0.1, error_code=ErrorCodes.NOT_FOUND)
+        metrics.record(0.1, error_code=ErrorCodes.TIMEOUT)
+        snapshot = metrics.snapshot()
+        # Then
+        self.assertEqual(2, snapshot["errors"])
+        self.assertEqual(3, snapshot["items_out"])
+        self.assertEqual({"NOT_FOUND": 1, "TIMEOUT": 1}, snapshot["errors_by_type"])
+
+    def test_error_types_beyond_the_last_slot_are_counted_with_it(self):
+        # Given
+        metrics = StageMetrics("download")
+        # When
+        for i in range(StageMetrics.MAX_ERROR_TYPES + 2):
+            metrics.record(0.1, error=type(f"Error{i}", (Exception,), {})())
+        errors = metrics.snapshot()["errors_by_type"]
+        # Then
+        self.assertEqual(StageMetrics.MAX_ERROR_TYPES, len(errors))
+        self.assertEqual(3, errors[f"Error{StageMetrics.MAX_ERROR_TYPES - 1}"])
+
+    def test_counters_are_shared_with_other_processes(self):
+        # Given
+        metrics = StageMetrics("parse")
+        process = multiprocessing.Process(target=record_in_another_process, args=(metrics,))
+        # When
+        process.start()
+        process.join()
+        snapshot = metrics.snapshot()
+        # Then
+        self.assertEqual(1, snapshot["items_in"])
+        self.assertEqual(3, snapshot["items_out"])
+
+
+class InstrumentedFunctionTests(unittest.TestCase):
+    def test_outputs_are_counted_the_way_they_are_queued(self):
+        # Given
+        source_metrics, map_metrics, sink_metrics = StageMetrics("search"), StageMetrics("parse"), StageMetrics("save")
+        source = InstrumentedFunction(lambda: (["a", "b"], False), source_metrics, False, True)
+        function = InstrumentedFunction(lambda x: None if x is None else [x, x], map_metrics, True, True)
+        sink = InstrumentedFunction(lambda x: None, sink_metrics, True, False)
+        # When
+        source()
+        function(1)
+        function(2)
+        function(None)
+        sink(1)
+        # Then
+        self.assertEqual((0, 2), (source_metrics.snapshot()["items_in"], source_metrics.snapshot()["items_out"]))
+        self.assertEqual((3, 2), (map_metrics.snapshot()["items_in"], map_metrics.snapshot()["items_out"]))
+        self.assertEqual((1, 1), (sink_metrics.snapshot()["items_in"], sink_metrics.snapshot()["items_out"]))
+
+    def test_errors_are_recorded_and_raised(self):
+        # Given
+        metrics = StageMetrics("parse")
+
+        def function(x):
+            raise ValueError(x)
+
+        instrumented = InstrumentedFunction(function, metrics, True, True)
+        # When
+        with self.assertRaises(ValueError):
+            instrumented(1)
+        # Then
+        self.assertEqual({"ValueError": 1}, metrics.snapshot()["errors_by_type"])
+
+    def test_pages_and_articles_with_error_codes_are_recorded(self):
+        # Given
+        download_metrics, parse_metrics = StageMetrics("download"), StageMetrics("parse")
+        download = InstrumentedFunction(lambda url: Page(url, ErrorCodes.NOT_FOUND), download_metrics, True, True)
+        parse = InstrumentedFunction(lambda page: (None, ErrorCodes.DECODING_ERROR), parse_metrics, True, True)
+        # When
+        parse(download("https://medium.com/missing"))
+        # Then
+        self.assertEqual({"NOT_FOUND": 1}, download_metrics.snapshot()["errors_by_type"])
+        self.assertEqual({"DECODING_ERROR": 1}, parse_metrics.snapshot()["errors_by_type"])
+
+
+class PipelineMetricsTests(unittest.TestCase):
+    def test_queue_depths_are_sampled_until_stopped(self):
+        # Given
+        q = multiprocessing.Queue()
+        for i in range(3):
+            q.put(i)
+        time.sleep(0.1)
+        metrics = PipelineMetrics(sample_interval_seconds=0.05)
+        metrics.watch_queue("pages", q)
+        # When
+        metrics.start()
+        time.sleep(0.3)
+        metrics.stop()
+        snapshot = metrics.snapshot()
+        # Then
+        self.assertEqual(3, snapshot["queues"]["pages"]["depth"])
+        self.assertEqual(3, snapshot["queues"]["pages"]["max_depth"])
+        self.assertGreater(len(snapshot["queues"]["pages"]["samples"]), 1)
+
+    def test_metrics_are_exposed_in_prometheus_text_format(self):
+        # Given
+        metrics = PipelineMetrics()
+        metrics.stage("download").record(0.02, num_outputs=1)
+        metrics.stage("download").record(0.5, error=ConnectionError())
+        metrics.watch_queue("pages", queue.Queue())
+        # When
+        metrics.start(port=0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{metrics.port}/metrics", timeout=5) as response:
+                text = response.read().decode("utf-8")
+        finally:
+            metrics.stop()
+        # Then
+        self.assertIn('scraper_stage_items_in_total{stage="download"} 2', text)
+        self.assertIn('scraper_stage_items_out_total{stage="download"} 1', text)
+        self.assertIn('scraper_stage_errors_total{stage="download",type="ConnectionError"} 1', text)
+        self.assertIn('scraper_stage_latency_seconds_bucket{stage="download",le="0.05"} 1', text)
+        self.assertIn('scraper_stage_latency_seconds_bucket{stage="download",le="+Inf"} 2', text)
+        self.assertIn('scraper_queue_depth{queue="pages"} 0', text)
+        self.assertIsNone(metrics.port)
+
+    def test_summary_lists_the_stages_and_the_queue_depths(self):
+        # Given
+        metrics = PipelineMetrics()
+        metrics.stage("parse").record(0.02, num_outputs=1)
+        metrics.stage("parse").record(0.02, error=ValueError())
+        unsized_queue = mock.Mock(qsize=mock.Mock(side_effect=NotImplementedError))
+        metrics.watch_queue("pages", unsized_queue)
+        # When
+        metrics.stop()
+        summary = metrics.summary()
+        # Then
+        self.assertRegex(summary, r"^Stages: parse 1 out \(.+/s, .+% busy, 1 errors\)\. Queues: pages -1$")
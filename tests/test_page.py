@@ -0,0 +1,124 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+import pickle
+import unittest
+from unittest import mock
+
+from src.article_scraper import ArticleScraper
+from src.page import ErrorCodes, Page, PageTransport
+
+
+class PageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        with open("tests/helpers/example_article_1.html", "rb") as file:
+            self.content = file.read()
+        self.page = Page(
+            url="https://medium.com/some-article-92fad4f5a39",
+            error_code=ErrorCodes.OK,
+            content=self.content,
+            encoding="utf-8",
+        )
+        self.existing_blocks = self.shared_memory_blocks()
+
+    def test_packing_as_bytes_keeps_the_page_unchanged(self):
+        # When
+        packed = self.page.pack(PageTransport.BYTES)
+        # Then
+        self.assertIs(self.page, packed)
+        self.assertEqual(self.content.decode("utf-8"), packed.read_text())
+
+    def test_compressed_page_is_smaller_and_decodes_to_the_same_text(self):
+        # When
+        packed = self.page.pack(PageTransport.COMPRESSED)
+        # Then
+        self.assertTrue(packed.compressed)
+        self.assertLess(len(packed.content), len(self.content))
+        self.assertEqual(self.page.read_text(), packed.read_text())
+
+    def test_shared_memory_page_pickles_without_its_content(self):
+        # When
+        packed = self.page.pack(PageTransport.SHARED_MEMORY)
+        pickled = pickle.dumps(packed)
+        # Then
+        self.assertIsNone(packed.content)
+        self.assertLess(len(pickled), 1000)
+        self.assertEqual(self.content.decode("utf-8"), pickle.loads(pickled).read_text())
+
+    def test_reading_a_shared_memory_page_releases_its_block(self):
+        # Given
+        packed = self.page.pack(PageTransport.SHARED_MEMORY)
+        name = packed.shared_memory_name
+        # When
+        packed.read_text()
+        # Then
+        self.assertIsNone(packed.shared_memory_name)
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+    def test_releasing_an_unread_shared_memory_page_unlinks_its_block(self):
+        # Given
+        packed = self.page.pack(PageTransport.SHARED_MEMORY)
+        name = packed.shared_memory_name
+        # When
+        packed.release()
+        # Then
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+    def test_parsing_a_shared_memory_page_with_an_error_releases_its_block(self):
+        # Given
+        self.page.error_code = ErrorCodes.NOT_FOUND
+        packed = self.page.pack(PageTransport.SHARED_MEMORY)
+        # When
+        article, error_code = ArticleScraper._page_to_article(packed)
+        # Then
+        self.assertIsNone(article)
+        self.assertEqual(ErrorCodes.NOT_FOUND, error_code)
+        self.assertEqual(self.existing_blocks, self.shared_memory_blocks())
+
+    def test_parsing_a_shared_memory_page_releases_its_block_when_the_parser_fails(self):
+        # Given
+        packed = self.page.pack(PageTransport.SHARED_MEMORY)
+        parser = mock.Mock(parse=mock.Mock(side_effect=ValueError("unexpected")))
+        # When
+        self.assertRaises(ValueError, ArticleScraper._page_to_article, packed, parser)
+        # Then
+        self.assertEqual(self.existing_blocks, self.shared_memory_blocks())
+
+    def test_shared_memory_page_is_read_from_another_process(self):
+        # Given
+        pages = multiprocessing.Queue()
+        articles = multiprocessing.Queue()
+        process = multiprocessing.Process(target=self.parse_page_from_queue, args=(pages, articles))
+        process.start()
+        # When
+        pages.put(self.page.pack(PageTransport.SHARED_MEMORY))
+        article, error_code = articles.get(timeout=30)
+        process.join()
+        # Then
+        self.assertEqual(ErrorCodes.OK, error_code)
+        self.assertEqual("92fad4f5a39", article.id)
+        self.assertEqual("https://medium.com/some-article-92fad4f5a39", article.url)
+
+    def test_pages_with_errors_have_no_content_to_pack(self):
+        # Given
+        page = Page("http://not_found.com", ErrorCodes.CONNECTION_ERROR)
+        # When
+        packed = page.pack(PageTransport.SHARED_MEMORY)
+        # Then
+        self.assertIsNone(packed.shared_memory_name)
+
+    def test_releasing_a_page_outside_shared_memory_does_nothing(self):
+        # Given
+        packed = self.page.pack(PageTransport.BYTES)
+        # When
+        packed.release()
+        # Then
+        self.assertEqual(self.content.decode("utf-8"), packed.read_text())
+
+    @staticmethod
+    def shared_memory_blocks():
+        return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+    @staticmethod
+    def parse_page_from_queue(pages, articles):
+        articles.put(ArticleScraper._page_to_article(pages.get()))
@@ -0,0 +1,102 @@
+import os
+import tarfile
+import tempfile
+import unittest
+
+from src.page import ErrorCodes, Page
+from src.page_archive import PageArchive
+
+
+class PageArchiveTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_archived_pages_are_read_back_compressed_with_their_url_and_encoding(self):
+        # Given
+        archive = PageArchive(self.directory.name)
+        archive.add(Page(url="https://medium.com/a-92fad4f5a39", error_code=ErrorCodes.OK, content=b"<p>SEO</p>"))
+        archive.add(
+            Page(url="https://medium.com/b-3a6d1ce1e86a", error_code=ErrorCodes.OK, content=b"<p>Paella</p>",
+                 encoding="latin-1")
+        )
+        archive.close()
+        # When
+        pages = list(PageArchive.read(self.directory.name))
+        # Then
+        self.assertEqual(["https://medium.com/a-92fad4f5a39", "https://medium.com/b-3a6d1ce1e86a"], [p.url for p in pages])
+        self.assertTrue(all(page.compressed for page in pages))
+        self.assertEqual([None, "latin-1"], [page.encoding for page in pages])
+        self.assertEqual(["<p>SEO</p>", "<p>Paella</p>"], [page.read_text() for page in pages])
+
+    def test_pages_with_errors_are_not_archived(self):
+        # Given
+        archive = PageArchive(self.directory.name)
+        # When
+        archive.add(Page(url="https://medium.com/a-92fad4f5a39", error_code=ErrorCodes.NOT_FOUND, content=b"Not found"))
+        archive.add(Page(url="https://medium.com/b-3a6d1ce1e86a", error_code=ErrorCodes.TIMEOUT))
+        archive.close()
+        # Then
+        self.assertEqual(0, archive.num_pages)
+        self.assertEqual([], list(PageArchive.read(self.directory.name)))
+
+    def test_pages_without_url_are_not_archived(self):
+        # Given
+        archive = PageArchive(self.directory.name)
+        # When
+        archive.add(Page(url=None, error_code=ErrorCodes.OK, content=b"<p>SEO</p>"))
+        archive.close()
+        # Then
+        self.assertEqual(0, archive.num_pages)
+
+    def test_members_other_than_pages_are_skipped(self):
+        # Given
+        archive = PageArchive(self.directory.name)
+        archive.add(Page(url="https://medium.com/a-92fad4f5a39", error_code=ErrorCodes.OK, content=b"<p>SEO</p>"))
+        directory_member = tarfile.TarInfo("pages")
+        directory_member.type = tarfile.DIRTYPE
+        archive._open_shard().addfile(directory_member)
+        archive.close()
+        # When
+        pages = list(PageArchive.read(self.directory.name))
+        # Then
+        self.assertEqual(["https://medium.com/a-92fad4f5a39"], [page.url for page in pages])
+
+    def test_full_shards_are_closed_and_later_runs_add_new_shards(self):
+        # Given
+        archive = PageArchive(self.directory.name, max_shard_bytes=1)
+        archive.add(Page(url="https://medium.com/a-1", error_code=ErrorCodes.OK, content=b"1"))
+        archive.add(Page(url="https://medium.com/a-2", error_code=ErrorCodes.OK, content=b"2"))
+        archive.close()
+        # When
+        next_run = PageArchive(self.directory.name)
+        next_run.add(Page(url="https://medium.com/a-3", error_code=ErrorCodes.OK, content=b"3"))
+        next_run.close()
+        # Then
+        self.assertEqual(
+            ["pages-00000.tar", "pages-00001.tar", "pages-00002.tar"],
+            [os.path.basename(path) for path in PageArchive.shard_paths(self.directory.name)]
+        )
+        self.assertEqual(["1", "2", "3"], [page.read_text() for page in PageArchive.read(self.directory.name)])
+
+    def test_the_pages_before_the_cut_of_a_shard_killed_while_writing_are_read(self):
+        # Given
+        archive = PageArchive(self.directory.name)
+        archive.add(Page(url="https://medium.com/a-1", error_code=ErrorCodes.OK, content=b"1"))
+        shard_path = PageArchive.shard_paths(self.directory.name)[0]
+        size_after_first_page = os.path.getsize(shard_path)
+        archive.add(Page(url="https://medium.com/a-2", error_code=ErrorCodes.OK, content=os.urandom(5000)))
+        with open(shard_path, "r+b") as file:
+            file.truncate(size_after_first_page + 2000)
+        # When
+        pages = list(PageArchive.read(self.directory.name))
+        # Then
+        self.assertEqual(["https://medium.com/a-1"], [page.url for page in pages])
+
+    def test_a_directory_without_archive_has_no_pages(self):
+        # When
+        pages = list(PageArchive.read(os.path.join(self.directory.name, "missing")))
+        # Then
+        self.assertEqual([], pages)
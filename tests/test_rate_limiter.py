@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import multiprocessing
+import time
+import unittest
+from unittest import mock
+
+from src.rate_limiter import RateLimiter
+
+
+def reserve_in_another_process(rate_limiter, url):
+    rate_limiter._reserve(url)
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_requests_over_the_rate_wait_their_turn(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=10)
+        # When
+        waits = [rate_limiter._reserve("https://medium.com/a-92fad4f5a39") for _ in range(4)]
+        # Then
+        self.assertEqual(0, waits[0])
+        for i in range(2, len(waits)):
+            self.assertAlmostEqual(0.1, waits[i] - waits[i - 1], places=2)
+
+    def test_requests_sleep_until_their_turn(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=20)
+        asyncio.run(rate_limiter.acquire_async("https://medium.com/a-92fad4f5a39"))
+        # When
+        start = time.monotonic()
+        rate_limiter.acquire("https://medium.com/b-3a6d1ce1e86a")
+        asyncio.run(rate_limiter.acquire_async("https://medium.com/c-4b7e2df2f97b"))
+        # Then
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_responses_update_the_rate_of_their_host(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=8)
+        fetch = mock.Mock(return_value=mock.Mock(status_code=429, headers={"Retry-After": "0"}))
+        # When
+        response = rate_limiter.get(fetch, "https://medium.com/a-92fad4f5a39", timeout=5)
+        # Then
+        self.assertEqual(429, response.status_code)
+        fetch.assert_called_once_with("https://medium.com/a-92fad4f5a39", timeout=5)
+        self.assertEqual(4, rate_limiter.requests_per_second("https://medium.com/a-92fad4f5a39"))
+
+    def test_each_host_has_its_own_bucket(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=1)
+        rate_limiter._reserve("https://medium.com/a-92fad4f5a39")
+        # When
+        wait = rate_limiter._reserve("https://towardsdatascience.com/b-3a6d1ce1e86a")
+        # Then
+        self.assertEqual(0, wait)
+
+    def test_throttling_halves_the_rate_once_for_all_the_requests_in_flight(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=8)
+        # When
+        for _ in range(5):
+            rate_limiter.update("https://medium.com/a-92fad4f5a39", 429)
+        # Then
+        self.assertEqual(4, rate_limiter.requests_per_second("https://medium.com/a-92fad4f5a39"))
+
+    def test_requests_wait_until_the_retry_after_delay_is_over(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=100)
+        # When
+        rate_limiter.update("https://medium.com/a-92fad4f5a39", 503, retry_after="2")
+        wait = rate_limiter._reserve("https://medium.com/b-3a6d1ce1e86a")
+        # Then
+        self.assertAlmostEqual(2, wait, places=1)
+        self.assertAlmostEqual(2, rate_limiter.blocked_seconds("https://medium.com/a-92fad4f5a39"), places=1)
+
+    def test_rate_recovers_step_by_step_up_to_the_maximum(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=2, recovery_step=0.5)
+        rate_limiter.throttled("https://medium.com/a-92fad4f5a39")
+        # When
+        rates = []
+        for _ in range(3):
+            rate_limiter.update("https://medium.com/a-92fad4f5a39", 200)
+            rates.append(rate_limiter.requests_per_second("https://medium.com/a-92fad4f5a39"))
+        # Then
+        self.assertEqual([1.5, 2, 2], rates)
+
+    def test_retry_after_is_read_in_seconds_or_as_a_date(self):
+        # Given
+        in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+        # Then
+        self.assertEqual(120, RateLimiter.parse_retry_after("120"))
+        self.assertAlmostEqual(10, RateLimiter.parse_retry_after(in_ten_seconds), delta=1.5)
+        self.assertIsNone(RateLimiter.parse_retry_after("tomorrow"))
+        self.assertIsNone(RateLimiter.parse_retry_after(None))
+
+    def test_buckets_are_shared_with_other_processes(self):
+        # Given
+        rate_limiter = RateLimiter(requests_per_second=1)
+        process = multiprocessing.Process(
+            target=reserve_in_another_process, args=(rate_limiter, "https://medium.com/a-92fad4f5a39")
+        )
+        # When
+        process.start()
+        process.join()
+        wait = rate_limiter._reserve("https://medium.com/b-3a6d1ce1e86a")
+        # Then
+        self.assertAlmostEqual(1, wait, places=1)
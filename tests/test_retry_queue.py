@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from src.page import ErrorCodes
+from src.retry_queue import RetryQueue
+
+
+class RetryQueueTests(unittest.TestCase):
+    def test_urls_are_returned_only_once_their_delay_is_over(self):
+        # Given
+        retry_queue = RetryQueue()
+        retry_queue.schedule("https://medium.com/b-3a6d1ce1e86a", 0.2)
+        retry_queue.schedule("https://medium.com/a-92fad4f5a39", 0)
+        # When
+        due_now = retry_queue.pop_due()
+        time.sleep(0.2)
+        due_later = retry_queue.pop_due()
+        # Then
+        self.assertEqual(["https://medium.com/a-92fad4f5a39"], due_now)
+        self.assertEqual(["https://medium.com/b-3a6d1ce1e86a"], due_later)
+        self.assertEqual(0, len(retry_queue))
+
+    def test_urls_are_given_up_once_their_attempts_are_spent(self):
+        # Given
+        retry_queue = RetryQueue(max_attempts=2, base_delay_seconds=0)
+        # When
+        attempts = [retry_queue.retry("https://medium.com/a-92fad4f5a39", ErrorCodes.TIMEOUT) for _ in range(3)]
+        # Then
+        self.assertEqual([True, True, False], attempts)
+        self.assertEqual(2, retry_queue.num_retries[ErrorCodes.TIMEOUT])
+        self.assertEqual(1, retry_queue.num_given_up[ErrorCodes.TIMEOUT])
+
+    def test_attempts_start_over_once_a_url_is_forgotten(self):
+        # Given
+        retry_queue = RetryQueue(max_attempts=1, base_delay_seconds=0)
+        retry_queue.retry("https://medium.com/a-92fad4f5a39", ErrorCodes.TIMEOUT)
+        # When
+        retry_queue.forget("https://medium.com/a-92fad4f5a39")
+        # Then
+        self.assertTrue(retry_queue.retry("https://medium.com/a-92fad4f5a39", ErrorCodes.CONNECTION_ERROR))
+
+    def test_backoff_doubles_with_each_attempt_up_to_the_maximum_with_jitter(self):
+        # Given
+        retry_queue = RetryQueue(base_delay_seconds=1, max_delay_seconds=8)
+        # When
+        delays = {attempt: [retry_queue.backoff_seconds(attempt) for _ in range(100)] for attempt in (1, 2, 3, 6)}
+        # Then
+        for attempt, expected_delay in ((1, 1), (2, 2), (3, 4), (6, 8)):
+            self.assertTrue(all(expected_delay / 2 <= delay <= expected_delay for delay in delays[attempt]))
+            self.assertGreater(len(set(delays[attempt])), 1)
+
+    def test_queue_is_settled_once_no_download_is_in_flight_or_waiting(self):
+        # Given
+        retry_queue = RetryQueue()
+        retry_queue.start_downloads(["https://medium.com/a-92fad4f5a39", "https://medium.com/b-3a6d1ce1e86a"])
+        # When
+        retry_queue.retry("https://medium.com/a-92fad4f5a39", ErrorCodes.TIMEOUT, delay_seconds=60)
+        retry_queue.finish_download()
+        retry_queue.finish_download()
+        # Then
+        self.assertEqual(0, retry_queue.num_downloading)
+        self.assertFalse(retry_queue.is_settled())
+        self.assertEqual({ErrorCodes.TIMEOUT: 1}, retry_queue.pending_reasons())
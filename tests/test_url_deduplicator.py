@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from src.url_deduplicator import BloomFilter, UrlDeduplicator
+
+
+class BloomFilterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "urls.bloom")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_adding_a_key_twice_reports_it_as_new_only_once(self):
+        # Given
+        bloom_filter = BloomFilter(capacity=1000)
+        # When
+        first, second = bloom_filter.add("92fad4f5a39"), bloom_filter.add("92fad4f5a39")
+        # Then
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertIn("92fad4f5a39", bloom_filter)
+        self.assertNotIn("3a6d1ce1e86a", bloom_filter)
+
+    def test_false_positive_rate_stays_close_to_the_requested_one_at_full_capacity(self):
+        # Given
+        bloom_filter = BloomFilter(capacity=10000, error_rate=0.01)
+        for i in range(10000):
+            bloom_filter.add(f"stored-{i}")
+        # When
+        false_positives = sum(f"unseen-{i}" in bloom_filter for i in range(10000))
+        # Then
+        self.assertLess(false_positives / 10000, 0.02)
+
+    def test_persisted_filter_keeps_its_keys_when_reopened(self):
+        # Given
+        bloom_filter = BloomFilter(capacity=1000, path=self.path)
+        bloom_filter.add("92fad4f5a39")
+        bloom_filter.close()
+        # When
+        reopened = BloomFilter(capacity=5, path=self.path)
+        # Then
+        self.assertIn("92fad4f5a39", reopened)
+        self.assertEqual(bloom_filter.num_bits, reopened.num_bits)
+        reopened.close()
+
+    def test_flushed_keys_are_seen_by_other_readers_of_the_file(self):
+        # Given
+        bloom_filter = BloomFilter(capacity=1000, path=self.path)
+        bloom_filter.add("92fad4f5a39")
+        # When
+        bloom_filter.flush()
+        reader = BloomFilter(path=self.path)
+        # Then
+        self.assertIn("92fad4f5a39", reader)
+        reader.close()
+        bloom_filter.close()
+
+    def test_filters_in_memory_have_nothing_to_flush_or_close(self):
+        # Given
+        bloom_filter = BloomFilter(capacity=1000)
+        bloom_filter.add("92fad4f5a39")
+        # When
+        bloom_filter.flush()
+        bloom_filter.close()
+        # Then
+        self.assertIn("92fad4f5a39", bloom_filter)
+
+    def test_opening_a_file_that_is_not_an_index_returns_error(self):
+        # Given
+        with open(self.path, "wb") as file:
+            file.write(b"some content that is long enough for a header")
+        # Then
+        self.assertRaises(ValueError, BloomFilter, path=self.path)
+
+
+class UrlDeduplicatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "urls.bloom")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_the_same_post_is_kept_once_whatever_url_it_is_found_through(self):
+        # Given
+        deduplicator = UrlDeduplicator(capacity=1000)
+        # When
+        new_urls = deduplicator.filter_new([
+            "https://medium.com/@benjaminbannister/seo-secrets-92fad4f5a39",
+            "https://medium.com/@miggyperez/7-delicious-paella-recipes-3a6d1ce1e86a",
+            "https://www.freecodecamp.org/news/seo-secrets-92fad4f5a39/",
+        ])
+        # Then
+        self.assertEqual(
+            [
+                "https://medium.com/@benjaminbannister/seo-secrets-92fad4f5a39",
+                "https://medium.com/@miggyperez/7-delicious-paella-recipes-3a6d1ce1e86a",
+            ],
+            new_urls
+        )
+        self.assertEqual(1, deduplicator.num_duplicates)
+
+    def test_stored_articles_are_skipped_in_the_next_run(self):
+        # Given
+        first_run = UrlDeduplicator(capacity=1000, path=self.path)
+        first_run.filter_new(["https://medium.com/a-92fad4f5a39", "https://medium.com/b-3a6d1ce1e86a"])
+        first_run.mark_stored("92fad4f5a39")
+        first_run.close()
+        # When
+        second_run = UrlDeduplicator(capacity=1000, path=self.path)
+        new_urls = second_run.filter_new(["https://medium.com/a-92fad4f5a39", "https://medium.com/b-3a6d1ce1e86a"])
+        second_run.close()
+        # Then
+        self.assertEqual(["https://medium.com/b-3a6d1ce1e86a"], new_urls)
+
+    def test_urls_marked_as_seen_are_skipped_without_being_stored(self):
+        # Given
+        deduplicator = UrlDeduplicator(capacity=1000)
+        deduplicator.mark_seen(["https://medium.com/a-92fad4f5a39"])
+        deduplicator.mark_stored("92fad4f5a39")
+        # When
+        new_urls = deduplicator.filter_new(["https://medium.com/a-92fad4f5a39", "https://medium.com/b-3a6d1ce1e86a"])
+        deduplicator.close()
+        # Then
+        self.assertEqual(["https://medium.com/b-3a6d1ce1e86a"], new_urls)
+        self.assertIsNone(deduplicator.stored)